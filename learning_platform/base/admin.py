@@ -188,6 +188,9 @@ admin.site.register(Notification, NotificationAdmin)
 # ------------------------------------------------------
 admin.site.register(Progress)
 admin.site.register(SubmittedAnswer)
+admin.site.register(StudentRecommendation)
+admin.site.register(GraphSyncEvent)
+admin.site.register(GraphMigrationCheckpoint)
 
 
 # Personnalisation du site admin
@@ -6,5 +6,23 @@ class BaseConfig(AppConfig):
     name = 'base'
     
     def ready(self):
-        """Importe les signaux au démarrage de l'application"""
+        """Importe les signaux et prépare le driver Neo4j partagé au démarrage"""
         import base.signals  # noqa: F401
+        
+        # Échec immédiat des appels Cypher quand Neo4j est injoignable
+        from base import circuit_breaker
+        circuit_breaker.install()
+        
+        # Création paresseuse: aucune connexion Bolt n'est ouverte ici
+        from base.neo_connection import connection_manager
+        try:
+            connection_manager.get_driver()
+        except Exception as e:
+            import logging
+            logging.getLogger('base').warning(f"Neo4j driver init failed: {e}")
+        
+        # Index requis par les requêtes: SchemaError (démarrage interrompu) s'il en manque
+        from django.conf import settings
+        if getattr(settings, 'NEO4J_SCHEMA_ON_STARTUP', False):
+            from base.graph_schema import bootstrap_schema
+            bootstrap_schema()
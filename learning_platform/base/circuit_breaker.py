@@ -0,0 +1,155 @@
+"""
+Disjoncteur (circuit breaker) devant Neo4j
+Quand Neo4j est injoignable, chaque appel attendrait le timeout de connexion du driver
+avant que son `except` ne journalise l'erreur. Après `failure_threshold` échecs de
+connexion consécutifs, le disjoncteur s'ouvre: pendant `reset_timeout` secondes les
+appels échouent immédiatement (CircuitOpenError), puis un seul appel de test est laissé
+passer (semi-ouvert) - succès: fermeture, échec: nouvelle période d'ouverture.
+
+`install()` (appelé par BaseConfig.ready) enveloppe `Database.cypher_query` de neomodel:
+requêtes Cypher directes et accès neomodel (nodes.get, save, connect...) passent tous
+par le disjoncteur. L'état est propre à chaque processus.
+
+Les erreurs Cypher (syntaxe, contrainte...) ne comptent pas: seules les erreurs de
+disponibilité ouvrent le circuit.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from neo4j.exceptions import DatabaseUnavailable, ServiceUnavailable, SessionExpired
+
+logger = logging.getLogger('base')
+
+# Erreurs traduisant une indisponibilité de Neo4j (et non une requête invalide)
+AVAILABILITY_ERRORS = (ServiceUnavailable, SessionExpired, DatabaseUnavailable, ConnectionError, TimeoutError)
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé sans contacter Neo4j: le disjoncteur est ouvert"""
+
+
+class CircuitBreaker:
+    """Disjoncteur thread-safe: fermé → ouvert → semi-ouvert → fermé"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, errors=AVAILABILITY_ERRORS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.errors = errors
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self):
+        """Vrai si un appel serait refusé maintenant"""
+        state = self.state
+        return state == self.OPEN or (state == self.HALF_OPEN and self._probing)
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                raise CircuitOpenError(f'{self.name}: circuit ouvert')
+            # Semi-ouvert: un seul appel de test à la fois
+            self._state = self.HALF_OPEN
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f'Circuit {self.name} closed')
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f'Circuit {self.name} open for {self.reset_timeout}s after {self._failures} failures'
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except self.errors:
+            self.record_failure()
+            raise
+        except Exception:
+            # Erreur de requête: Neo4j a répondu
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        self.record_success()
+
+
+def _build_breaker():
+    from django.conf import settings
+    return CircuitBreaker(
+        'neo4j',
+        failure_threshold=getattr(settings, 'NEO4J_CIRCUIT_FAILURE_THRESHOLD', 5),
+        reset_timeout=getattr(settings, 'NEO4J_CIRCUIT_RESET_TIMEOUT', 30.0)
+    )
+
+
+neo4j_breaker = None
+_install_lock = threading.Lock()
+
+
+def get_neo4j_breaker():
+    global neo4j_breaker
+    if neo4j_breaker is None:
+        with _install_lock:
+            if neo4j_breaker is None:
+                neo4j_breaker = _build_breaker()
+    return neo4j_breaker
+
+
+def neo4j_available():
+    """Faux pendant l'ouverture du disjoncteur (aucun appel réseau)"""
+    return not get_neo4j_breaker().is_open()
+
+
+def install():
+    """Faire passer `Database.cypher_query` (neomodel) par le disjoncteur Neo4j"""
+    from neomodel import db
+
+    database_class = type(db)
+    if getattr(database_class.cypher_query, '_circuit_breaker', False):
+        return
+
+    original = database_class.cypher_query
+    breaker = get_neo4j_breaker()
+
+    @functools.wraps(original)
+    def cypher_query(self, *args, **kwargs):
+        return breaker.call(original, self, *args, **kwargs)
+
+    cypher_query._circuit_breaker = True
+    database_class.cypher_query = cypher_query
@@ -0,0 +1,167 @@
+"""
+Chargement de l'arborescence complète d'un cours Neo4j en une seule requête
+Cours → modules (ordonnés) → ressources (ordonnées) et évaluations → questions (ordonnées).
+
+`NeoCourse.get_modules_ordered()` puis `NeoModule.get_resources_ordered()` pour chaque
+module coûtent un aller-retour Bolt par nœud; ici une requête Cypher (compréhensions de
+motifs imbriquées) renvoie tout l'arbre, trié ensuite en Python.
+
+Le résultat est fait d'objets légers à `__slots__` (pas de StructuredNode neomodel):
+lecture seule, pour l'affichage d'un plan de cours. Il est mis en cache, versionné par
+cours, et reflète le graphe tel que l'ont écrit:
+    - l'outbox pour le cours lui-même (process_batch incrémente la version de l'arbre
+      après avoir appliqué l'événement du cours),
+    - la dernière migration (migrate_to_neo4j) ou réparation (reconcile_graph --repair)
+      pour les modules, ressources, évaluations et questions: ils ne passent pas par
+      l'outbox, un save() Django n'apparaît donc dans l'arbre qu'après l'une d'elles,
+      qui invalident alors tous les arbres (invalidate_course_trees).
+
+Usage:
+    tree = load_course_tree(course.pk)           # avec cache
+    tree = load_course_tree.uncached(course.pk)  # lecture directe du graphe
+    for module in tree.modules:
+        module.resources, module.evaluations
+"""
+
+import logging
+
+from neomodel import db
+
+from base.neo_connection import ensure_neo4j_connection
+from base.recommendation_cache import cached_graph_call, recommendation_cache
+
+logger = logging.getLogger('base')
+
+
+COURSE_TREE_QUERY = """
+MATCH (c:NeoCourse {django_id: $course_id})
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(c)
+RETURN c {.*} AS course,
+       instructor.username AS instructor,
+       [(c)-[cm:CONTAINS]->(m:NeoModule) | {
+           order: coalesce(cm.order, m.order, 0),
+           module: m {.*},
+           resources: [(m)-[hr:HAS_RESOURCE]->(r:NeoResource) | {
+               order: coalesce(hr.order, 0),
+               resource: r {.*}
+           }],
+           evaluations: [(m)-[:HAS_EVALUATION]->(e:NeoEvaluation) | {
+               evaluation: e {.*},
+               questions: [(e)-[:HAS_QUESTION]->(q:NeoQuestion) | q {.*}]
+           }]
+       }] AS modules
+LIMIT 1
+"""
+
+
+# =====================================================
+# NŒUDS DE L'ARBRE
+# =====================================================
+
+class TreeNode:
+    """Nœud en lecture seule construit depuis les propriétés du graphe"""
+
+    __slots__ = ('uid', 'django_id')
+    fields = ()
+
+    def __init__(self, props, **extra):
+        self.uid = props.get('uid')
+        self.django_id = props.get('django_id')
+        for name in self.fields:
+            setattr(self, name, extra[name] if name in extra else props.get(name))
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.django_id}>'
+
+
+class TreeQuestion(TreeNode):
+    fields = __slots__ = (
+        'text', 'option1', 'option2', 'option3', 'option4', 'correct_option', 'points', 'order'
+    )
+
+
+class TreeEvaluation(TreeNode):
+    fields = __slots__ = (
+        'title', 'description', 'evaluation_type', 'deadline', 'max_score', 'passing_score',
+        'time_limit_minutes', 'questions'
+    )
+
+
+class TreeResource(TreeNode):
+    fields = __slots__ = ('title', 'resource_type', 'url', 'file_path', 'order')
+
+
+class TreeModule(TreeNode):
+    fields = __slots__ = ('title', 'description', 'order', 'resources', 'evaluations')
+
+
+class CourseTree(TreeNode):
+    fields = __slots__ = (
+        'title', 'description', 'level', 'estimated_duration', 'image_path', 'enrollment_count',
+        'instructor', 'modules'
+    )
+
+
+def _sort_key(order, props):
+    """Tri par ordre puis PK Django (les ex-aequo restent déterministes)"""
+    return (order or 0, props.get('django_id') or 0)
+
+
+def build_course_tree(course, instructor, modules):
+    """Construire l'arbre à partir d'une ligne de COURSE_TREE_QUERY"""
+    tree_modules = []
+    for row in sorted(modules, key=lambda row: _sort_key(row['order'], row['module'])):
+        resources = [
+            TreeResource(item['resource'], order=item['order'])
+            for item in sorted(row['resources'], key=lambda item: _sort_key(item['order'], item['resource']))
+        ]
+        evaluations = [
+            TreeEvaluation(
+                item['evaluation'],
+                questions=[
+                    TreeQuestion(question)
+                    for question in sorted(item['questions'], key=lambda q: _sort_key(q.get('order'), q))
+                ]
+            )
+            for item in sorted(row['evaluations'], key=lambda item: _sort_key(0, item['evaluation']))
+        ]
+        tree_modules.append(
+            TreeModule(row['module'], order=row['order'], resources=resources, evaluations=evaluations)
+        )
+
+    return CourseTree(course, instructor=instructor, modules=tree_modules)
+
+
+# =====================================================
+# CHARGEMENT
+# =====================================================
+
+@cached_graph_call('course_tree')
+def load_course_tree(course_id):
+    """
+    Arborescence du cours de PK Django `course_id` (une requête Cypher).
+
+    Returns:
+        CourseTree, ou None si le cours est absent du graphe ou Neo4j indisponible
+    """
+    try:
+        ensure_neo4j_connection()
+        result, _ = db.cypher_query(COURSE_TREE_QUERY, {'course_id': course_id})
+        if not result:
+            return None
+        course, instructor, modules = result[0]
+        return build_course_tree(course, instructor, modules)
+    except Exception as e:
+        logger.error(f"Course tree error for course {course_id}: {e}")
+        return None
+
+
+def invalidate_course_trees():
+    """Invalider l'arbre en cache de tous les cours (après une migration ou une réparation)"""
+    from base.models import Course
+
+    count = 0
+    for course_id in Course.objects.values_list('pk', flat=True).iterator():
+        recommendation_cache.bump_course_tree(course_id)
+        count += 1
+    return count
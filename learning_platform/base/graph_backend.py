@@ -0,0 +1,711 @@
+"""
+Backends de graphe du moteur de recommandation
+Les parcours utilisés par CourseRecommendationEngine (co-inscriptions, compétences
+partagées, popularité, cours similaires, statistiques) sont définis par GraphBackend:
+
+    Neo4jBackend   requêtes Cypher via neomodel/Bolt (production)
+    MemoryBackend  listes d'adjacence en Python pur, sans service externe
+                   (tests unitaires, CI, poste de développement, benchmarks)
+
+Sélection: settings.GRAPH_BACKEND = 'neo4j' (défaut) ou 'memory'.
+Le MemoryBackend est rempli depuis les tables Django (`MemoryBackend.from_django()`)
+ou directement (add_course, enroll, add_skill...); `set_graph_backend()` permet
+d'en injecter un dans les tests.
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from neomodel import db
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+# =====================================================
+# REQUÊTES CYPHER (Neo4jBackend)
+# =====================================================
+
+COLLABORATIVE_QUERY = """
+// Trouver l'étudiant
+MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(my_course:NeoCourse)
+
+// Trouver des étudiants similaires (qui suivent les mêmes cours)
+MATCH (other:NeoUser)-[:ENROLLED_IN]->(my_course)
+WHERE other.username <> $username
+
+// Trouver les cours que ces étudiants suivent mais pas moi
+MATCH (other)-[:ENROLLED_IN]->(rec:NeoCourse)
+WHERE NOT (me)-[:ENROLLED_IN]->(rec)
+
+// Compter combien d'étudiants similaires ont suivi chaque cours
+WITH rec, count(DISTINCT other) AS popularity
+
+// Récupérer l'instructeur
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(rec)
+
+RETURN rec.uid AS course_uid,
+       rec.title AS title,
+       rec.level AS level,
+       rec.description AS description,
+       rec.image_path AS image_path,
+       popularity AS score,
+       instructor.username AS instructor,
+       'collaborative' AS method,
+       rec.django_id AS course_id
+ORDER BY popularity DESC
+LIMIT $limit
+"""
+
+SKILL_QUERY = """
+// Trouver les compétences des cours que l'étudiant suit
+MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(my_course:NeoCourse)
+MATCH (my_course)-[:TEACHES_SKILL]->(skill:NeoSkill)
+
+// Trouver d'autres cours qui enseignent ces mêmes compétences
+MATCH (skill)<-[:TEACHES_SKILL]-(rec:NeoCourse)
+WHERE rec <> my_course
+AND NOT (me)-[:ENROLLED_IN]->(rec)
+
+// Compter combien de compétences en commun
+WITH rec, count(DISTINCT skill) AS shared_skills, collect(DISTINCT skill.name) AS skill_names
+
+// Récupérer l'instructeur
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(rec)
+
+RETURN rec.uid AS course_uid,
+       rec.title AS title,
+       rec.level AS level,
+       rec.description AS description,
+       rec.image_path AS image_path,
+       shared_skills AS score,
+       instructor.username AS instructor,
+       'skill' AS method,
+       skill_names AS skills,
+       rec.django_id AS course_id
+ORDER BY shared_skills DESC
+LIMIT $limit
+"""
+
+POPULAR_QUERY = """
+// Cours les plus suivis (top-K), en ignorant les cours que l'étudiant suit déjà.
+// coalesce: un cours sans compteur (nœud antérieur à enrollment_count, avant
+// rebuild_enrollment_counts) reste proposé, à 0
+MATCH (c:NeoCourse)
+WHERE NOT EXISTS {
+    MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(c)
+}
+WITH c, coalesce(c.enrollment_count, 0) AS enrollment_count
+ORDER BY enrollment_count DESC
+LIMIT $limit
+
+// Récupérer l'instructeur
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(c)
+
+RETURN c.uid AS course_uid,
+       c.title AS title,
+       c.level AS level,
+       c.description AS description,
+       c.image_path AS image_path,
+       enrollment_count AS score,
+       instructor.username AS instructor,
+       'popular' AS method,
+       c.django_id AS course_id
+ORDER BY score DESC
+"""
+
+HYBRID_BATCH_QUERY = """
+// Cours populaires: un seul calcul pour tout le lot (sans compteur: 0, comme POPULAR_QUERY)
+CALL {
+    MATCH (rec:NeoCourse)
+    WITH rec, coalesce(rec.enrollment_count, 0) AS enrollment_count
+    ORDER BY enrollment_count DESC
+    LIMIT $popular_pool
+    RETURN collect({rec: rec, score: enrollment_count}) AS popular
+}
+
+UNWIND $usernames AS username
+OPTIONAL MATCH (me:NeoUser {username: username})
+
+CALL {
+    WITH me, popular
+
+    CALL {
+        // Algorithme 1: Filtrage collaboratif
+        WITH me
+        MATCH (me)-[:ENROLLED_IN]->(:NeoCourse)<-[:ENROLLED_IN]-(other:NeoUser)
+        WHERE other <> me
+        MATCH (other)-[:ENROLLED_IN]->(rec:NeoCourse)
+        WHERE NOT (me)-[:ENROLLED_IN]->(rec)
+        WITH rec, count(DISTINCT other) AS score
+        ORDER BY score DESC
+        LIMIT $limit
+        WITH collect({rec: rec, score: score}) AS rows, max(score) AS top
+        UNWIND rows AS row
+        RETURN row.rec AS rec, row.score AS score,
+               toFloat(row.score) / top AS norm,
+               'collaborative' AS method, [] AS skills
+
+        UNION ALL
+
+        // Algorithme 2: Compétences partagées
+        WITH me
+        MATCH (me)-[:ENROLLED_IN]->(:NeoCourse)-[:TEACHES_SKILL]->(skill:NeoSkill)
+        MATCH (skill)<-[:TEACHES_SKILL]-(rec:NeoCourse)
+        WHERE NOT (me)-[:ENROLLED_IN]->(rec)
+        WITH rec, count(DISTINCT skill) AS score, collect(DISTINCT skill.name) AS skills
+        ORDER BY score DESC
+        LIMIT $limit
+        WITH collect({rec: rec, score: score, skills: skills}) AS rows, max(score) AS top
+        UNWIND rows AS row
+        RETURN row.rec AS rec, row.score AS score,
+               toFloat(row.score) / top AS norm,
+               'skill' AS method, row.skills AS skills
+
+        UNION ALL
+
+        // Algorithme 3: Cours populaires non suivis
+        WITH me, popular
+        UNWIND popular AS entry
+        // Un motif n'accepte que des variables: projeter rec avant le filtre
+        WITH me, entry.rec AS rec, entry.score AS score
+        WHERE me IS NULL OR NOT (me)-[:ENROLLED_IN]->(rec)
+        WITH rec, score
+        ORDER BY score DESC
+        LIMIT $limit
+        WITH collect({rec: rec, score: score}) AS rows, max(score) AS top
+        UNWIND rows AS row
+        RETURN row.rec AS rec, row.score AS score,
+               CASE top WHEN 0 THEN 0.0 ELSE toFloat(row.score) / top END AS norm,
+               'popular' AS method, [] AS skills
+    }
+
+    // Combiner les stratégies par cours
+    WITH rec, method, score, skills, norm * $weights[method] AS weighted
+    ORDER BY weighted DESC
+    WITH rec,
+         collect(method) AS methods,
+         collect(score) AS scores,
+         collect(skills) AS skill_lists,
+         sum(weighted) AS blended
+    ORDER BY blended DESC
+    LIMIT $limit
+    WITH rec, methods, scores, blended,
+         reduce(acc = [], s IN skill_lists | acc + s) AS skills
+
+    OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(rec)
+
+    RETURN rec, methods, scores, blended, skills,
+           instructor.username AS instructor
+}
+
+RETURN username,
+       rec.uid AS course_uid,
+       rec.title AS title,
+       rec.level AS level,
+       rec.description AS description,
+       rec.image_path AS image_path,
+       scores[0] AS score,
+       instructor,
+       methods[0] AS method,
+       skills,
+       blended,
+       methods AS strategies,
+       rec.django_id AS course_id
+ORDER BY username, blended DESC
+"""
+
+SIMILAR_PRECOMPUTED_QUERY = """
+MATCH (c:NeoCourse {django_id: $course_id})-[s:SIMILAR_TO]->(similar:NeoCourse)
+
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(similar)
+
+RETURN similar.uid AS course_uid,
+       similar.title AS title,
+       similar.level AS level,
+       s.similarity_score AS similarity_score,
+       instructor.username AS instructor,
+       similar.django_id AS course_id
+ORDER BY similarity_score DESC
+LIMIT $limit
+"""
+
+SIMILAR_TRAVERSAL_QUERY = """
+MATCH (c:NeoCourse {django_id: $course_id})
+
+// Trouver des cours suivis par les mêmes étudiants
+MATCH (c)<-[:ENROLLED_IN]-(student:NeoUser)-[:ENROLLED_IN]->(similar:NeoCourse)
+WHERE similar <> c
+
+WITH similar, count(DISTINCT student) AS common_students
+
+OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(similar)
+
+RETURN similar.uid AS course_uid,
+       similar.title AS title,
+       similar.level AS level,
+       common_students AS similarity_score,
+       instructor.username AS instructor,
+       similar.django_id AS course_id
+ORDER BY common_students DESC
+LIMIT $limit
+"""
+
+STUDENT_STATS_QUERY = """
+MATCH (u:NeoUser {username: $username})
+
+// Cours suivis
+OPTIONAL MATCH (u)-[e:ENROLLED_IN]->(c:NeoCourse)
+WITH u, count(c) AS courses_enrolled, 
+     avg(e.completion_percent) AS avg_completion
+
+// Évaluations passées
+OPTIONAL MATCH (u)-[s:SUBMITTED]->(eval:NeoEvaluation)
+WHERE s.passed = true
+WITH u, courses_enrolled, avg_completion, count(eval) AS evals_passed
+
+// Ressources vues
+OPTIONAL MATCH (u)-[:VIEWED]->(r:NeoResource)
+
+RETURN courses_enrolled,
+       coalesce(avg_completion, 0) AS avg_completion,
+       evals_passed,
+       count(r) AS resources_viewed
+"""
+
+INSTRUCTOR_STATS_QUERY = """
+MATCH (u:NeoUser {username: $username})-[:TEACHES]->(c:NeoCourse)
+
+// Total étudiants inscrits
+OPTIONAL MATCH (student:NeoUser)-[:ENROLLED_IN]->(c)
+WITH u, count(DISTINCT c) AS courses_created, 
+     count(DISTINCT student) AS total_students
+
+RETURN courses_created, total_students
+"""
+
+
+def truncate_description(description, length=100):
+    """Description abrégée des cartes de recommandation (tous les moteurs)"""
+    return description[:length] + '...' if description and len(description) > length else description
+
+
+def _recommendation_row(row):
+    """Ligne Cypher (course_uid, title, level, description, image_path, score, instructor, method, ...)"""
+    return {
+        'course_uid': row[0],
+        'title': row[1],
+        'level': row[2],
+        'description': truncate_description(row[3]),
+        'image_path': row[4],
+        'score': row[5],
+        'instructor': row[6],
+        'method': row[7],
+    }
+
+
+class GraphBackend(ABC):
+    """
+    Interface des parcours du moteur de recommandation.
+    Les recommandations sont des dicts au format du moteur (course_uid, title, level,
+    description, image_path, score, instructor, method, course_id).
+    """
+
+    name = None
+
+    @abstractmethod
+    def collaborative(self, username, limit):
+        """Cours suivis par les étudiants qui partagent des cours avec `username`"""
+
+    @abstractmethod
+    def shared_skills(self, username, limit):
+        """Cours qui enseignent les compétences des cours de `username`"""
+
+    @abstractmethod
+    def popular(self, username, limit):
+        """Cours les plus suivis, hors cours de `username`"""
+
+    @abstractmethod
+    def hybrid_batch(self, usernames, limit, weights):
+        """Mélange pondéré des trois stratégies: dict username -> recommandations"""
+
+    @abstractmethod
+    def similar_courses(self, course_id, limit):
+        """Cours ayant le plus d'étudiants en commun avec `course_id`"""
+
+    @abstractmethod
+    def student_stats(self, username):
+        """Statistiques de l'étudiant (cours suivis, complétion, évaluations réussies)"""
+
+    @abstractmethod
+    def instructor_stats(self, username):
+        """Statistiques de l'instructeur (cours créés, étudiants inscrits)"""
+
+
+class Neo4jBackend(GraphBackend):
+    """Parcours en Cypher sur Neo4j (driver partagé du processus)"""
+
+    name = 'neo4j'
+
+    @staticmethod
+    def _query(query, params):
+        ensure_neo4j_connection()
+        result, _ = db.cypher_query(query, params)
+        return result
+
+    def collaborative(self, username, limit):
+        result = self._query(COLLABORATIVE_QUERY, {'username': username, 'limit': limit})
+        return [{**_recommendation_row(row), 'course_id': row[8]} for row in result]
+
+    def shared_skills(self, username, limit):
+        result = self._query(SKILL_QUERY, {'username': username, 'limit': limit})
+        return [
+            {
+                **_recommendation_row(row),
+                'skills': row[8][:3] if row[8] else [],  # Limiter à 3 skills affichés
+                'course_id': row[9]
+            }
+            for row in result
+        ]
+
+    def popular(self, username, limit):
+        result = self._query(POPULAR_QUERY, {'username': username, 'limit': limit})
+        return [{**_recommendation_row(row), 'course_id': row[8]} for row in result]
+
+    def hybrid_batch(self, usernames, limit, weights):
+        result = self._query(HYBRID_BATCH_QUERY, {
+            'usernames': list(usernames),
+            'limit': limit,
+            # Marge pour les cours populaires déjà suivis par l'étudiant
+            'popular_pool': limit * 5,
+            'weights': weights
+        })
+
+        recommendations = {username: [] for username in usernames}
+        for row in result:
+            recommendations[row[0]].append({
+                **_recommendation_row(row[1:]),
+                'skills': row[9][:3] if row[9] else [],
+                'blended_score': round(row[10] or 0, 3),
+                'strategies': row[11],
+                'course_id': row[12]
+            })
+        return recommendations
+
+    def similar_courses(self, course_id, limit):
+        params = {'course_id': course_id, 'limit': limit}
+        result = self._query(SIMILAR_PRECOMPUTED_QUERY, params)
+        if not result:
+            result = self._query(SIMILAR_TRAVERSAL_QUERY, params)
+        return [
+            {
+                'course_uid': row[0],
+                'title': row[1],
+                'level': row[2],
+                'similarity_score': row[3],
+                'instructor': row[4],
+                'course_id': row[5]
+            }
+            for row in result
+        ]
+
+    def student_stats(self, username):
+        result = self._query(STUDENT_STATS_QUERY, {'username': username})
+        if not result:
+            return {}
+        row = result[0]
+        return {
+            'courses_enrolled': row[0] or 0,
+            'avg_completion': round(row[1] or 0, 1),
+            'evaluations_passed': row[2] or 0,
+            'resources_viewed': row[3] or 0
+        }
+
+    def instructor_stats(self, username):
+        result = self._query(INSTRUCTOR_STATS_QUERY, {'username': username})
+        if not result:
+            return {}
+        row = result[0]
+        return {
+            'courses_created': row[0] or 0,
+            'total_students': row[1] or 0
+        }
+
+
+class MemoryBackend(GraphBackend):
+    """
+    Graphe en mémoire: listes d'adjacence (dicts d'ensembles) et mêmes parcours qu'en Cypher.
+    Les égalités de score sont départagées par PK de cours: les résultats sont déterministes.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self.courses = {}                      # course_id -> propriétés
+        self.roles = {}                        # username -> rôle
+        self.enrolled = defaultdict(set)       # username -> {course_id}
+        self.students = defaultdict(set)       # course_id -> {username}
+        self.completion = {}                   # (username, course_id) -> %
+        self.course_skills = defaultdict(set)  # course_id -> {skill}
+        self.skill_courses = defaultdict(set)  # skill -> {course_id}
+        self.teaches = defaultdict(set)        # instructor -> {course_id}
+        self.passed = defaultdict(set)         # username -> {evaluation_id réussie}
+        self.viewed = defaultdict(set)         # username -> {resource_id}
+        self._lock = threading.RLock()
+
+    # -------------------------------------------------
+    # Écriture
+    # -------------------------------------------------
+
+    def add_user(self, username, role='Student'):
+        self.roles[username] = role
+
+    def add_course(self, course_id, title, instructor=None, level='Beginner', description='',
+                   image_path='', uid=None):
+        with self._lock:
+            self.courses[course_id] = {
+                'uid': uid or f'course-{course_id}',
+                'title': title,
+                'level': level,
+                'description': description,
+                'image_path': image_path,
+                'instructor': instructor,
+            }
+            if instructor:
+                self.teaches[instructor].add(course_id)
+
+    def enroll(self, username, course_id, completion_percent=0.0):
+        with self._lock:
+            self.roles.setdefault(username, 'Student')
+            self.enrolled[username].add(course_id)
+            self.students[course_id].add(username)
+            self.completion[(username, course_id)] = completion_percent
+
+    def unenroll(self, username, course_id):
+        with self._lock:
+            self.enrolled[username].discard(course_id)
+            self.students[course_id].discard(username)
+            self.completion.pop((username, course_id), None)
+
+    def add_skill(self, course_id, skill):
+        with self._lock:
+            self.course_skills[course_id].add(skill)
+            self.skill_courses[skill].add(course_id)
+
+    def record_submission(self, username, evaluation_id, passed):
+        if passed:
+            self.passed[username].add(evaluation_id)
+
+    def record_view(self, username, resource_id):
+        self.viewed[username].add(resource_id)
+
+    @classmethod
+    def from_django(cls):
+        """Graphe construit depuis les tables Django (les compétences n'existent que dans Neo4j)"""
+        from django.contrib.auth import get_user_model
+        from base.models import Course, Enrollment, ResourceView, Submission
+
+        graph = cls()
+        for username, role in get_user_model().objects.values_list('username', 'role'):
+            graph.add_user(username, role)
+        for course in Course.objects.values(
+            'pk', 'title', 'level', 'description', 'image', 'instructor__username'
+        ):
+            graph.add_course(
+                course['pk'], course['title'],
+                instructor=course['instructor__username'],
+                level=course['level'],
+                description=course['description'],
+                image_path=course['image'] or ''
+            )
+        for username, course_id in Enrollment.objects.values_list('student__username', 'course_id'):
+            graph.enroll(username, course_id)
+        for username, evaluation_id in Submission.objects.filter(passed=True).values_list(
+            'student__username', 'evaluation_id'
+        ):
+            graph.record_submission(username, evaluation_id, True)
+        for username, resource_id in ResourceView.objects.values_list('student__username', 'resource_id'):
+            graph.record_view(username, resource_id)
+        return graph
+
+    # -------------------------------------------------
+    # Parcours
+    # -------------------------------------------------
+
+    def _row(self, course_id, score, method, **extra):
+        course = self.courses[course_id]
+        return {
+            'course_uid': course['uid'],
+            'title': course['title'],
+            'level': course['level'],
+            'description': truncate_description(course['description']),
+            'image_path': course['image_path'],
+            'score': score,
+            'instructor': course['instructor'],
+            'method': method,
+            **extra,
+            'course_id': course_id,
+        }
+
+    @staticmethod
+    def _top(scores, limit):
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def _collaborative_scores(self, username, limit):
+        mine = self.enrolled.get(username, set())
+        others = defaultdict(set)
+        for course_id in mine:
+            for other in self.students[course_id]:
+                if other == username:
+                    continue
+                for rec in self.enrolled[other]:
+                    if rec not in mine:
+                        others[rec].add(other)
+        return self._top({c: len(users) for c, users in others.items() if c in self.courses}, limit)
+
+    def _skill_scores(self, username, limit):
+        mine = self.enrolled.get(username, set())
+        shared = defaultdict(set)
+        for course_id in mine:
+            for skill in self.course_skills.get(course_id, ()):
+                for rec in self.skill_courses[skill]:
+                    if rec not in mine:
+                        shared[rec].add(skill)
+        top = self._top({c: len(skills) for c, skills in shared.items() if c in self.courses}, limit)
+        return [(c, score, sorted(shared[c])) for c, score in top]
+
+    def _popular_scores(self, username, limit):
+        mine = self.enrolled.get(username, set())
+        return self._top(
+            {c: len(self.students.get(c, ())) for c in self.courses if c not in mine}, limit
+        )
+
+    def collaborative(self, username, limit):
+        with self._lock:
+            return [
+                self._row(c, score, 'collaborative')
+                for c, score in self._collaborative_scores(username, limit)
+            ]
+
+    def shared_skills(self, username, limit):
+        with self._lock:
+            return [
+                self._row(c, score, 'skill', skills=skills[:3])
+                for c, score, skills in self._skill_scores(username, limit)
+            ]
+
+    def popular(self, username, limit):
+        with self._lock:
+            return [self._row(c, score, 'popular') for c, score in self._popular_scores(username, limit)]
+
+    def hybrid_batch(self, usernames, limit, weights):
+        """Même combinaison que la requête Cypher: score normalisé par stratégie, pondéré, sommé"""
+        with self._lock:
+            recommendations = {}
+            for username in usernames:
+                known = username in self.roles or username in self.enrolled
+                strategies = [
+                    ('popular', [(c, s, []) for c, s in self._popular_scores(username, limit)]),
+                ]
+                if known:
+                    strategies = [
+                        ('collaborative', [(c, s, []) for c, s in self._collaborative_scores(username, limit)]),
+                        ('skill', self._skill_scores(username, limit)),
+                    ] + strategies
+
+                contributions = defaultdict(list)
+                for method, rows in strategies:
+                    top = max((score for _, score, _ in rows), default=0)
+                    for course_id, score, skills in rows:
+                        norm = score / top if top else 0.0
+                        contributions[course_id].append((norm * weights[method], method, score, skills))
+
+                blended = {c: sum(w for w, _, _, _ in parts) for c, parts in contributions.items()}
+                results = []
+                for course_id, total in self._top(blended, limit):
+                    parts = sorted(contributions[course_id], key=lambda part: -part[0])
+                    results.append(self._row(
+                        course_id, parts[0][2], parts[0][1],
+                        skills=[skill for part in parts for skill in part[3]][:3],
+                        blended_score=round(total, 3),
+                        strategies=[part[1] for part in parts]
+                    ))
+                recommendations[username] = results
+            return recommendations
+
+    def similar_courses(self, course_id, limit):
+        with self._lock:
+            common = defaultdict(int)
+            for student in self.students.get(course_id, ()):
+                for other in self.enrolled[student]:
+                    if other != course_id:
+                        common[other] += 1
+            return [
+                {
+                    'course_uid': self.courses[c]['uid'],
+                    'title': self.courses[c]['title'],
+                    'level': self.courses[c]['level'],
+                    'similarity_score': score,
+                    'instructor': self.courses[c]['instructor'],
+                    'course_id': c
+                }
+                for c, score in self._top({c: n for c, n in common.items() if c in self.courses}, limit)
+            ]
+
+    def student_stats(self, username):
+        with self._lock:
+            if username not in self.roles and username not in self.enrolled:
+                return {}
+            courses = self.enrolled.get(username, set())
+            completions = [self.completion.get((username, c), 0.0) for c in courses]
+            return {
+                'courses_enrolled': len(courses),
+                'avg_completion': round(sum(completions) / len(completions), 1) if completions else 0,
+                'evaluations_passed': len(self.passed.get(username, ())),
+                'resources_viewed': len(self.viewed.get(username, ()))
+            }
+
+    def instructor_stats(self, username):
+        with self._lock:
+            courses = self.teaches.get(username, set())
+            if not courses:
+                return {}
+            students = set()
+            for course_id in courses:
+                students |= self.students.get(course_id, set())
+            return {
+                'courses_created': len(courses),
+                'total_students': len(students)
+            }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_graph_backend():
+    """Backend du processus (settings.GRAPH_BACKEND); le MemoryBackend est chargé depuis Django"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from django.conf import settings
+                name = getattr(settings, 'GRAPH_BACKEND', 'neo4j')
+                if name == 'memory':
+                    _backend = MemoryBackend.from_django()
+                elif name == 'neo4j':
+                    _backend = Neo4jBackend()
+                else:
+                    raise ValueError(f"GRAPH_BACKEND inconnu: {name}")
+                logger.info(f"Graph backend: {_backend.name}")
+    return _backend
+
+
+def set_graph_backend(backend):
+    """Remplacer le backend du processus (tests, benchmarks); None: relire les settings"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,270 @@
+"""
+Embeddings FastRP des cours et des étudiants, servis par un k-NN en mémoire
+Calcul: GDS FastRP, ou projection aléatoire FastRP en NumPy/SciPy sur le graphe
+inscriptions + compétences (User-ENROLLED_IN-Course-TEACHES_SKILL-Skill).
+
+Stockage (settings.RECOMMENDATION_EMBEDDINGS_DIR):
+    embeddings.npy       matrice float32 (n_nodes × dimension), lignes normalisées L2
+    embeddings_ids.json  {"courses": [PK Course...], "users": [username...], ...}
+                         lignes: les cours d'abord, puis les étudiants
+
+Sélection: settings.RECOMMENDATION_ENGINE = 'embedding'
+Le calcul est fait hors ligne par `manage.py compute_embeddings`; à la requête,
+recommandations et cours similaires ne sont que des produits scalaires.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from base.graph_backend import truncate_description
+
+logger = logging.getLogger('base')
+
+VECTORS_FILE = 'embeddings.npy'
+IDS_FILE = 'embeddings_ids.json'
+
+
+def fastrp(adjacency, dimension=64, iteration_weights=(0.0, 1.0, 1.0), normalization_strength=0.0, seed=42):
+    """
+    FastRP (Chen et al., 2019) sur une matrice d'adjacence symétrique creuse.
+
+    Projection aléatoire très creuse (Achlioptas, s=3), propagée sur le graphe
+    normalisé par degré; l'embedding est la somme pondérée des itérations normalisées.
+    """
+    n = adjacency.shape[0]
+    rng = np.random.default_rng(seed)
+
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_degrees = np.divide(1.0, degrees, out=np.zeros_like(degrees, dtype=np.float64), where=degrees > 0)
+    transition = sparse.diags(inv_degrees) @ adjacency
+
+    s = 3.0
+    projection = rng.choice(
+        [np.sqrt(s), 0.0, -np.sqrt(s)],
+        size=(n, dimension),
+        p=[1 / (2 * s), 1 - 1 / s, 1 / (2 * s)]
+    )
+    if normalization_strength:
+        projection = sparse.diags(np.power(np.maximum(degrees, 1), normalization_strength)) @ projection
+
+    embedding = np.zeros((n, dimension), dtype=np.float64)
+    current = projection
+    for weight in iteration_weights:
+        current = transition @ current
+        if weight:
+            embedding += weight * normalize_rows(current)
+    return normalize_rows(embedding).astype(np.float32)
+
+
+def normalize_rows(matrix):
+    """Normalisation L2 ligne par ligne (les lignes nulles restent nulles)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class EmbeddingIndex:
+    """
+    k-NN sur les embeddings (produit scalaire = cosinus, les vecteurs étant normalisés).
+
+    Recherche exhaustive vectorisée par défaut. Avec `n_lists` > 0, un index IVF
+    (k-means) ne compare la requête qu'aux cours des `n_probe` listes les plus proches.
+    """
+
+    def __init__(self, vectors, n_lists=0, n_probe=4, seed=42):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.n_probe = n_probe
+        self.centroids = None
+        self.lists = None
+        if n_lists and len(self.vectors) > n_lists:
+            self._train_ivf(n_lists, seed)
+
+    def _train_ivf(self, n_lists, seed, iterations=10):
+        """k-means sphérique (quelques itérations de Lloyd)"""
+        rng = np.random.default_rng(seed)
+        centroids = self.vectors[rng.choice(len(self.vectors), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(self.vectors @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = self.vectors[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = normalize_rows(centroids)
+        assignment = np.argmax(self.vectors @ centroids.T, axis=1)
+        self.centroids = centroids.astype(np.float32)
+        self.lists = [np.flatnonzero(assignment == c) for c in range(n_lists)]
+
+    def search(self, query, k, exclude=()):
+        """
+        Les k lignes les plus proches du vecteur `query`.
+
+        Returns:
+            liste de (ligne, score) triée par score décroissant
+        """
+        if self.centroids is None:
+            candidates = np.arange(len(self.vectors))
+        else:
+            probes = np.argsort(-(self.centroids @ query))[:self.n_probe]
+            candidates = np.concatenate([self.lists[p] for p in probes])
+
+        if exclude:
+            candidates = candidates[~np.isin(candidates, list(exclude))]
+        if not len(candidates):
+            return []
+
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+class EmbeddingStore:
+    """Embeddings chargés en mémoire: vecteurs, table des identifiants et index k-NN des cours"""
+
+    def __init__(self, vectors, ids, n_lists=0, n_probe=4):
+        self.vectors = vectors
+        self.ids = ids
+        self.course_ids = ids['courses']
+        self.course_rows = {pk: row for row, pk in enumerate(self.course_ids)}
+        offset = len(self.course_ids)
+        self.user_rows = {username: offset + row for row, username in enumerate(ids['users'])}
+        self.course_index = EmbeddingIndex(vectors[:offset], n_lists=n_lists, n_probe=n_probe)
+
+    @staticmethod
+    def directory():
+        from django.conf import settings
+        return Path(getattr(settings, 'RECOMMENDATION_EMBEDDINGS_DIR', settings.BASE_DIR / 'embeddings'))
+
+    @classmethod
+    def save(cls, vectors, courses, users, metadata=None, directory=None):
+        """Écrire la matrice float32 et la table des identifiants (remplacement atomique)"""
+        directory = Path(directory or cls.directory())
+        directory.mkdir(parents=True, exist_ok=True)
+
+        vectors_tmp = directory / f'{VECTORS_FILE}.tmp'
+        with open(vectors_tmp, 'wb') as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+        ids_tmp = directory / f'{IDS_FILE}.tmp'
+        with open(ids_tmp, 'w', encoding='utf-8') as f:
+            json.dump({**(metadata or {}), 'courses': list(courses), 'users': list(users)}, f)
+
+        os.replace(vectors_tmp, directory / VECTORS_FILE)
+        os.replace(ids_tmp, directory / IDS_FILE)
+
+    @classmethod
+    def load(cls, directory=None):
+        from django.conf import settings
+
+        directory = Path(directory or cls.directory())
+        vectors = np.load(directory / VECTORS_FILE, mmap_mode='r')
+        with open(directory / IDS_FILE, encoding='utf-8') as f:
+            ids = json.load(f)
+        return cls(
+            vectors, ids,
+            n_lists=getattr(settings, 'RECOMMENDATION_EMBEDDING_IVF_LISTS', 0),
+            n_probe=getattr(settings, 'RECOMMENDATION_EMBEDDING_IVF_PROBES', 4)
+        )
+
+    def recommend(self, username, enrolled_course_ids, limit=5):
+        """Cours les plus proches du vecteur de l'étudiant: [(PK Course, score)]"""
+        row = self.user_rows.get(username)
+        if row is None:
+            return []
+        exclude = {self.course_rows[pk] for pk in enrolled_course_ids if pk in self.course_rows}
+        return [
+            (self.course_ids[r], score)
+            for r, score in self.course_index.search(np.asarray(self.vectors[row]), limit, exclude)
+        ]
+
+    def similar_courses(self, course_id, limit=3):
+        """Cours les plus proches d'un cours: [(PK Course, score)]"""
+        row = self.course_rows.get(course_id)
+        if row is None:
+            return []
+        return [
+            (self.course_ids[r], score)
+            for r, score in self.course_index.search(np.asarray(self.vectors[row]), limit, {row})
+        ]
+
+
+_store = None
+_store_mtime = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store():
+    """Store partagé du processus, rechargé quand `compute_embeddings` a réécrit les fichiers"""
+    global _store, _store_mtime
+
+    path = EmbeddingStore.directory() / IDS_FILE
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if _store is None or mtime != _store_mtime:
+        with _store_lock:
+            if _store is None or mtime != _store_mtime:
+                _store = EmbeddingStore.load()
+                _store_mtime = mtime
+                logger.info(f"Embeddings loaded: {_store.vectors.shape} from {path.parent}")
+    return _store
+
+
+def _course_rows(scored, method, score_key='score'):
+    """Résultats k-NN → dicts au format du moteur de recommandation"""
+    from base.models import Course
+
+    courses = {
+        row['pk']: row
+        for row in Course.objects.filter(pk__in=[pk for pk, _ in scored]).values(
+            'pk', 'title', 'level', 'description', 'image', 'instructor__username'
+        )
+    }
+    results = []
+    for pk, score in scored:
+        course = courses.get(pk)
+        if course is None:
+            continue
+        results.append({
+            'course_uid': None,
+            'title': course['title'],
+            'level': course['level'],
+            'description': truncate_description(course['description']),
+            'image_path': course['image'] or '',
+            score_key: round(score, 3),
+            'instructor': course['instructor__username'],
+            'method': method,
+            'course_id': pk
+        })
+    return results
+
+
+def recommend_from_embeddings(username, limit=5):
+    """Recommandations par plus proches voisins (aucun parcours de graphe)"""
+    from base.models import Enrollment
+
+    store = get_embedding_store()
+    if store is None:
+        logger.warning('Embeddings not computed yet (manage.py compute_embeddings)')
+        return []
+    enrolled = Enrollment.objects.filter(student__username=username).values_list('course_id', flat=True)
+    return _course_rows(store.recommend(username, set(enrolled), limit), 'embedding')
+
+
+def similar_courses_from_embeddings(course_id, limit=3):
+    """Cours similaires par plus proches voisins"""
+    store = get_embedding_store()
+    if store is None:
+        return []
+    rows = _course_rows(store.similar_courses(course_id, limit), 'embedding', score_key='similarity_score')
+    for row in rows:
+        for key in ('description', 'image_path', 'method'):
+            row.pop(key)
+    return rows
@@ -0,0 +1,285 @@
+"""
+Réconciliation SQL ↔ Neo4j par empreintes de tranches de PK
+Détecte les écarts (signal perdu, titre modifié, cours supprimé dans Django mais
+resté dans le graphe) sans comparer toute la base ligne à ligne.
+
+1. Chaque étape de migration (voir BULK_STEPS dans base/graph_sync.py) est découpée
+   en tranches de `chunk_size` PK. Pour chaque tranche, la base SQL et Neo4j calculent
+   les mêmes agrégats (GROUP BY côté serveur, une requête par côté):
+       nœuds:     (nombre, somme des PK)
+       relations: (nombre de couples distincts, somme des PK d'arrivée)
+   Pour les nœuds aux agrégats égaux, le champ texte est comparé par un md5 des couples
+   (PK, texte): aucune fonction de hachage n'est commune à SQL et à Cypher sans APOC,
+   il est donc relu tranche par tranche (plage de PK des deux côtés) et haché en Python,
+   si bien qu'un renommage de même longueur est détecté.
+2. Seules les tranches dont les empreintes diffèrent sont relues (les deux côtés)
+   et comparées champ par champ. Avec `deep=True`, toutes les tranches le sont:
+   seul moyen de voir un changement hors de l'empreinte (note d'une soumission,
+   ordre d'un module...), d'où son usage par reconcile_mutable_steps.
+3. Avec `repair=True`, les lignes manquantes ou modifiées sont réécrites avec la
+   requête UNWIND de l'étape, et les nœuds/relations orphelins supprimés.
+
+Utilisé par `manage.py reconcile_graph`.
+"""
+
+import hashlib
+import logging
+
+from django.db import connection
+from neomodel import db
+
+from base.graph_sync import BULK_STEPS, outbox_watermark
+
+logger = logging.getLogger('base')
+
+FLOAT_TOLERANCE = 1e-3
+
+
+def get_step(name):
+    return next(step for step in BULK_STEPS if step.name == name)
+
+
+# =====================================================
+# EMPREINTES DES TRANCHES
+# =====================================================
+
+def _chunk_sql(column, chunk_size):
+    """Numéro de tranche en SQL (division entière, y compris sous MySQL où `/` est décimal)"""
+    return f'({column} - {column} % {int(chunk_size)}) / {int(chunk_size)}'
+
+
+def sql_digests(step, chunk_size):
+    """
+    Agrégats de chaque tranche calculés par la base SQL (aucune ligne lue en Python):
+    nœuds (nombre, somme des PK), relations (nombre de couples distincts, somme des PK d'arrivée)
+    """
+    meta = step.get_model()._meta
+    table = connection.ops.quote_name(meta.db_table)
+    if step.phase == 'nodes':
+        pk = connection.ops.quote_name(meta.pk.column)
+        query = f"SELECT {_chunk_sql(pk, chunk_size)}, COUNT(*), SUM({pk}) FROM {table} GROUP BY {_chunk_sql(pk, chunk_size)}"
+    else:
+        # Couples distincts (plusieurs tentatives → une seule relation MERGE)
+        start = connection.ops.quote_name(meta.get_field(step.graph[3]).column)
+        end = connection.ops.quote_name(meta.get_field(step.graph[4]).column)
+        query = f"""
+            SELECT {_chunk_sql('pairs.s', chunk_size)}, COUNT(*), SUM(pairs.e)
+            FROM (SELECT DISTINCT {start} AS s, {end} AS e FROM {table} WHERE {start} IS NOT NULL) pairs
+            GROUP BY {_chunk_sql('pairs.s', chunk_size)}
+        """
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        return {int(row[0]): (row[1], int(row[2])) for row in cursor.fetchall()}
+
+
+def graph_digests(step, chunk_size):
+    """Mêmes agrégats côté Neo4j, calculés par le serveur: {tranche: (nombre, somme)}"""
+    if step.phase == 'nodes':
+        result, _ = db.cypher_query(
+            f"""
+            MATCH (n:{step.graph})
+            WHERE n.django_id > 0
+            RETURN n.django_id / $chunk_size AS chunk, count(*), sum(n.django_id)
+            """,
+            {'chunk_size': chunk_size}
+        )
+    else:
+        start_label, rel_type, end_label = step.graph[:3]
+        result, _ = db.cypher_query(
+            f"""
+            MATCH (a:{start_label})-[:{rel_type}]->(b:{end_label})
+            WHERE a.django_id > 0 AND b.django_id IS NOT NULL
+            WITH DISTINCT a.django_id AS s, b.django_id AS e
+            RETURN s / $chunk_size AS chunk, count(*), sum(e)
+            """,
+            {'chunk_size': chunk_size}
+        )
+    return {row[0]: (row[1], row[2]) for row in result}
+
+
+def text_digest(rows):
+    """md5 des couples (PK, texte) d'une tranche, triés par PK"""
+    digest = hashlib.md5()
+    for pk, text in rows:
+        digest.update(f'{pk}:{text or ""}\x00'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def same_text(step, chunk, chunk_size):
+    """
+    Le champ texte d'une tranche de nœuds est-il identique des deux côtés ?
+    Aucune fonction de hachage n'est commune au SQL et à Cypher sans APOC: le texte
+    est relu, tranche par tranche (plage de PK des deux côtés), et haché en Python.
+    """
+    low, high = chunk * chunk_size, (chunk + 1) * chunk_size
+    sql_rows = (
+        step.get_model().objects
+        .filter(pk__gte=low, pk__lt=high)
+        .order_by('pk')
+        .values_list('pk', step.text_field)
+    )
+    graph_rows, _ = db.cypher_query(
+        f"""
+        MATCH (n:{step.graph})
+        WHERE n.django_id >= $low AND n.django_id < $high
+        RETURN n.django_id, n.{step.text_field}
+        ORDER BY n.django_id
+        """,
+        {'low': low, 'high': high}
+    )
+    return text_digest(sql_rows) == text_digest(graph_rows)
+
+
+def mismatched_chunks(sql, graph, step=None, chunk_size=None):
+    """
+    Tranches présentes d'un seul côté ou dont les agrégats diffèrent; pour une étape
+    de nœuds, aussi celles aux agrégats égaux dont le champ texte diffère (same_text).
+    """
+    chunks = sorted(set(sql) | set(graph))
+    mismatched = [chunk for chunk in chunks if sql.get(chunk) != graph.get(chunk)]
+    if step is not None and step.phase == 'nodes':
+        mismatched += [
+            chunk for chunk in chunks
+            if sql.get(chunk) == graph.get(chunk) and not same_text(step, chunk, chunk_size)
+        ]
+    return sorted(mismatched)
+
+
+# =====================================================
+# COMPARAISON LIGNE À LIGNE (tranches divergentes)
+# =====================================================
+
+def _same_value(expected, actual):
+    if expected is None or actual is None:
+        return expected is None and actual is None
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            return abs(float(expected) - float(actual)) <= FLOAT_TOLERANCE
+        except (TypeError, ValueError):
+            return False
+    return expected == actual
+
+
+def compare_rows(sql_rows, graph_rows):
+    """
+    Comparer deux tranches {clé: propriétés}.
+    Seules les propriétés écrites par la migration sont comparées; une valeur
+    None côté SQL correspond à une propriété absente dans le graphe.
+
+    Returns:
+        (clés manquantes dans le graphe, clés orphelines, clés modifiées)
+    """
+    missing = sorted(set(sql_rows) - set(graph_rows))
+    orphans = sorted(set(graph_rows) - set(sql_rows))
+    changed = sorted(
+        key for key in set(sql_rows) & set(graph_rows)
+        if not all(_same_value(value, graph_rows[key].get(field)) for field, value in sql_rows[key].items())
+    )
+    return missing, orphans, changed
+
+
+def _chunk_rows(step, chunk, chunk_size):
+    """Lignes d'une tranche des deux côtés: ({clé: ligne UNWIND}, {clé: propriétés du graphe})"""
+    low, high = chunk * chunk_size, (chunk + 1) * chunk_size
+
+    if step.phase == 'nodes':
+        queryset = step.queryset().filter(pk__gte=low, pk__lt=high)
+        sql_rows = {obj.pk: step.to_row(obj) for obj in queryset}
+        result, _ = db.cypher_query(
+            f"""
+            MATCH (n:{step.graph})
+            WHERE n.django_id >= $low AND n.django_id < $high
+            RETURN n.django_id, properties(n)
+            """,
+            {'low': low, 'high': high}
+        )
+        return sql_rows, {row[0]: row[1] for row in result}
+
+    start_label, rel_type, end_label, start_field = step.graph[:4]
+    queryset = step.queryset().filter(**{f'{start_field}__gte': low, f'{start_field}__lt': high})
+    # Ordre des PK: la dernière ligne d'un couple est celle que MERGE a conservée
+    sql_rows = {}
+    for obj in queryset:
+        row = step.to_row(obj)
+        sql_rows[(row['start_id'], row['end_id'])] = row
+    result, _ = db.cypher_query(
+        f"""
+        MATCH (a:{start_label})-[r:{rel_type}]->(b:{end_label})
+        WHERE a.django_id >= $low AND a.django_id < $high AND b.django_id IS NOT NULL
+        RETURN a.django_id, b.django_id, properties(r)
+        """,
+        {'low': low, 'high': high}
+    )
+    return sql_rows, {(row[0], row[1]): row[2] for row in result}
+
+
+# =====================================================
+# RÉPARATION
+# =====================================================
+
+def _repair(step, rows, orphans, event_id):
+    """
+    Réécrire les lignes manquantes/modifiées et supprimer les orphelins.
+    event_id: filigrane de l'outbox lu avant les lignes SQL (voir outbox_watermark)
+    """
+    if step.phase == 'nodes':
+        if orphans:
+            db.cypher_query(
+                f"MATCH (n:{step.graph}) WHERE n.django_id IN $ids DETACH DELETE n",
+                {'ids': orphans}
+            )
+    elif orphans:
+        start_label, rel_type, end_label = step.graph[:3]
+        db.cypher_query(
+            f"""
+            UNWIND $pairs AS pair
+            MATCH (a:{start_label} {{django_id: pair[0]}})-[r:{rel_type}]->(b:{end_label} {{django_id: pair[1]}})
+            DELETE r
+            """,
+            {'pairs': [list(pair) for pair in orphans]}
+        )
+    if rows:
+        db.cypher_query(step.query, {'rows': rows, 'event_id': event_id})
+
+
+def reconcile_step(step, chunk_size=1000, deep=False, repair=False):
+    """
+    Réconcilier une étape de migration.
+
+    Returns:
+        dict {'step', 'chunks', 'mismatched_chunks', 'missing', 'orphans', 'changed', 'repaired'}
+        (missing/orphans/changed: listes de clés - PK, ou couples de PK pour une relation;
+        mismatched_chunks: tranches où la comparaison ligne à ligne a trouvé un écart)
+    """
+    sql = sql_digests(step, chunk_size)
+    graph = graph_digests(step, chunk_size)
+    chunks = sorted(set(sql) | set(graph)) if deep else mismatched_chunks(sql, graph, step, chunk_size)
+
+    report = {
+        'step': step.name,
+        'chunks': len(set(sql) | set(graph)),
+        'mismatched_chunks': 0,
+        'missing': [],
+        'orphans': [],
+        'changed': [],
+        'repaired': 0,
+    }
+    for chunk in chunks:
+        event_id = outbox_watermark()
+        sql_rows, graph_rows = _chunk_rows(step, chunk, chunk_size)
+        expected = {key: row['props'] for key, row in sql_rows.items()}
+        missing, orphans, changed = compare_rows(expected, graph_rows)
+        report['missing'] += missing
+        report['orphans'] += orphans
+        report['changed'] += changed
+        if missing or orphans or changed:
+            report['mismatched_chunks'] += 1
+
+        if repair and (missing or orphans or changed):
+            _repair(step, [sql_rows[key] for key in missing + changed], orphans, event_id)
+            report['repaired'] += len(missing) + len(orphans) + len(changed)
+            logger.info(
+                f"Graph reconcile {step.name} chunk {chunk}: "
+                f"{len(missing)} missing, {len(orphans)} orphans, {len(changed)} changed repaired"
+            )
+    return report
@@ -0,0 +1,210 @@
+"""
+Schéma Neo4j (index et contraintes) déclaré par le code
+Chaque index est rattaché aux requêtes qui en dépendent (`used_by`): un chemin de
+requête sans index (recherche d'ancre par étiquette complète, parcours de type de
+relation sans index de lookup) est une régression silencieuse de performance.
+
+    apply_schema()   CREATE ... IF NOT EXISTS pour chaque entrée (idempotent)
+    verify_schema()  SHOW INDEXES: entrées absentes ou pas encore ONLINE
+    ensure_schema()  les deux, puis SchemaError si un index manque
+
+Exécuté au déploiement (`manage.py ensure_graph_schema`), par `setup_gds`, et au
+démarrage si settings.NEO4J_SCHEMA_ON_STARTUP est vrai.
+
+La vérification compare le schéma (entité, étiquette/type, propriété) et non le nom:
+un index équivalent créé autrement (install_labels de neomodel, index d'une contrainte,
+ancienne version de setup_gds) satisfait l'entrée. Une entrée `unique` exige un index
+porté par une contrainte: un index RANGE simple sur la même propriété ne suffit pas.
+"""
+
+import logging
+
+from neomodel import db
+
+from base.circuit_breaker import AVAILABILITY_ERRORS, CircuitOpenError
+
+logger = logging.getLogger('base')
+
+
+class SchemaError(Exception):
+    """Un ou plusieurs index requis par les requêtes sont absents de Neo4j"""
+
+
+class IndexSpec:
+    """
+    Index requis par une ou plusieurs requêtes.
+
+    entity: 'node' ou 'relationship'
+    token:  étiquette ou type de relation (None pour un index de lookup)
+    prop:   propriété indexée (None pour un index de lookup)
+    unique: contrainte d'unicité (index associé) au lieu d'un index simple
+    """
+
+    def __init__(self, entity, token=None, prop=None, unique=False, used_by=''):
+        self.entity = entity
+        self.token = token
+        self.prop = prop
+        self.unique = unique
+        self.used_by = used_by
+
+    @property
+    def is_lookup(self):
+        return self.token is None
+
+    @property
+    def name(self):
+        if self.is_lookup:
+            return f'{self.entity}_lookup_idx'
+        suffix = 'unique' if self.unique else 'idx'
+        return f'{self.token.lower()}_{self.prop}_{suffix}'
+
+    @property
+    def pattern(self):
+        if self.entity == 'node':
+            return f'(n:{self.token})' if self.token else '(n)'
+        return f'()-[n:{self.token}]-()' if self.token else '()-[n]-()'
+
+    def statement(self):
+        if self.is_lookup:
+            function = 'labels(n)' if self.entity == 'node' else 'type(n)'
+            return f'CREATE LOOKUP INDEX {self.name} IF NOT EXISTS FOR {self.pattern} ON EACH {function}'
+        if self.unique:
+            return f'CREATE CONSTRAINT {self.name} IF NOT EXISTS FOR {self.pattern} REQUIRE n.{self.prop} IS UNIQUE'
+        return f'CREATE INDEX {self.name} IF NOT EXISTS FOR {self.pattern} ON (n.{self.prop})'
+
+    def matches(self, row):
+        """Vrai si une ligne de SHOW INDEXES couvre cette entrée"""
+        if row['entityType'] != self.entity.upper():
+            return False
+        if self.is_lookup:
+            return row['type'] == 'LOOKUP'
+        if self.unique and not self.is_constraint_index(row):
+            # Un index simple sur la même propriété n'empêche pas les doublons
+            return False
+        return (
+            row['type'] in ('RANGE', 'BTREE')
+            and row['labelsOrTypes'] == [self.token]
+            and row['properties'] == [self.prop]
+        )
+
+    @staticmethod
+    def is_constraint_index(row):
+        """Index porté par une contrainte d'unicité (owningConstraint en 5.x, uniqueness en 4.x)"""
+        return bool(row.get('owningConstraint')) or row.get('uniqueness') == 'UNIQUE'
+
+    def __str__(self):
+        if self.is_lookup:
+            return f'lookup {self.entity}'
+        return f'{self.token}.{self.prop}'
+
+
+GRAPH_SCHEMA = [
+    # Lookup par étiquette / type de relation (MATCH (n:Label), parcours [:TYPE] sans ancre)
+    IndexSpec('node', used_by='MATCH par étiquette (count_entities, reconcile_graph, neo_admin)'),
+    IndexSpec('relationship', used_by='parcours TEACHES_SKILL, ENROLLED_IN, SIMILAR_TO (graph_backend)'),
+
+    # Clés d'identité
+    IndexSpec('node', 'NeoUser', 'uid', unique=True, used_by='neo_admin'),
+    IndexSpec('node', 'NeoCourse', 'uid', unique=True, used_by='get_modules_ordered, neo_admin'),
+    IndexSpec('node', 'NeoModule', 'uid', unique=True, used_by='get_resources_ordered'),
+    IndexSpec('node', 'NeoResource', 'uid', unique=True),
+    IndexSpec('node', 'NeoEvaluation', 'uid', unique=True),
+    IndexSpec('node', 'NeoQuestion', 'uid', unique=True),
+    IndexSpec('node', 'NeoSkill', 'uid', unique=True),
+    IndexSpec('node', 'NeoUser', 'username', unique=True, used_by='requêtes de recommandation, statistiques'),
+
+    # Clés Django (ancres des requêtes UNWIND/MERGE, de l'outbox et des cours similaires)
+    IndexSpec('node', 'NeoUser', 'django_id', unique=True, used_by='BULK_STEPS, process_graph_outbox'),
+    IndexSpec('node', 'NeoCourse', 'django_id', unique=True, used_by='SIMILAR_*_QUERY, COURSE_TREE_QUERY, BULK_STEPS'),
+    IndexSpec('node', 'NeoModule', 'django_id', unique=True, used_by='BULK_STEPS'),
+    IndexSpec('node', 'NeoResource', 'django_id', unique=True, used_by='BULK_STEPS'),
+    IndexSpec('node', 'NeoEvaluation', 'django_id', unique=True, used_by='BULK_STEPS'),
+    IndexSpec('node', 'NeoQuestion', 'django_id', unique=True, used_by='BULK_STEPS'),
+
+    # Filtres et tris
+    IndexSpec('node', 'NeoUser', 'email', used_by='get_or_create_from_django_user'),
+    IndexSpec('node', 'NeoUser', 'role', used_by='neo_admin'),
+    IndexSpec('node', 'NeoCourse', 'title', used_by='migration (clé héritée)'),
+    IndexSpec('node', 'NeoCourse', 'level'),
+    IndexSpec('node', 'NeoCourse', 'enrollment_count'),
+    IndexSpec('node', 'NeoModule', 'title'),
+    IndexSpec('node', 'NeoEvaluation', 'title'),
+    IndexSpec('node', 'NeoSkill', 'name', used_by='create_skills, SKILL_QUERY'),
+
+    # Propriétés de relations
+    IndexSpec('relationship', 'SUBMITTED', 'passed', used_by='STUDENT_STATS_QUERY'),
+    IndexSpec('relationship', 'SIMILAR_TO', 'similarity_score', used_by='SIMILAR_PRECOMPUTED_QUERY'),
+]
+
+
+def apply_schema(specs=GRAPH_SCHEMA):
+    """
+    Créer les index et contraintes absents (IF NOT EXISTS).
+
+    Returns:
+        {nom: message d'erreur} des créations refusées par Neo4j (ex: index simple
+        déjà présent à la place d'une contrainte); verify_schema tranche.
+    """
+    errors = {}
+    for spec in specs:
+        try:
+            db.cypher_query(spec.statement())
+        except (CircuitOpenError,) + AVAILABILITY_ERRORS:
+            raise
+        except Exception as e:
+            errors[spec.name] = str(e)
+            logger.warning(f"Graph schema {spec.name}: {e}")
+    return errors
+
+
+def show_indexes():
+    """Lignes de SHOW INDEXES sous forme de dicts"""
+    result, columns = db.cypher_query('SHOW INDEXES')
+    return [dict(zip(columns, row)) for row in result]
+
+
+def missing_indexes(specs, rows):
+    """Entrées sans index ONLINE correspondant dans `rows` (lignes de SHOW INDEXES)"""
+    online = [row for row in rows if row.get('state') == 'ONLINE']
+    return [spec for spec in specs if not any(spec.matches(row) for row in online)]
+
+
+def verify_schema(specs=GRAPH_SCHEMA):
+    return missing_indexes(specs, show_indexes())
+
+
+def ensure_schema(specs=GRAPH_SCHEMA, timeout=300):
+    """
+    Appliquer puis vérifier le schéma.
+    Attend la fin du peuplement des index créés (db.awaitIndexes), au plus `timeout` s.
+
+    Raises:
+        SchemaError: un index requis est absent ou n'est pas ONLINE
+    """
+    apply_schema(specs)
+    try:
+        db.cypher_query(f'CALL db.awaitIndexes({int(timeout)})')
+    except Exception as e:
+        logger.warning(f"Graph schema: index population still running: {e}")
+
+    missing = verify_schema(specs)
+    if missing:
+        details = '; '.join(f'{spec} ({spec.used_by or "requis"})' for spec in missing)
+        logger.error(f"Graph schema incomplete: {details}")
+        raise SchemaError(f'{len(missing)} index Neo4j manquants: {details}')
+    return specs
+
+
+def bootstrap_schema():
+    """
+    Schéma au démarrage (NEO4J_SCHEMA_ON_STARTUP).
+    Neo4j injoignable: journalisé, le démarrage continue (le disjoncteur prend le relais);
+    index manquant: SchemaError, le démarrage échoue.
+    """
+    from base.neo_connection import ensure_neo4j_connection
+
+    try:
+        ensure_neo4j_connection()
+        ensure_schema()
+    except (CircuitOpenError,) + AVAILABILITY_ERRORS as e:
+        logger.error(f"Graph schema not verified, Neo4j unavailable: {e}")
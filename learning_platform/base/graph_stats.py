@@ -0,0 +1,88 @@
+"""
+Statistiques du graphe Neo4j lues dans le count store
+`MATCH (n) RETURN labels(n)[0], count(n)` et `MATCH ()-[r]->() RETURN type(r), count(r)`
+parcourent tout le graphe. Neo4j tient à jour un compteur par étiquette et par type de
+relation: `MATCH (n:Label) RETURN count(n)` et `MATCH ()-[r:TYPE]->() RETURN count(r)`
+sont lus directement dans ce count store, sans toucher aux nœuds.
+
+    1. db.labels() / db.relationshipTypes()      étiquettes et types connus
+    2. une requête UNION ALL de lectures du count store (une ligne par étiquette/type,
+       plus les totaux)
+
+Coût O(étiquettes + types), quelle que soit la taille du graphe. Le résultat est mis en
+cache NEO_ADMIN_STATS_TTL secondes (dashboard de l'admin Neo4j, setup_gds).
+"""
+
+import logging
+
+from django.conf import settings
+from neomodel import db
+
+from base.recommendation_cache import recommendation_cache
+
+logger = logging.getLogger('base')
+
+STATS_CACHE_KEY = 'graph_stats:counts'
+
+
+def _quote(token):
+    """Échapper une étiquette ou un type de relation pour l'insérer dans une requête"""
+    return '`' + token.replace('`', '``') + '`'
+
+
+def count_store_query(labels, rel_types):
+    """
+    Requête UNION ALL: une lecture du count store par étiquette et par type, plus les
+    totaux. Chaque ligne renvoie (kind, position dans labels/rel_types, count).
+    """
+    parts = [
+        f"MATCH (n:{_quote(label)}) RETURN 'node' AS kind, {i} AS idx, count(n) AS count"
+        for i, label in enumerate(labels)
+    ]
+    parts += [
+        f"MATCH ()-[r:{_quote(rel_type)}]->() RETURN 'relationship' AS kind, {i} AS idx, count(r) AS count"
+        for i, rel_type in enumerate(rel_types)
+    ]
+    # Totaux: un nœud à plusieurs étiquettes n'est compté qu'une fois
+    parts += [
+        "MATCH (n) RETURN 'total_nodes' AS kind, 0 AS idx, count(n) AS count",
+        "MATCH ()-[r]->() RETURN 'total_relationships' AS kind, 0 AS idx, count(r) AS count",
+    ]
+    return '\nUNION ALL\n'.join(parts)
+
+
+def graph_counts(use_cache=True):
+    """
+    Nombre de nœuds par étiquette et de relations par type (3 requêtes).
+
+    Returns:
+        {'node_stats': [{'label', 'count'}], 'rel_stats': [{'type', 'count'}],
+         'total_nodes': int, 'total_relationships': int}
+        (étiquettes et types sans élément omis, triés par nom)
+    """
+    if use_cache:
+        counts = recommendation_cache.get(STATS_CACHE_KEY)
+        if counts is not None:
+            return counts
+
+    labels = [row[0] for row in db.cypher_query('CALL db.labels() YIELD label RETURN label')[0]]
+    rel_types = [
+        row[0] for row in db.cypher_query('CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType')[0]
+    ]
+
+    counts = {'node_stats': [], 'rel_stats': [], 'total_nodes': 0, 'total_relationships': 0}
+    result, _ = db.cypher_query(count_store_query(labels, rel_types))
+    for kind, idx, count in result:
+        if kind == 'node':
+            counts['node_stats'].append({'label': labels[idx], 'count': count})
+        elif kind == 'relationship':
+            counts['rel_stats'].append({'type': rel_types[idx], 'count': count})
+        else:
+            counts[kind] = count
+
+    # Jetons conservés après suppression des derniers éléments: ignorés
+    counts['node_stats'] = sorted((s for s in counts['node_stats'] if s['count']), key=lambda s: s['label'])
+    counts['rel_stats'] = sorted((s for s in counts['rel_stats'] if s['count']), key=lambda s: s['type'])
+
+    recommendation_cache.set(STATS_CACHE_KEY, counts, getattr(settings, 'NEO_ADMIN_STATS_TTL', 30))
+    return counts
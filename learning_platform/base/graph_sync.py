@@ -0,0 +1,1043 @@
+"""
+Synchronisation Django → Neo4j par outbox (table GraphSyncEvent)
+
+Les signaux n'écrivent plus dans Neo4j: ils enregistrent un événement dans la même
+transaction SQL que le changement. `manage.py process_graph_outbox` applique ensuite
+les événements par lots, une requête UNWIND/MERGE par type d'opération.
+
+Idempotence: chaque nœud/relation garde l'id du dernier événement appliqué
+(`sync_event_id`); un lot rejoué après une erreur, ou un événement plus ancien,
+ne réécrit donc jamais des données plus récentes.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from neomodel import db
+
+logger = logging.getLogger('base')
+
+
+# =====================================================
+# PAYLOADS (construits dans la transaction Django)
+# =====================================================
+
+def user_payload(user):
+    """Champs du NeoUser (les dates au format de DateTimeProperty: timestamp en secondes)"""
+    return {
+        'username': user.username,
+        # Email unique dans le graphe: une chaîne vide n'est pas écrite
+        'email': user.email or None,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': getattr(user, 'role', 'Student'),
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'date_joined': user.date_joined.timestamp() if user.date_joined else None,
+    }
+
+
+def course_payload(course):
+    """Champs du NeoCourse (les dates au format de DateProperty: ISO)"""
+    return {
+        'title': course.title,
+        'description': course.description or '',
+        'level': course.level or 'Beginner',
+        'estimated_duration': course.estimated_duration or 1,
+        'start_date': course.start_date.isoformat() if course.start_date else None,
+        'end_date': course.end_date.isoformat() if course.end_date else None,
+        'image_path': course.image.name if course.image else '',
+        'instructor_id': course.instructor_id,
+    }
+
+
+def enrollment_payload(enrollment):
+    return {
+        'student_id': enrollment.student_id,
+        'course_id': enrollment.course_id,
+        'enrolled_on': enrollment.enrolled_on.isoformat() if enrollment.enrolled_on else None,
+        'certified': enrollment.certified,
+    }
+
+
+# Champs du User recopiés dans le NeoUser (last_login, password... n'y sont pas)
+USER_SYNC_FIELDS = (
+    'username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'is_staff', 'date_joined'
+)
+
+
+def snapshot_user(user):
+    """
+    Valeurs des champs synchronisés telles que chargées (ou dernièrement enregistrées).
+    Les champs différés (.only()/.defer()) ne sont pas lus, pour ne pas déclencher de requête.
+    """
+    user._graph_snapshot = {
+        field: user.__dict__[field] for field in USER_SYNC_FIELDS if field in user.__dict__
+    }
+
+
+def user_sync_changed(user, update_fields=None):
+    """
+    Un save() du User modifie-t-il le NeoUser ?
+    Non si `update_fields` ne contient aucun champ synchronisé (ex: last_login à la connexion),
+    ni si les champs synchronisés ont les mêmes valeurs qu'au chargement.
+    """
+    if update_fields is not None and not set(update_fields) & set(USER_SYNC_FIELDS):
+        return False
+    snapshot = getattr(user, '_graph_snapshot', None)
+    if snapshot is None:
+        return True
+    return any(
+        field not in snapshot or snapshot[field] != user.__dict__[field]
+        for field in USER_SYNC_FIELDS if field in user.__dict__
+    )
+
+
+def enqueue_user(user, operation='upsert'):
+    from base.models import GraphSyncEvent
+    return GraphSyncEvent.enqueue('user', operation, user.pk, user_payload(user))
+
+
+def enqueue_course(course, operation='upsert'):
+    from base.models import GraphSyncEvent
+    return GraphSyncEvent.enqueue('course', operation, course.pk, course_payload(course))
+
+
+def enqueue_enrollment(enrollment, operation='upsert'):
+    from base.models import GraphSyncEvent
+    return GraphSyncEvent.enqueue('enrollment', operation, enrollment.pk, enrollment_payload(enrollment))
+
+
+# =====================================================
+# REQUÊTES UNWIND (une par entité/opération)
+# =====================================================
+
+UPSERT_USERS = """
+UNWIND $rows AS row
+// Nœuds créés avant django_id: rattachés par username
+CALL {
+    WITH row
+    OPTIONAL MATCH (legacy:NeoUser {username: row.props.username})
+    WHERE legacy.django_id IS NULL
+    SET legacy.django_id = row.django_id
+}
+MERGE (u:NeoUser {django_id: row.django_id})
+ON CREATE SET u.uid = row.uid, u.created_at = timestamp() / 1000.0
+WITH u, row
+WHERE coalesce(u.sync_event_id, 0) < row.event_id
+SET u += row.props, u.sync_event_id = row.event_id
+RETURN count(u)
+"""
+
+UPSERT_COURSES = """
+UNWIND $rows AS row
+// Nœuds créés avant django_id: rattachés par titre
+CALL {
+    WITH row
+    OPTIONAL MATCH (legacy:NeoCourse {title: row.props.title})
+    WHERE legacy.django_id IS NULL
+    WITH legacy LIMIT 1
+    SET legacy.django_id = row.django_id
+}
+MERGE (c:NeoCourse {django_id: row.django_id})
+ON CREATE SET c.uid = row.uid, c.enrollment_count = 0, c.created_at = timestamp() / 1000.0
+WITH c, row
+WHERE coalesce(c.sync_event_id, 0) < row.event_id
+SET c += row.props, c.sync_event_id = row.event_id, c.updated_at = timestamp() / 1000.0
+WITH c, row
+// Instructeur: une seule relation TEACHES
+OPTIONAL MATCH (previous:NeoUser)-[t:TEACHES]->(c)
+WHERE previous.django_id <> row.instructor_id
+DELETE t
+WITH DISTINCT c, row
+OPTIONAL MATCH (instructor:NeoUser {django_id: row.instructor_id})
+FOREACH (_ IN CASE WHEN instructor IS NULL THEN [] ELSE [1] END |
+    MERGE (instructor)-[:TEACHES]->(c)
+)
+RETURN count(c)
+"""
+
+# Le verrou d'écriture pris sur le cours sérialise la mise à jour de enrollment_count.
+# Renvoie l'event_id des lignes dont l'étudiant et le cours existent: les autres
+# (nœud pas encore synchronisé) sont reprogrammées par process_batch.
+UPSERT_ENROLLMENTS = """
+UNWIND $rows AS row
+MATCH (u:NeoUser {django_id: row.student_id}), (c:NeoCourse {django_id: row.course_id})
+SET c._lock = true
+WITH u, c, row, EXISTS { MATCH (u)-[:ENROLLED_IN]->(c) } AS already
+FOREACH (_ IN CASE WHEN already THEN [] ELSE [1] END |
+    CREATE (u)-[:ENROLLED_IN {completion_percent: 0.0, last_accessed: timestamp() / 1000.0}]->(c)
+    SET c.enrollment_count = coalesce(c.enrollment_count, 0) + 1
+)
+REMOVE c._lock
+WITH u, c, row
+MATCH (u)-[r:ENROLLED_IN]->(c)
+FOREACH (_ IN CASE WHEN coalesce(r.sync_event_id, 0) < row.event_id THEN [1] ELSE [] END |
+    SET r.enrolled_on = row.enrolled_on, r.certified = row.certified, r.sync_event_id = row.event_id
+)
+RETURN row.event_id AS event_id
+"""
+
+DELETE_ENROLLMENTS = """
+UNWIND $rows AS row
+MATCH (u:NeoUser {django_id: row.student_id})-[r:ENROLLED_IN]->(c:NeoCourse {django_id: row.course_id})
+SET c._lock = true
+DELETE r
+SET c.enrollment_count = CASE WHEN coalesce(c.enrollment_count, 0) > 0 THEN c.enrollment_count - 1 ELSE 0 END
+REMOVE c._lock
+RETURN count(*)
+"""
+
+DELETE_COURSES = """
+UNWIND $rows AS row
+MATCH (c:NeoCourse {django_id: row.django_id})
+DETACH DELETE c
+RETURN count(*)
+"""
+
+DELETE_USERS = """
+UNWIND $rows AS row
+MATCH (u:NeoUser {django_id: row.django_id})
+DETACH DELETE u
+RETURN count(*)
+"""
+
+# Ordre d'application: les nœuds avant les relations, les suppressions de relations
+# avant celles des nœuds
+APPLY_ORDER = [
+    ('user', 'upsert', UPSERT_USERS),
+    ('course', 'upsert', UPSERT_COURSES),
+    ('enrollment', 'upsert', UPSERT_ENROLLMENTS),
+    ('enrollment', 'delete', DELETE_ENROLLMENTS),
+    ('course', 'delete', DELETE_COURSES),
+    ('user', 'delete', DELETE_USERS),
+]
+
+# Requêtes qui renvoient l'event_id de chaque ligne appliquée (nœuds requis présents)
+MATCH_REQUIRED = {('enrollment', 'upsert')}
+
+
+def _identity(event):
+    """Entité visée: une inscription est identifiée par (étudiant, cours), pas par sa PK"""
+    if event.entity == 'enrollment':
+        return ('enrollment', event.payload.get('student_id'), event.payload.get('course_id'))
+    return (event.entity, event.object_id)
+
+
+def coalesce_events(events):
+    """
+    Ne garder que le dernier événement de chaque entité (par id croissant):
+    une création suivie d'une modification puis d'une suppression n'applique que la suppression.
+
+    Returns:
+        (dernier événement par entité, événements remplacés)
+    """
+    latest = {}
+    for event in sorted(events, key=lambda e: e.id):
+        latest[_identity(event)] = event
+
+    kept = {event.id for event in latest.values()}
+    superseded = [event for event in events if event.id not in kept]
+    return sorted(latest.values(), key=lambda e: e.id), superseded
+
+
+def _row(event):
+    if event.entity == 'enrollment':
+        return {**event.payload, 'event_id': event.id}
+    row = {'django_id': event.object_id, 'event_id': event.id, 'uid': uuid.uuid4().hex}
+    if event.entity == 'course':
+        payload = dict(event.payload)
+        row['instructor_id'] = payload.pop('instructor_id', None)
+        row['props'] = payload
+    else:
+        row['props'] = event.payload
+    return row
+
+
+def apply_events(events):
+    """
+    Appliquer des événements (déjà coalescés) dans Neo4j, une requête par groupe.
+
+    Returns:
+        événements non appliqués faute de nœud (inscription dont l'étudiant ou le
+        cours n'est pas encore dans le graphe)
+    """
+    unmatched = []
+    for entity, operation, query in APPLY_ORDER:
+        group = [e for e in events if e.entity == entity and e.operation == operation]
+        if not group:
+            continue
+        result, _ = db.cypher_query(query, {'rows': [_row(e) for e in group]})
+        if (entity, operation) in MATCH_REQUIRED:
+            matched = {row[0] for row in result}
+            unmatched += [e for e in group if e.id not in matched]
+    return unmatched
+
+
+def _apply_rank(event):
+    return next(
+        i for i, (entity, operation, _) in enumerate(APPLY_ORDER)
+        if event.entity == entity and event.operation == operation
+    )
+
+
+def apply_isolated(events):
+    """
+    Appliquer un lot en isolant les événements en erreur.
+    Un lot refusé est coupé en deux moitiés rejouées séparément (les écritures déjà
+    faites sont idempotentes grâce à sync_event_id), jusqu'à l'événement fautif.
+    Neo4j injoignable: l'erreur remonte, tout le lot attend.
+
+    Returns:
+        (événements sans nœud requis, [(événement, erreur)])
+    """
+    from base.circuit_breaker import AVAILABILITY_ERRORS, CircuitOpenError
+
+    # Nœuds avant relations dans chaque moitié, comme dans APPLY_ORDER
+    events = sorted(events, key=lambda e: (_apply_rank(e), e.id))
+    try:
+        return apply_events(events), []
+    except (CircuitOpenError,) + AVAILABILITY_ERRORS:
+        raise
+    except Exception as e:
+        if len(events) == 1:
+            return [], [(events[0], e)]
+        middle = len(events) // 2
+        first_unmatched, first_failures = apply_isolated(events[:middle])
+        second_unmatched, second_failures = apply_isolated(events[middle:])
+        return first_unmatched + second_unmatched, first_failures + second_failures
+
+
+def supersede_older_events(events, now):
+    """
+    Solder les événements plus anciens des mêmes entités restés hors du lot (reprogrammés
+    après un échec): une inscription reprogrammée faute de nœud, suivie d'une
+    désinscription appliquée, ne doit pas recréer la relation à sa tentative suivante.
+
+    Returns:
+        nombre d'événements soldés
+    """
+    from django.db.models import Q
+    from base.models import GraphSyncEvent
+
+    if not events:
+        return 0
+    condition = Q()
+    for event in events:
+        if event.entity == 'enrollment':
+            same = Q(payload__student_id=event.payload.get('student_id'),
+                     payload__course_id=event.payload.get('course_id'))
+        else:
+            same = Q(object_id=event.object_id)
+        condition |= Q(entity=event.entity, id__lt=event.id) & same
+
+    # skip_locked: les événements réservés par un autre worker sont laissés à ce worker
+    older = list(
+        GraphSyncEvent.objects.select_for_update(skip_locked=True)
+        .filter(condition, status='pending').values_list('pk', flat=True)
+    )
+    return GraphSyncEvent.objects.filter(pk__in=older).update(status='done', processed_at=now, last_error='')
+
+
+def _reschedule(event, error, now, max_attempts, retry_delay):
+    """Compter une tentative; 'failed' après max_attempts, sinon délai exponentiel"""
+    event.attempts += 1
+    event.last_error = str(error)[:2000]
+    if event.attempts >= max_attempts:
+        event.status = 'failed'
+        return 'failed'
+    event.available_at = now + timedelta(seconds=retry_delay * 2 ** (event.attempts - 1))
+    return 'retried'
+
+
+def _defer(event, error, now, retry_delay):
+    """Neo4j injoignable: reporter sans compter de tentative (l'événement n'y est pour rien)"""
+    event.last_error = str(error)[:2000]
+    event.available_at = now + timedelta(seconds=retry_delay)
+    return 'retried'
+
+
+def process_batch(batch_size=500, max_attempts=5, retry_delay=30):
+    """
+    Réserver et appliquer un lot d'événements en attente.
+
+    Un événement refusé par Neo4j est isolé (apply_isolated) et seul reprogrammé avec
+    un délai exponentiel (retry_delay × 2^tentatives), de même qu'une inscription dont
+    l'étudiant ou le cours manque encore; après max_attempts il passe en 'failed'.
+    Neo4j injoignable: le lot est reporté de retry_delay sans consommer de tentative,
+    et les événements remplacés sont quand même marqués 'done'. Un événement appliqué
+    solde aussi les événements plus anciens de la même entité restés en attente.
+
+    Returns:
+        dict {'done', 'superseded', 'retried', 'failed'}
+    """
+    from base.circuit_breaker import AVAILABILITY_ERRORS, CircuitOpenError, neo4j_available
+    from base.models import GraphSyncEvent
+    from base.neo_connection import ensure_neo4j_connection
+
+    stats = {'done': 0, 'superseded': 0, 'retried': 0, 'failed': 0}
+    now = timezone.now()
+
+    # Neo4j indisponible: les événements attendent sans consommer de tentative
+    if not neo4j_available():
+        return stats
+
+    with transaction.atomic():
+        # skip_locked: plusieurs workers peuvent tourner sans traiter deux fois un événement
+        events = list(
+            GraphSyncEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return stats
+
+        latest, superseded = coalesce_events(events)
+        deferred = []
+        try:
+            ensure_neo4j_connection()
+            unmatched, failures = apply_isolated(latest)
+        except (CircuitOpenError,) + AVAILABILITY_ERRORS as e:
+            logger.warning(f'Neo4j unavailable, graph outbox batch deferred ({len(latest)} events): {e}')
+            unmatched, failures, deferred = [], [], latest
+            for event in deferred:
+                stats[_defer(event, e, now, retry_delay)] += 1
+            GraphSyncEvent.objects.bulk_update(deferred, ['last_error', 'available_at'])
+        except Exception as e:
+            logger.warning(f'Graph outbox batch failed ({len(latest)} events): {e}')
+            unmatched, failures = [], [(event, e) for event in latest]
+
+        failures += [(event, 'Student or course node missing in Neo4j') for event in unmatched]
+        for event, error in failures:
+            logger.warning(f'Graph outbox event {event.id} ({event.entity} {event.operation}) not applied: {error}')
+            stats[_reschedule(event, error, now, max_attempts, retry_delay)] += 1
+        if failures:
+            GraphSyncEvent.objects.bulk_update(
+                [event for event, _ in failures], ['attempts', 'last_error', 'status', 'available_at']
+            )
+
+        pending = {event.id for event, _ in failures} | {event.id for event in deferred}
+        applied = [event for event in latest if event.id not in pending]
+        GraphSyncEvent.objects.filter(pk__in=[e.pk for e in applied + superseded]).update(
+            status='done', processed_at=now, last_error=''
+        )
+        stats['done'] = len(applied)
+        stats['superseded'] = len(superseded) + supersede_older_events(applied, now)
+
+    invalidate_caches_for(applied)
+    refresh_recommendations_for(applied)
+    return stats
+
+
+def invalidate_caches_for(events):
+    """
+    Invalider le cache des recommandations une fois le graphe à jour (et non au save(),
+    où un recalcul immédiat relirait l'ancien graphe et le remettrait en cache):
+    étudiant et instructeur d'une inscription, cours similaires du cours, et
+    arborescence d'un cours modifié ou supprimé (titre, instructeur).
+
+    Les versions sont écrites dans le cache Django, qui doit être partagé avec les
+    workers web (CACHES dans settings.py): sinon l'invalidation resterait dans ce processus.
+    """
+    from django.contrib.auth import get_user_model
+    from base.models import Course
+    from base.recommendation_cache import recommendation_cache
+
+    for event in events:
+        if event.entity == 'course':
+            recommendation_cache.bump_course_tree(event.object_id)
+
+    enrollments = [e for e in events if e.entity == 'enrollment']
+    if not enrollments:
+        return
+    try:
+        student_ids = {e.payload.get('student_id') for e in enrollments}
+        course_ids = {e.payload.get('course_id') for e in enrollments}
+        courses = Course.objects.filter(pk__in=course_ids).select_related('instructor')
+        usernames = set(get_user_model().objects.filter(pk__in=student_ids).values_list('username', flat=True))
+        usernames |= {course.instructor.username for course in courses}
+
+        for username in usernames:
+            recommendation_cache.bump_user(username)
+        for course_id in course_ids:
+            recommendation_cache.bump_course(course_id)
+    except Exception as e:
+        logger.warning(f'Recommendation cache invalidation after sync failed: {e}')
+
+
+def refresh_recommendations_for(events):
+    """Recalculer le top-N matérialisé des étudiants dont les inscriptions ont changé"""
+    student_ids = {e.payload.get('student_id') for e in events if e.entity == 'enrollment'}
+    if not student_ids:
+        return
+    try:
+        from django.contrib.auth import get_user_model
+        from base.recommendations import RecommendationStore
+
+        RecommendationStore.refresh_students(get_user_model().objects.filter(pk__in=student_ids))
+    except Exception as e:
+        logger.warning(f'Recommendation refresh after sync failed: {e}')
+
+
+def purge_processed(older_than_days=7):
+    """Supprimer les événements appliqués depuis plus de N jours"""
+    from base.models import GraphSyncEvent
+
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = GraphSyncEvent.objects.filter(status='done', processed_at__lt=cutoff).delete()
+    return deleted
+
+
+# =====================================================
+# MIGRATION EN MASSE (migrate_to_neo4j --bulk)
+# =====================================================
+
+class BulkStep:
+    """
+    Une étape de migration en masse: un queryset Django parcouru avec .iterator()
+    et la requête UNWIND/MERGE (clé: django_id) qui écrit chaque lot.
+
+    phase: 'nodes' ou 'relationships' (les relations ne sont chargées qu'une fois
+    tous les nœuds présents)
+    graph: label du nœud, ou (label de départ, type, label d'arrivée, champ FK de départ,
+           champ FK d'arrivée) pour une relation - utilisé par la réconciliation
+    text_field: champ texte inclus dans l'empreinte des tranches (nœuds)
+    append_only: le filigrane de PK suffit en mode incrémental - table en ajout seul, ou
+           modifications et suppressions transmises par l'outbox; sinon l'étape est
+           réconciliée après son chargement (reconcile_mutable_steps)
+    """
+
+    def __init__(self, name, phase, model, to_row, query, only=None, graph=None, text_field=None,
+                 append_only=False):
+        self.name = name
+        self.phase = phase
+        self.model = model
+        self.to_row = to_row
+        self.query = query
+        self.only = only
+        self.graph = graph
+        self.text_field = text_field
+        self.append_only = append_only
+
+    def get_model(self):
+        from django.apps import apps
+        return apps.get_model(self.model)
+
+    def queryset(self):
+        queryset = self.get_model().objects.order_by('pk')
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _node_query(label, on_create='', legacy_key=None):
+    # Nœuds créés avant django_id (--skip-clean): rattachés par `legacy_key`, comme dans l'outbox.
+    # $event_id: dernier événement de l'outbox avant la lecture SQL (outbox_watermark); un
+    # nœud déjà écrit par un événement plus récent garde ses valeurs.
+    legacy = f"""
+    CALL {{
+        WITH row
+        OPTIONAL MATCH (legacy:{label} {{{legacy_key}: row.props.{legacy_key}}})
+        WHERE legacy.django_id IS NULL
+        WITH legacy LIMIT 1
+        SET legacy.django_id = row.django_id
+    }}""" if legacy_key else ''
+    return f"""
+    UNWIND $rows AS row{legacy}
+    MERGE (n:{label} {{django_id: row.django_id}})
+    ON CREATE SET n.uid = row.uid, n.created_at = timestamp() / 1000.0{on_create}
+    WITH n, row
+    WHERE coalesce(n.sync_event_id, 0) <= $event_id
+    SET n += row.props, n.sync_event_id = $event_id
+    RETURN count(n)
+    """
+
+
+def _relationship_query(start_label, rel_type, end_label, on_create=''):
+    on_create = f"\n    ON CREATE SET {on_create}" if on_create else ''
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{start_label} {{django_id: row.start_id}})
+    MATCH (b:{end_label} {{django_id: row.end_id}})
+    MERGE (a)-[r:{rel_type}]->(b){on_create}
+    SET r += row.props
+    RETURN count(r)
+    """
+
+
+def _node_row(pk, props):
+    return {'django_id': pk, 'uid': uuid.uuid4().hex, 'props': props}
+
+
+def _rel_row(start_id, end_id, props=None):
+    return {'start_id': start_id, 'end_id': end_id, 'props': props or {}}
+
+
+def _course_props(course):
+    props = course_payload(course)
+    props.pop('instructor_id')
+    return props
+
+
+BULK_STEPS = [
+    # Nœuds
+    BulkStep(
+        'users', 'nodes', 'base.User',
+        lambda u: _node_row(u.pk, user_payload(u)),
+        _node_query('NeoUser', legacy_key='username'),
+        graph='NeoUser', text_field='username', append_only=True
+    ),
+    BulkStep(
+        'courses', 'nodes', 'base.Course',
+        lambda c: _node_row(c.pk, _course_props(c)),
+        _node_query('NeoCourse', on_create=', n.enrollment_count = 0', legacy_key='title'),
+        graph='NeoCourse', text_field='title', append_only=True
+    ),
+    BulkStep(
+        'modules', 'nodes', 'base.Module',
+        lambda m: _node_row(m.pk, {'title': m.title, 'description': m.description or '', 'order': m.order or 0}),
+        _node_query('NeoModule'),
+        graph='NeoModule', text_field='title'
+    ),
+    BulkStep(
+        'resources', 'nodes', 'base.Resource',
+        lambda r: _node_row(r.pk, {
+            'title': r.title,
+            'resource_type': r.resource_type or 'fichier',
+            'url': r.url or '',
+            'file_path': r.file.name if r.file else '',
+        }),
+        _node_query('NeoResource'),
+        graph='NeoResource', text_field='title'
+    ),
+    BulkStep(
+        'evaluations', 'nodes', 'base.Evaluation',
+        lambda e: _node_row(e.pk, {
+            'title': e.title,
+            'description': e.description or '',
+            'evaluation_type': e.evaluation_type or 'Quiz',
+            'deadline': e.deadline.isoformat() if e.deadline else None,
+            'max_score': e.max_score or 100,
+            'passing_score': e.passing_score or 60,
+            'allow_retake': e.allow_retake or False,
+            'max_attempts': e.max_attempts or 1,
+            'show_correct_answers': e.show_correct_answers,
+            'time_limit_minutes': e.time_limit_minutes,
+        }),
+        _node_query('NeoEvaluation'),
+        graph='NeoEvaluation', text_field='title'
+    ),
+    BulkStep(
+        'questions', 'nodes', 'base.Question',
+        lambda q: _node_row(q.pk, {
+            'text': q.text,
+            'option1': q.option1,
+            'option2': q.option2,
+            'option3': q.option3,
+            'option4': q.option4,
+            'correct_option': q.correct_option,
+            'points': q.points or 1.0,
+            'order': q.order or 0,
+        }),
+        _node_query('NeoQuestion'),
+        graph='NeoQuestion', text_field='text'
+    ),
+
+    # Relations (clés étrangères lues sur la ligne: aucune requête SQL supplémentaire)
+    BulkStep(
+        'teaches', 'relationships', 'base.Course',
+        lambda c: _rel_row(c.instructor_id, c.pk),
+        _relationship_query('NeoUser', 'TEACHES', 'NeoCourse'),
+        only=['id', 'instructor_id'],
+        graph=('NeoUser', 'TEACHES', 'NeoCourse', 'instructor_id', 'id'),
+        append_only=True
+    ),
+    BulkStep(
+        'contains', 'relationships', 'base.Module',
+        lambda m: _rel_row(m.course_id, m.pk, {'order': m.order or 0}),
+        _relationship_query('NeoCourse', 'CONTAINS', 'NeoModule'),
+        only=['id', 'course_id', 'order'],
+        graph=('NeoCourse', 'CONTAINS', 'NeoModule', 'course_id', 'id')
+    ),
+    BulkStep(
+        'has_resource', 'relationships', 'base.Resource',
+        lambda r: _rel_row(r.module_id, r.pk),
+        _relationship_query('NeoModule', 'HAS_RESOURCE', 'NeoResource', on_create='r.order = 0'),
+        only=['id', 'module_id'],
+        graph=('NeoModule', 'HAS_RESOURCE', 'NeoResource', 'module_id', 'id')
+    ),
+    BulkStep(
+        'has_evaluation', 'relationships', 'base.Evaluation',
+        lambda e: _rel_row(e.module_id, e.pk),
+        _relationship_query('NeoModule', 'HAS_EVALUATION', 'NeoEvaluation'),
+        only=['id', 'module_id'],
+        graph=('NeoModule', 'HAS_EVALUATION', 'NeoEvaluation', 'module_id', 'id')
+    ),
+    BulkStep(
+        'has_question', 'relationships', 'base.Question',
+        lambda q: _rel_row(q.evaluation_id, q.pk),
+        _relationship_query('NeoEvaluation', 'HAS_QUESTION', 'NeoQuestion'),
+        only=['id', 'evaluation_id'],
+        graph=('NeoEvaluation', 'HAS_QUESTION', 'NeoQuestion', 'evaluation_id', 'id')
+    ),
+    BulkStep(
+        'enrollments', 'relationships', 'base.Enrollment',
+        lambda e: _rel_row(e.student_id, e.course_id, {
+            'enrolled_on': e.enrolled_on.isoformat() if e.enrolled_on else None,
+            'certified': e.certified or False,
+        }),
+        _relationship_query(
+            'NeoUser', 'ENROLLED_IN', 'NeoCourse',
+            on_create='r.completion_percent = 0.0, r.last_accessed = timestamp() / 1000.0'
+        ),
+        only=['id', 'student_id', 'course_id', 'enrolled_on', 'certified'],
+        graph=('NeoUser', 'ENROLLED_IN', 'NeoCourse', 'student_id', 'course_id'),
+        append_only=True
+    ),
+    BulkStep(
+        'submissions', 'relationships', 'base.Submission',
+        lambda s: _rel_row(s.student_id, s.evaluation_id, {
+            'submitted_on': s.submitted_on.timestamp() if s.submitted_on else None,
+            'score': s.score or 0,
+            'max_score': s.max_score or 0,
+            'percentage': s.percentage or 0,
+            'passed': s.passed or False,
+            'attempt_number': s.attempt_number or 1,
+            'status': s.status or 'pending',
+            'instructor_comment': s.instructor_comment or '',
+            'file_path': s.file.name if s.file else '',
+        }),
+        _relationship_query('NeoUser', 'SUBMITTED', 'NeoEvaluation'),
+        only=[
+            'id', 'student_id', 'evaluation_id', 'submitted_on', 'score', 'max_score', 'percentage',
+            'passed', 'attempt_number', 'status', 'instructor_comment', 'file'
+        ],
+        graph=('NeoUser', 'SUBMITTED', 'NeoEvaluation', 'student_id', 'evaluation_id')
+    ),
+    BulkStep(
+        'resource_views', 'relationships', 'base.ResourceView',
+        lambda v: _rel_row(v.student_id, v.resource_id, {
+            'viewed_on': v.viewed_on.timestamp() if v.viewed_on else None,
+        }),
+        _relationship_query('NeoUser', 'VIEWED', 'NeoResource'),
+        only=['id', 'student_id', 'resource_id', 'viewed_on'],
+        graph=('NeoUser', 'VIEWED', 'NeoResource', 'student_id', 'resource_id'),
+        append_only=True
+    ),
+]
+
+
+def outbox_watermark():
+    """Id du dernier événement de l'outbox (0 si vide), version des nœuds écrits en masse"""
+    from django.db.models import Max
+    from base.models import GraphSyncEvent
+
+    return GraphSyncEvent.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def bulk_load(step, queryset=None, batch_size=2000, on_batch=None):
+    """
+    Écrire un queryset dans Neo4j par lots de `batch_size` lignes (une requête UNWIND par lot).
+
+    Args:
+        on_batch: appelé après chaque lot écrit avec (lignes du lot, dernier PK du lot)
+
+    Returns:
+        (nombre de lignes, durée en secondes)
+    """
+    queryset = step.queryset() if queryset is None else queryset
+    start = time.monotonic()
+    written = 0
+    batch, last_pk = [], None
+    # Lu avant les lignes: les événements suivants sont plus récents que la lecture
+    event_id = outbox_watermark()
+
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(step.to_row(obj))
+        last_pk = obj.pk
+        if len(batch) >= batch_size:
+            db.cypher_query(step.query, {'rows': batch, 'event_id': event_id})
+            written += len(batch)
+            if on_batch:
+                on_batch(len(batch), last_pk)
+            batch = []
+
+    if batch:
+        db.cypher_query(step.query, {'rows': batch, 'event_id': event_id})
+        written += len(batch)
+        if on_batch:
+            on_batch(len(batch), last_pk)
+
+    return written, time.monotonic() - start
+
+
+def bulk_load_incremental(step, batch_size=2000, on_batch=None):
+    """
+    Migrer seulement les lignes au-delà du filigrane de l'étape (PK > last_pk).
+
+    Le filigrane est enregistré après chaque lot écrit dans Neo4j: une migration
+    interrompue reprend au lot suivant, et une resynchronisation régulière ne lit
+    que les nouvelles lignes. Le filigrane ne voit ni les modifications ni les
+    suppressions: seules les étapes `append_only` (utilisateurs, cours et inscriptions,
+    dont l'outbox transmet les changements; vues de ressources) sont complètes ainsi,
+    les autres passent ensuite par reconcile_mutable_steps.
+    """
+    from django.db.models import F
+    from base.models import GraphMigrationCheckpoint
+
+    checkpoint, _ = GraphMigrationCheckpoint.objects.get_or_create(entity=step.name)
+    queryset = step.queryset().filter(pk__gt=checkpoint.last_pk)
+
+    def committed(rows, last_pk):
+        GraphMigrationCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            last_pk=last_pk, rows=F('rows') + rows, updated_at=timezone.now()
+        )
+        if on_batch:
+            on_batch(rows, last_pk)
+
+    return bulk_load(step, queryset, batch_size=batch_size, on_batch=committed)
+
+
+def reconcile_mutable_steps(chunk_size=1000):
+    """
+    Rattraper les modifications et suppressions des étapes hors outbox (modules,
+    ressources, évaluations, questions, soumissions...) après une migration incrémentale.
+
+    Comparaison complète (deep): les empreintes ne couvrent que le champ texte des nœuds
+    et les couples des relations, alors qu'une note de soumission, l'ordre d'un module ou
+    la date limite d'une évaluation changent sans toucher à l'un ni à l'autre. Chaque
+    tranche est donc relue des deux côtés et comparée sur toutes les propriétés migrées.
+
+    Returns:
+        rapports de reconcile_step, dans l'ordre de BULK_STEPS (nœuds avant relations)
+    """
+    from base.graph_reconcile import reconcile_step
+
+    return [
+        reconcile_step(step, chunk_size=chunk_size, deep=True, repair=True)
+        for step in BULK_STEPS if not step.append_only
+    ]
+
+
+def reset_checkpoints():
+    """Oublier les filigranes (la prochaine migration incrémentale repart de zéro)"""
+    from base.models import GraphMigrationCheckpoint
+
+    return GraphMigrationCheckpoint.objects.all().delete()[0]
+
+
+# =====================================================
+# MIGRATION PARALLÈLE (migrate_to_neo4j --workers N)
+# =====================================================
+
+def partition_ranges(after_pk, upto_pk, parts):
+    """
+    Découper l'intervalle de PK ]after_pk, upto_pk] en `parts` tranches contiguës.
+
+    Returns:
+        liste de (after, upto) - chaque tranche couvre les PK after < pk <= upto
+    """
+    span = upto_pk - after_pk
+    if span <= 0:
+        return []
+    parts = max(1, min(parts, span))
+    bounds = [after_pk + span * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+def _init_migration_worker():
+    """Processus du pool: Django initialisé et driver Neo4j propre au processus"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from base.neo_connection import ensure_neo4j_connection
+    ensure_neo4j_connection()
+
+
+def _load_partition(step_name, after_pk, upto_pk, batch_size):
+    step = next(s for s in BULK_STEPS if s.name == step_name)
+    queryset = step.queryset().filter(pk__gt=after_pk, pk__lte=upto_pk)
+    rows, _ = bulk_load(step, queryset, batch_size=batch_size)
+    return step_name, rows
+
+
+def parallel_load(workers, batch_size=2000, incremental=False, on_phase=None):
+    """
+    Migration en masse répartie sur un pool de `workers` processus.
+
+    Chaque étape est découpée en tranches de PK; les nœuds sont tous chargés avant
+    les relations (barrière entre les phases). Les filigranes sont avancés à la fin
+    de chaque phase: une phase interrompue est rejouée entièrement (MERGE idempotent).
+
+    Returns:
+        liste de dicts par phase: {'phase', 'rows', 'elapsed', 'steps': {nom: lignes}}
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from django.db import connections
+    from django.db.models import F, Max
+    from base.models import GraphMigrationCheckpoint
+
+    watermarks = {}
+    if incremental:
+        watermarks = dict(GraphMigrationCheckpoint.objects.values_list('entity', 'last_pk'))
+
+    # Les processus ouvrent leurs propres connexions SQL
+    connections.close_all()
+
+    report = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_migration_worker) as pool:
+        for phase in ('nodes', 'relationships'):
+            steps = [s for s in BULK_STEPS if s.phase == phase]
+            start = time.monotonic()
+
+            upto = {}
+            futures = []
+            for step in steps:
+                after = watermarks.get(step.name, 0)
+                upto[step.name] = step.get_model().objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+                for low, high in partition_ranges(after, upto[step.name], workers):
+                    futures.append(pool.submit(_load_partition, step.name, low, high, batch_size))
+
+            counts = {s.name: 0 for s in steps}
+            for future in as_completed(futures):
+                name, rows = future.result()
+                counts[name] += rows
+
+            # Barrière: toutes les tranches de la phase sont écrites
+            for step in steps:
+                if upto[step.name] > watermarks.get(step.name, 0):
+                    checkpoint, _ = GraphMigrationCheckpoint.objects.get_or_create(entity=step.name)
+                    GraphMigrationCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                        last_pk=upto[step.name], rows=F('rows') + counts[step.name], updated_at=timezone.now()
+                    )
+
+            stats = {
+                'phase': phase,
+                'rows': sum(counts.values()),
+                'elapsed': time.monotonic() - start,
+                'steps': counts,
+            }
+            report.append(stats)
+            if on_phase:
+                on_phase(stats)
+    return report
+
+
+# =====================================================
+# RESYNCHRONISATION DES USERS (admin Neo4j, sync_neo_users)
+# =====================================================
+
+USER_SYNC_STATUS_KEY = 'graph_sync:user_sync:status'
+USER_SYNC_LOCK_KEY = 'graph_sync:user_sync:lock'
+
+_user_sync_executor = None
+_user_sync_executor_lock = threading.Lock()
+
+
+def sync_users(batch_size=None, on_progress=None):
+    """
+    Réécrire tous les NeoUser depuis la table User (UNWIND/MERGE par lots).
+
+    Args:
+        on_progress: appelé après chaque lot avec (lignes écrites, total)
+
+    Returns:
+        (nombre de users, durée en secondes)
+    """
+    from django.conf import settings
+
+    batch_size = batch_size or getattr(settings, 'GRAPH_SYNC_USERS_BATCH_SIZE', 5000)
+    step = next(s for s in BULK_STEPS if s.name == 'users')
+    queryset = step.queryset()
+    total = queryset.count()
+    done = 0
+
+    def batch_done(rows, last_pk):
+        nonlocal done
+        done += rows
+        if on_progress:
+            on_progress(done, total)
+
+    return bulk_load(step, queryset, batch_size=batch_size, on_batch=batch_done)
+
+
+def user_sync_status():
+    """
+    État de la dernière resynchronisation lancée depuis l'admin (None si aucune).
+    Lu dans le cache partagé (CACHES dans settings.py): la page peut être servie par
+    un autre worker que celui qui exécute la synchronisation.
+    """
+    from django.core.cache import cache
+
+    status = cache.get(USER_SYNC_STATUS_KEY)
+    if status and status['status'] == 'running' and not cache.get(USER_SYNC_LOCK_KEY):
+        # Processus arrêté pendant la synchronisation
+        status = {**status, 'status': 'failed', 'error': 'interrompue'}
+    return status
+
+
+def _set_user_sync_status(**fields):
+    from django.core.cache import cache
+
+    status = cache.get(USER_SYNC_STATUS_KEY) or {}
+    status.update(fields)
+    cache.set(USER_SYNC_STATUS_KEY, status, 24 * 3600)
+
+
+def _run_user_sync_job(batch_size):
+    from django.core.cache import cache
+    from django.db import connection
+    from base.neo_connection import ensure_neo4j_connection
+
+    try:
+        ensure_neo4j_connection()
+        rows, elapsed = sync_users(
+            batch_size,
+            on_progress=lambda done, total: _set_user_sync_status(done=done, total=total)
+        )
+        _set_user_sync_status(status='done', done=rows, elapsed=round(elapsed, 1), finished_at=time.time())
+        logger.info(f"User sync: {rows} NeoUser upserted in {elapsed:.1f}s")
+    except Exception as e:
+        _set_user_sync_status(status='failed', error=str(e), finished_at=time.time())
+        logger.error(f"User sync failed: {e}", exc_info=True)
+    finally:
+        connection.close()
+        cache.delete(USER_SYNC_LOCK_KEY)
+
+
+def start_user_sync_job(batch_size=None):
+    """
+    Lancer la resynchronisation des users dans un thread du processus web.
+    Le verrou et la progression sont dans le cache Django, qui doit être partagé entre
+    workers (CACHES dans settings.py: Redis ou table SQL); avec un cache local, chaque
+    worker pourrait lancer sa propre synchronisation.
+
+    Returns:
+        False si une synchronisation est déjà en cours
+    """
+    global _user_sync_executor
+    from concurrent.futures import ThreadPoolExecutor
+    from django.core.cache import cache
+
+    if not cache.add(USER_SYNC_LOCK_KEY, True, 3600):
+        return False
+
+    _set_user_sync_status(
+        status='running', done=0, total=None, error=None, started_at=time.time(), finished_at=None
+    )
+    with _user_sync_executor_lock:
+        if _user_sync_executor is None:
+            _user_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='user-sync')
+    _user_sync_executor.submit(_run_user_sync_job, batch_size)
+    return True
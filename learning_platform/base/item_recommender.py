@@ -0,0 +1,212 @@
+"""
+Recommandeur item-item en mémoire (sans Neo4j)
+Construit depuis la table SQL Enrollment: matrice creuse étudiants × cours,
+similarité cours-cours (cosinus ou Jaccard) et scoring vectorisé NumPy/SciPy.
+
+Sélection: settings.RECOMMENDATION_ENGINE = 'sparse'
+Les résultats ont la même forme que CourseRecommendationEngine._collaborative_filtering.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+from base.graph_backend import truncate_description
+
+logger = logging.getLogger('base')
+
+
+class SparseItemRecommender:
+    """
+    Modèle item-item construit une fois puis servi depuis la mémoire.
+
+    Attributs:
+        matrix: CSR (n_students × n_courses), 1 si inscrit
+        similarity: CSR (n_courses × n_courses), diagonale nulle
+    """
+
+    def __init__(self, matrix, similarity, student_index, course_ids, courses):
+        self.matrix = matrix
+        self.similarity = similarity
+        self.student_index = student_index  # username -> ligne
+        self.course_ids = course_ids  # colonne -> PK Course
+        self.courses = courses  # PK Course -> métadonnées
+        self.popularity = np.asarray(matrix.sum(axis=0)).ravel()
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, metric='cosine'):
+        """Construire le modèle depuis la base SQL (2 requêtes)"""
+        from base.models import Course, Enrollment
+
+        courses = {
+            row['pk']: row
+            for row in Course.objects.values(
+                'pk', 'title', 'level', 'description', 'image', 'instructor__username'
+            )
+        }
+        course_ids = sorted(courses)
+        course_index = {pk: col for col, pk in enumerate(course_ids)}
+
+        student_index = {}
+        rows, cols = [], []
+        for username, course_id in Enrollment.objects.values_list('student__username', 'course_id'):
+            if course_id not in course_index:
+                continue
+            rows.append(student_index.setdefault(username, len(student_index)))
+            cols.append(course_index[course_id])
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(student_index), len(course_ids)),
+            dtype=np.float32
+        )
+        # Doublons éventuels → binaire
+        matrix.data[:] = 1.0
+
+        similarity = cls._item_similarity(matrix, metric)
+        return cls(matrix, similarity, student_index, course_ids, courses)
+
+    @staticmethod
+    def _item_similarity(matrix, metric):
+        """Similarité cours-cours à partir des co-inscriptions"""
+        co_counts = (matrix.T @ matrix).tocsr()
+        degrees = co_counts.diagonal().astype(np.float32)
+        co_counts.setdiag(0)
+        co_counts.eliminate_zeros()
+
+        coo = co_counts.tocoo()
+        if metric == 'jaccard':
+            denominator = degrees[coo.row] + degrees[coo.col] - coo.data
+        else:
+            denominator = np.sqrt(degrees[coo.row] * degrees[coo.col])
+        values = np.divide(
+            coo.data, denominator,
+            out=np.zeros_like(coo.data, dtype=np.float32),
+            where=denominator > 0
+        )
+        return sparse.csr_matrix((values, (coo.row, coo.col)), shape=co_counts.shape)
+
+    def score_students(self, rows):
+        """
+        Scores (len(rows) × n_courses) des cours pour plusieurs étudiants, cours suivis exclus.
+        Seule la matrice des scores est dense: l'appelant borne len(rows) (lots de
+        RECOMMENDATION_BATCH_SIZE étudiants).
+        """
+        profile = self.matrix[rows]
+        scores = (profile @ self.similarity).toarray()
+        scores[profile.nonzero()] = -np.inf
+        return scores
+
+    def recommend(self, username, limit=5):
+        """Recommandations pour un étudiant"""
+        return self.recommend_many([username], limit).get(username, [])
+
+    def recommend_many(self, usernames, limit=5):
+        """
+        Recommandations pour plusieurs étudiants en un seul produit matriciel.
+        Un étudiant sans inscription reçoit les cours les plus populaires; les autres
+        sont complétés par les cours populaires qu'ils ne suivent pas.
+
+        Returns:
+            dict username -> liste de recommandations
+        """
+        known = [u for u in usernames if u in self.student_index]
+        results = {u: self._popular(limit) for u in usernames if u not in self.student_index}
+        if not known or not self.course_ids:
+            results.update({u: [] for u in known})
+            return results
+
+        scores = self.score_students([self.student_index[u] for u in known])
+        k = min(limit, scores.shape[1])
+        for username, row in zip(known, scores):
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            top = [col for col in top if np.isfinite(row[col]) and row[col] > 0]
+            recommendations = [self._format(col, float(row[col]), 'collaborative') for col in top]
+            # Complément par les cours populaires (comme la cascade Neo4j)
+            if len(recommendations) < limit:
+                recommendations += self._popular(limit - len(recommendations), row, exclude=set(top))
+            results[username] = recommendations
+        return results
+
+    def _popular(self, limit, scores=None, exclude=()):
+        """Cours les plus suivis; avec `scores`, les cours déjà suivis (-inf) sont exclus"""
+        top = np.argsort(-self.popularity, kind='stable')
+        if scores is not None:
+            top = [col for col in top if np.isfinite(scores[col]) and col not in exclude]
+        return [self._format(col, int(self.popularity[col]), 'popular') for col in top[:limit]]
+
+    def _format(self, col, score, method):
+        course = self.courses[self.course_ids[col]]
+        return {
+            'course_uid': None,
+            'title': course['title'],
+            'level': course['level'],
+            'description': truncate_description(course['description']),
+            'image_path': course['image'] or '',
+            'score': round(score, 3) if isinstance(score, float) else score,
+            'instructor': course['instructor__username'],
+            'method': method,
+            'course_id': course['pk']
+        }
+
+
+_model = None
+_model_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+
+
+def _build_model():
+    from django.conf import settings
+
+    start = time.monotonic()
+    model = SparseItemRecommender.build(
+        metric=getattr(settings, 'RECOMMENDATION_SPARSE_METRIC', 'cosine')
+    )
+    logger.info(
+        f"Sparse recommender built: {model.matrix.shape[0]} students × "
+        f"{model.matrix.shape[1]} courses in {time.monotonic() - start:.3f}s"
+    )
+    return model
+
+
+def _rebuild_in_background():
+    global _model
+    from django.db import connection
+
+    try:
+        _model = _build_model()
+    except Exception as e:
+        logger.warning(f"Sparse recommender rebuild failed, keeping the previous model: {e}")
+    finally:
+        connection.close()
+        _rebuild_lock.release()
+
+
+def get_item_recommender():
+    """
+    Modèle partagé du processus.
+
+    Seul le premier appel construit le modèle dans le thread appelant. Passé
+    settings.RECOMMENDATION_SPARSE_REBUILD_INTERVAL secondes, le modèle courant reste
+    servi pendant qu'un thread d'arrière-plan le reconstruit: aucune requête ne
+    paie la lecture complète de la table Enrollment.
+    """
+    global _model
+    from django.conf import settings
+
+    model = _model
+    if model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _build_model()
+        return _model
+
+    interval = getattr(settings, 'RECOMMENDATION_SPARSE_REBUILD_INTERVAL', 300)
+    if time.time() - model.built_at >= interval and _rebuild_lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild_in_background, name='sparse-recommender', daemon=True).start()
+    return model
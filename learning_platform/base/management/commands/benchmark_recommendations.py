@@ -0,0 +1,149 @@
+"""
+Command pour mesurer la latence et la qualité du moteur de recommandation
+Usage: python manage.py benchmark_recommendations [--students 1000] [--courses 100] [--skills 30]
+                                                  [--density 5] [--k 5] [--output benchmark.json]
+                                                  [--backend neo4j|memory]
+
+Charge un graphe synthétique dans Neo4j (nœuds `benchmark: true`), exécute chaque stratégie
+et le pipeline complet, puis supprime le graphe (sauf --keep).
+À lancer sur une base Neo4j dédiée: les cours réels fausseraient precision@k/recall@k.
+Avec --backend memory, le graphe est chargé dans le MemoryBackend: aucun Neo4j nécessaire.
+
+Le rapport JSON (configuration + métriques par stratégie) permet de comparer les versions.
+"""
+
+from django.core.management.base import BaseCommand
+import json
+import logging
+import platform
+import time
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark du moteur de recommandation (p50/p95/p99, db hits, precision@k/recall@k)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Nombre d\'étudiants (défaut: 1000)')
+        parser.add_argument('--courses', type=int, default=100, help='Nombre de cours (défaut: 100)')
+        parser.add_argument('--skills', type=int, default=30, help='Nombre de compétences (défaut: 30)')
+        parser.add_argument(
+            '--density',
+            type=float,
+            default=5.0,
+            help='Inscriptions moyennes par étudiant (défaut: 5)'
+        )
+        parser.add_argument(
+            '--holdout',
+            type=float,
+            default=0.2,
+            help='Part des inscriptions mises de côté pour l\'évaluation (défaut: 0.2)'
+        )
+        parser.add_argument('--k', type=int, default=5, help='Taille des recommandations (défaut: 5)')
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=200,
+            help='Étudiants évalués par stratégie (défaut: 200)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Graine du générateur')
+        parser.add_argument(
+            '--output',
+            default='benchmark_recommendations.json',
+            help='Fichier JSON du rapport (défaut: benchmark_recommendations.json)'
+        )
+        parser.add_argument(
+            '--backend',
+            choices=['neo4j', 'memory'],
+            default='neo4j',
+            help='Graphe interrogé: Neo4j ou MemoryBackend en mémoire (défaut: neo4j)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Conserver le graphe synthétique après le benchmark'
+        )
+
+    def handle(self, *args, **options):
+        from base import recommendation_benchmark as bench
+        from base.graph_backend import set_graph_backend
+
+        in_memory = options['backend'] == 'memory'
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{"="*60}\n'
+            f'BENCHMARK DU MOTEUR DE RECOMMANDATION\n'
+            f'{"="*60}\n'
+        ))
+
+        # Connexion Neo4j (driver partagé du processus)
+        if not in_memory:
+            ensure_neo4j_connection()
+
+        config = {
+            'students': options['students'],
+            'courses': options['courses'],
+            'skills': options['skills'],
+            'enrollments_per_student': options['density'],
+            'holdout': options['holdout'],
+            'seed': options['seed'],
+        }
+
+        try:
+            dataset = bench.generate_dataset(**config)
+            start = time.monotonic()
+            if in_memory:
+                set_graph_backend(bench.memory_backend(dataset))
+            else:
+                bench.load_dataset(dataset)
+            load_seconds = time.monotonic() - start
+            enrollments = sum(len(courses) for courses in dataset['train'].values())
+            self.stdout.write(
+                f'   ✓ Graphe synthétique chargé: {enrollments} inscriptions en {load_seconds:.1f}s'
+            )
+
+            k = options['k']
+
+            def progress(name, metrics):
+                latency = metrics['latency_ms']
+                precision = metrics[f'precision_at_{k}']
+                recall = metrics[f'recall_at_{k}']
+                self.stdout.write(
+                    f'   • {name:<14} p50={latency["p50"]}ms p95={latency["p95"]}ms '
+                    f'p99={latency["p99"]}ms db_hits={metrics["db_hits"]} '
+                    f'P@{k}={precision} R@{k}={recall}'
+                )
+
+            results = bench.run_benchmark(
+                dataset, k=k, sample_size=options['sample'],
+                seed=options['seed'], progress=progress
+            )
+
+            report = {
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'config': {**config, 'k': k, 'sample': options['sample'], 'backend': options['backend']},
+                'load_seconds': round(load_seconds, 3),
+                'results': results,
+            }
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+            self.stdout.write(self.style.SUCCESS(f'✅ Rapport écrit dans {options["output"]}'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'\n❌ ERREUR: {str(e)}'))
+            logger.error(f'Benchmark error: {str(e)}', exc_info=True)
+            raise
+
+        finally:
+            if in_memory:
+                set_graph_backend(None)
+            elif not options['keep']:
+                try:
+                    bench.clear_dataset()
+                except Exception as e:
+                    logger.warning(f'Benchmark cleanup failed: {e}')
@@ -0,0 +1,175 @@
+"""
+Command pour pré-calculer les relations SIMILAR_TO entre cours
+Usage: python manage.py compute_course_similarity [--top-k 10] [--cutoff 0.1] [--verbose]
+
+Utilise GDS nodeSimilarity (Jaccard sur les étudiants communs) et écrit pour chaque cours
+ses top-K voisins: (c1)-[:SIMILAR_TO {similarity_score, calculated_at}]->(c2).
+Sans GDS, le même calcul est fait en Cypher natif.
+
+À exécuter via cron job (ex: chaque nuit) après les imports/migrations.
+"""
+
+from django.core.management.base import BaseCommand
+from neomodel import db
+import logging
+import time
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+PROJECTION_NAME = 'courseSimilarityGraph'
+
+
+class Command(BaseCommand):
+    help = 'Pré-calcule les relations SIMILAR_TO (top-K par cours) avec GDS nodeSimilarity'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=10,
+            help='Nombre de cours similaires conservés par cours (défaut: 10)'
+        )
+        parser.add_argument(
+            '--cutoff',
+            type=float,
+            default=0.1,
+            help='Score de similarité minimum (défaut: 0.1)'
+        )
+        parser.add_argument(
+            '--cypher-only',
+            action='store_true',
+            help='Ne pas utiliser GDS (calcul en Cypher natif)'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les détails'
+        )
+
+    def handle(self, *args, **options):
+        top_k = options['top_k']
+        cutoff = options['cutoff']
+        verbose = options['verbose']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{"="*60}\n'
+            f'CALCUL DES COURS SIMILAIRES (SIMILAR_TO)\n'
+            f'{"="*60}\n'
+        ))
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        try:
+            start = time.monotonic()
+
+            # Étape 1: Supprimer les anciennes relations
+            result, _ = db.cypher_query(
+                "MATCH (:NeoCourse)-[s:SIMILAR_TO]->(:NeoCourse) DELETE s RETURN count(s)"
+            )
+            if verbose:
+                self.stdout.write(f'   ✓ {result[0][0]} anciennes relations supprimées')
+
+            # Étape 2: Calculer et écrire les nouvelles
+            if not options['cypher_only'] and self.gds_available():
+                written = self.compute_with_gds(top_k, cutoff, verbose)
+            else:
+                self.stdout.write(self.style.WARNING('   ⚠ GDS non utilisé - calcul en Cypher natif'))
+                written = self.compute_with_cypher(top_k, cutoff)
+
+            # Horodatage (même format que DateTimeProperty de neomodel: timestamp en secondes)
+            db.cypher_query(
+                """
+                MATCH (:NeoCourse)-[s:SIMILAR_TO]->(:NeoCourse)
+                WHERE s.calculated_at IS NULL
+                SET s.calculated_at = timestamp() / 1000.0
+                """
+            )
+
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {written} relations SIMILAR_TO écrites en {time.monotonic() - start:.1f}s'
+            ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'\n❌ ERREUR: {str(e)}'))
+            logger.error(f'Course similarity error: {str(e)}', exc_info=True)
+            raise
+
+    def gds_available(self):
+        """Vérifier si le plugin GDS est installé"""
+        try:
+            db.cypher_query("RETURN gds.version() AS version")
+            return True
+        except Exception:
+            return False
+
+    def compute_with_gds(self, top_k, cutoff, verbose):
+        """
+        nodeSimilarity sur une projection Course → User (ENROLLED_IN inversé):
+        seuls les cours ont des relations sortantes, ce sont donc eux qui sont comparés.
+        """
+        db.cypher_query(f"CALL gds.graph.drop('{PROJECTION_NAME}', false)")
+
+        db.cypher_query(
+            f"""
+            CALL gds.graph.project(
+                '{PROJECTION_NAME}',
+                ['NeoUser', 'NeoCourse'],
+                {{
+                    ENROLLED_IN: {{
+                        type: 'ENROLLED_IN',
+                        orientation: 'REVERSE'
+                    }}
+                }}
+            )
+            """
+        )
+        if verbose:
+            self.stdout.write(f'   ✓ Projection {PROJECTION_NAME} créée')
+
+        try:
+            result, _ = db.cypher_query(
+                f"""
+                CALL gds.nodeSimilarity.write('{PROJECTION_NAME}', {{
+                    topK: $top_k,
+                    similarityCutoff: $cutoff,
+                    writeRelationshipType: 'SIMILAR_TO',
+                    writeProperty: 'similarity_score'
+                }})
+                YIELD nodesCompared, relationshipsWritten
+                RETURN nodesCompared, relationshipsWritten
+                """,
+                {'top_k': top_k, 'cutoff': cutoff}
+            )
+        finally:
+            db.cypher_query(f"CALL gds.graph.drop('{PROJECTION_NAME}', false)")
+
+        if verbose:
+            self.stdout.write(f'   ✓ {result[0][0]} cours comparés')
+        return result[0][1]
+
+    def compute_with_cypher(self, top_k, cutoff):
+        """Similarité de Jaccard sur les étudiants communs, en Cypher natif"""
+        result, _ = db.cypher_query(
+            """
+            MATCH (c1:NeoCourse)<-[:ENROLLED_IN]-(u:NeoUser)-[:ENROLLED_IN]->(c2:NeoCourse)
+            WHERE c1 <> c2
+            WITH c1, c2, count(DISTINCT u) AS shared
+            WITH c1, c2, shared,
+                 size([(c1)<-[:ENROLLED_IN]-(:NeoUser) | 1]) AS degree1,
+                 size([(c2)<-[:ENROLLED_IN]-(:NeoUser) | 1]) AS degree2
+            WITH c1, c2, toFloat(shared) / (degree1 + degree2 - shared) AS score
+            WHERE score >= $cutoff
+            ORDER BY score DESC
+            WITH c1, collect({course: c2, score: score})[..$top_k] AS neighbours
+            UNWIND neighbours AS neighbour
+            WITH c1, neighbour.course AS c2, neighbour.score AS score
+            MERGE (c1)-[s:SIMILAR_TO]->(c2)
+            SET s.similarity_score = score
+            RETURN count(s)
+            """,
+            {'top_k': top_k, 'cutoff': cutoff}
+        )
+        return result[0][0] if result else 0
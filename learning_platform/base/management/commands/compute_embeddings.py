@@ -0,0 +1,196 @@
+"""
+Command pour calculer les embeddings FastRP des cours et des étudiants
+Usage: python manage.py compute_embeddings [--dimension 64] [--numpy-only] [--verbose]
+
+Utilise GDS FastRP sur le graphe User-ENROLLED_IN-Course-TEACHES_SKILL-Skill.
+Sans GDS, la même projection aléatoire est calculée en NumPy/SciPy.
+Les vecteurs sont écrits dans settings.RECOMMENDATION_EMBEDDINGS_DIR (voir base/graph_embeddings.py).
+
+À exécuter via cron job (ex: chaque nuit), comme compute_course_similarity.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from neomodel import db
+import logging
+import time
+
+import numpy as np
+from scipy import sparse
+
+from base.graph_embeddings import EmbeddingStore, fastrp, normalize_rows
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+PROJECTION_NAME = 'embeddingGraph'
+
+
+class Command(BaseCommand):
+    help = 'Calcule les embeddings FastRP (cours et étudiants) pour le k-NN en mémoire'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dimension',
+            type=int,
+            default=getattr(settings, 'RECOMMENDATION_EMBEDDING_DIMENSION', 64),
+            help='Taille des vecteurs (défaut: settings.RECOMMENDATION_EMBEDDING_DIMENSION)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine de la projection aléatoire'
+        )
+        parser.add_argument(
+            '--numpy-only',
+            action='store_true',
+            help='Ne pas utiliser GDS (calcul NumPy/SciPy)'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les détails'
+        )
+
+    def handle(self, *args, **options):
+        dimension = options['dimension']
+        seed = options['seed']
+        verbose = options['verbose']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{"="*60}\n'
+            f'CALCUL DES EMBEDDINGS FASTRP\n'
+            f'{"="*60}\n'
+        ))
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        try:
+            start = time.monotonic()
+
+            if not options['numpy_only'] and self.gds_available():
+                method = 'gds'
+                courses, users, vectors = self.compute_with_gds(dimension, seed, verbose)
+            else:
+                self.stdout.write(self.style.WARNING('   ⚠ GDS non utilisé - calcul NumPy/SciPy'))
+                method = 'numpy'
+                courses, users, vectors = self.compute_with_numpy(dimension, seed, verbose)
+
+            EmbeddingStore.save(
+                vectors, courses, users,
+                metadata={'dimension': dimension, 'method': method, 'computed_at': time.time()}
+            )
+
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {len(courses)} cours et {len(users)} étudiants '
+                f'({dimension} dimensions, {method}) en {time.monotonic() - start:.1f}s'
+                f' → {EmbeddingStore.directory()}'
+            ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'\n❌ ERREUR: {str(e)}'))
+            logger.error(f'Embedding computation error: {str(e)}', exc_info=True)
+            raise
+
+    def gds_available(self):
+        """Vérifier si le plugin GDS est installé"""
+        try:
+            db.cypher_query("RETURN gds.version() AS version")
+            return True
+        except Exception:
+            return False
+
+    def compute_with_gds(self, dimension, seed, verbose):
+        """gds.fastRP.stream sur une projection non orientée"""
+        db.cypher_query(f"CALL gds.graph.drop('{PROJECTION_NAME}', false)")
+        db.cypher_query(
+            f"""
+            CALL gds.graph.project(
+                '{PROJECTION_NAME}',
+                ['NeoUser', 'NeoCourse', 'NeoSkill'],
+                {{
+                    ENROLLED_IN: {{type: 'ENROLLED_IN', orientation: 'UNDIRECTED'}},
+                    TEACHES_SKILL: {{type: 'TEACHES_SKILL', orientation: 'UNDIRECTED'}}
+                }}
+            )
+            """
+        )
+        if verbose:
+            self.stdout.write(f'   ✓ Projection {PROJECTION_NAME} créée')
+
+        try:
+            result, _ = db.cypher_query(
+                f"""
+                CALL gds.fastRP.stream('{PROJECTION_NAME}', {{
+                    embeddingDimension: $dimension,
+                    iterationWeights: [0.0, 1.0, 1.0],
+                    randomSeed: $seed
+                }})
+                YIELD nodeId, embedding
+                WITH gds.util.asNode(nodeId) AS n, embedding
+                WHERE (n:NeoCourse AND n.django_id IS NOT NULL)
+                   OR (n:NeoUser AND n.role = 'Student')
+                RETURN n:NeoCourse AS is_course, n.django_id AS course_id, n.username AS username, embedding
+                """,
+                {'dimension': dimension, 'seed': seed}
+            )
+        finally:
+            db.cypher_query(f"CALL gds.graph.drop('{PROJECTION_NAME}', false)")
+
+        course_rows = [row for row in result if row[0]]
+        user_rows = [row for row in result if not row[0]]
+        vectors = np.array(
+            [row[3] for row in course_rows] + [row[3] for row in user_rows],
+            dtype=np.float32
+        ).reshape(-1, dimension)
+        return (
+            [row[1] for row in course_rows],
+            [row[2] for row in user_rows],
+            normalize_rows(vectors)
+        )
+
+    def compute_with_numpy(self, dimension, seed, verbose):
+        """FastRP en NumPy/SciPy: seules les arêtes sont lues depuis Neo4j"""
+        enrollments, _ = db.cypher_query(
+            """
+            MATCH (u:NeoUser {role: 'Student'})-[:ENROLLED_IN]->(c:NeoCourse)
+            WHERE c.django_id IS NOT NULL
+            RETURN u.username, c.django_id
+            """
+        )
+        skills, _ = db.cypher_query(
+            """
+            MATCH (c:NeoCourse)-[:TEACHES_SKILL]->(s:NeoSkill)
+            WHERE c.django_id IS NOT NULL
+            RETURN c.django_id, s.uid
+            """
+        )
+        courses_result, _ = db.cypher_query(
+            "MATCH (c:NeoCourse) WHERE c.django_id IS NOT NULL RETURN c.django_id ORDER BY c.django_id"
+        )
+        if verbose:
+            self.stdout.write(f'   ✓ {len(enrollments)} inscriptions, {len(skills)} liens cours-compétence')
+
+        courses = [row[0] for row in courses_result]
+        users = sorted({row[0] for row in enrollments})
+        skill_uids = sorted({row[1] for row in skills})
+
+        # Lignes: cours, puis étudiants, puis compétences
+        index = {('course', pk): i for i, pk in enumerate(courses)}
+        index.update({('user', u): len(index) + i for i, u in enumerate(users)})
+        index.update({('skill', s): len(index) + i for i, s in enumerate(skill_uids)})
+
+        edges = [(index[('user', u)], index[('course', c)]) for u, c in enrollments if ('course', c) in index]
+        edges += [(index[('course', c)], index[('skill', s)]) for c, s in skills if ('course', c) in index]
+        rows = [a for a, b in edges] + [b for a, b in edges]
+        cols = [b for a, b in edges] + [a for a, b in edges]
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(index), len(index))
+        )
+        adjacency.data[:] = 1.0
+
+        vectors = fastrp(adjacency, dimension=dimension, seed=seed)
+        return courses, users, vectors[:len(courses) + len(users)]
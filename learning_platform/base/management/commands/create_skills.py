@@ -4,10 +4,11 @@ Usage: python manage.py create_skills
 """
 
 from django.core.management.base import BaseCommand
-from neomodel import db, config
-from django.conf import settings
+from neomodel import db
 import logging
 
+from base.neo_connection import ensure_neo4j_connection
+
 logger = logging.getLogger('base')
 
 
@@ -24,8 +25,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         verbose = options['verbose']
         
-        # Configurer neomodel
-        config.DATABASE_URL = settings.NEOMODEL_NEO4J_BOLT_URL
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
         
         self.stdout.write(self.style.SUCCESS(
             f'\n{"="*60}\n'
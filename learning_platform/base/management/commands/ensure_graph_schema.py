@@ -0,0 +1,63 @@
+"""
+Command pour créer et vérifier les index/contraintes Neo4j requis par les requêtes
+Usage: python manage.py ensure_graph_schema [--check] [--timeout 300] [--verbose]
+
+Idempotent: à exécuter à chaque déploiement (avant de démarrer les workers).
+Code de sortie non nul si un index requis est absent (voir base/graph_schema.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+import logging
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Crée (IF NOT EXISTS) et vérifie via SHOW INDEXES les index Neo4j requis'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Vérifier seulement, sans rien créer'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=300,
+            help="Attente max (s) du peuplement des index créés (défaut: 300)"
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche chaque index'
+        )
+
+    def handle(self, *args, **options):
+        from base.graph_schema import GRAPH_SCHEMA, SchemaError, ensure_schema, verify_schema
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        if options['check']:
+            missing = verify_schema()
+        else:
+            try:
+                ensure_schema(timeout=options['timeout'])
+                missing = []
+            except SchemaError:
+                missing = verify_schema()
+
+        if options['verbose']:
+            for spec in GRAPH_SCHEMA:
+                mark = '✗' if spec in missing else '✓'
+                self.stdout.write(f'   {mark} {spec}' + (f' - {spec.used_by}' if spec.used_by else ''))
+
+        if missing:
+            for spec in missing:
+                self.stdout.write(self.style.ERROR(f'   ❌ {spec} ({spec.used_by or "requis"})'))
+            raise CommandError(f'{len(missing)}/{len(GRAPH_SCHEMA)} index Neo4j manquants')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Schéma Neo4j conforme ({len(GRAPH_SCHEMA)} index)'))
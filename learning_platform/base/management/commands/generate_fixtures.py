@@ -595,14 +595,14 @@ class Command(BaseCommand):
     def sync_to_neo4j(self, courses, students, instructors):
         """Synchronise les données vers Neo4j"""
         try:
+            from neomodel import db
             from base.neo_models import NeoUser, NeoCourse, sync_django_user_to_neo4j
             from base.models import Enrollment
-            from datetime import date
-            from neomodel import db
-            from django.conf import settings
+            from base.graph_sync import UPSERT_ENROLLMENTS, enrollment_payload, outbox_watermark
+            from base.neo_connection import ensure_neo4j_connection
             
-            # Initialiser connexion
-            db.set_connection(settings.NEOMODEL_NEO4J_BOLT_URL)
+            # Initialiser connexion (driver partagé)
+            ensure_neo4j_connection()
             
             synced_users = 0
             synced_courses = 0
@@ -629,9 +629,10 @@ class Command(BaseCommand):
             # Sync courses
             for course in courses:
                 try:
-                    neo_course = NeoCourse.nodes.get_or_none(title=course.title)
+                    neo_course = NeoCourse.get_for_django_course(course)
                     if not neo_course:
                         neo_course = NeoCourse(
+                            django_id=course.pk,
                             title=course.title,
                             description=course.description or '',
                             level=course.level or 'Beginner',
@@ -651,21 +652,16 @@ class Command(BaseCommand):
             
             self.stdout.write(f'   ✓ {synced_courses} cours synchronisés')
             
-            # Sync enrollments
-            enrollments = Enrollment.objects.all()
-            for enrollment in enrollments:
+            # Sync enrollments: requête de l'outbox (relation ENROLLED_IN et enrollment_count)
+            event_id = outbox_watermark()
+            rows = [
+                {**enrollment_payload(enrollment), 'event_id': event_id}
+                for enrollment in Enrollment.objects.all()
+            ]
+            for start in range(0, len(rows), 1000):
                 try:
-                    neo_user = NeoUser.nodes.get_or_none(username=enrollment.student.username)
-                    neo_course = NeoCourse.nodes.get_or_none(title=enrollment.course.title)
-                    
-                    if neo_user and neo_course:
-                        if neo_course not in neo_user.enrolled_in.all():
-                            neo_user.enrolled_in.connect(neo_course, {
-                                'enrolled_on': enrollment.enrolled_on,
-                                'completion_percent': 0.0,
-                                'certified': False
-                            })
-                            synced_enrollments += 1
+                    result, _ = db.cypher_query(UPSERT_ENROLLMENTS, {'rows': rows[start:start + 1000]})
+                    synced_enrollments += len(result)
                 except Exception:
                     pass
             
@@ -1,13 +1,28 @@
 """
 Command Django pour migrer les données de SQLite vers Neo4j
 Usage: python manage.py migrate_to_neo4j [--dry-run] [--execute] [--verbose]
+                                         [--bulk] [--batch-size 2000]
+                                         [--incremental] [--reset-checkpoints] [--workers N]
+
+Avec --bulk, chaque table est parcourue en flux (.iterator()) et écrite par lots
+UNWIND/MERGE sur django_id (voir base/graph_sync.py) au lieu d'un save() par ligne.
+Chaque lot validé avance le filigrane de son étape (table GraphMigrationCheckpoint):
+--incremental ne migre que les lignes au-delà des filigranes, sans nettoyer Neo4j,
+et reprend une migration interrompue au dernier lot validé. Un filigrane de PK ne voit
+ni les modifications ni les suppressions: les tables hors outbox (modules, ressources,
+évaluations, questions, soumissions) sont ensuite réconciliées par tranches
+(voir reconcile_mutable_steps).
+Avec --workers N, chaque étape est découpée en tranches de PK réparties sur N processus
+(un driver Neo4j par processus); les relations ne sont chargées qu'après tous les nœuds.
 """
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from neomodel import db, config
-from django.conf import settings
+from neomodel import db
 import logging
+import time
+
+from base.neo_connection import ensure_neo4j_connection
 
 logger = logging.getLogger('base')
 
@@ -36,12 +51,40 @@ class Command(BaseCommand):
             action='store_true',
             help='Ne pas nettoyer Neo4j avant migration'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Migration par lots UNWIND/MERGE (recommandé pour les grosses bases)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Lignes par lot en mode --bulk (défaut: 2000)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Migrer seulement les lignes depuis le dernier filigrane, puis réconcilier les tables hors outbox (implique --bulk et --skip-clean)'
+        )
+        parser.add_argument(
+            '--reset-checkpoints',
+            action='store_true',
+            help='Oublier les filigranes avant une migration --incremental'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processus parallèles en mode --bulk/--incremental (défaut: 1)'
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         execute = options['execute']
         verbose = options['verbose']
-        skip_clean = options['skip_clean']
+        incremental = options['incremental']
+        skip_clean = options['skip_clean'] or incremental
 
         if not dry_run and not execute:
             self.stdout.write(self.style.ERROR(
@@ -56,10 +99,10 @@ class Command(BaseCommand):
             f'{"="*60}\n'
         ))
 
-        # Configurer neomodel
-        config.DATABASE_URL = settings.NEOMODEL_NEO4J_BOLT_URL
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
 
-        if execute and not dry_run:
+        if execute and not dry_run and not incremental:
             confirm = input('⚠️  Êtes-vous sûr de vouloir migrer? (yes/no): ')
             if confirm.lower() != 'yes':
                 self.stdout.write('Migration annulée.')
@@ -84,37 +127,49 @@ class Command(BaseCommand):
                 db.cypher_query("MATCH (n) DETACH DELETE n")
                 self.stdout.write(self.style.SUCCESS('✅ Neo4j nettoyé'))
 
-            # Étape 1: Migrer les Users
-            self.migrate_users(dry_run, verbose, NeoUser)
+            if options['bulk'] or incremental:
+                # Une migration complète repart de zéro; --incremental reprend aux filigranes
+                if execute and not dry_run and (not incremental or options['reset_checkpoints']):
+                    from base.graph_sync import reset_checkpoints
+                    reset_checkpoints()
+                self.migrate_bulk(dry_run, verbose, options['batch_size'], incremental, options['workers'])
+            else:
+                # Étape 1: Migrer les Users
+                self.migrate_users(dry_run, verbose, NeoUser)
 
-            # Étape 2: Migrer les Courses
-            self.migrate_courses(dry_run, verbose, NeoUser, NeoCourse)
+                # Étape 2: Migrer les Courses
+                self.migrate_courses(dry_run, verbose, NeoUser, NeoCourse)
 
-            # Étape 3: Migrer les Modules
-            self.migrate_modules(dry_run, verbose, NeoCourse, NeoModule, Module)
+                # Étape 3: Migrer les Modules
+                self.migrate_modules(dry_run, verbose, NeoCourse, NeoModule, Module)
 
-            # Étape 4: Migrer les Resources
-            self.migrate_resources(dry_run, verbose, NeoModule, NeoResource, Resource)
+                # Étape 4: Migrer les Resources
+                self.migrate_resources(dry_run, verbose, NeoModule, NeoResource, Resource)
 
-            # Étape 5: Migrer les Evaluations
-            self.migrate_evaluations(dry_run, verbose, NeoModule, NeoEvaluation, Evaluation)
+                # Étape 5: Migrer les Evaluations
+                self.migrate_evaluations(dry_run, verbose, NeoModule, NeoEvaluation, Evaluation)
 
-            # Étape 6: Migrer les Questions
-            self.migrate_questions(dry_run, verbose, NeoEvaluation, NeoQuestion, Question)
+                # Étape 6: Migrer les Questions
+                self.migrate_questions(dry_run, verbose, NeoEvaluation, NeoQuestion, Question)
 
-            # Étape 7: Migrer les Enrollments
-            self.migrate_enrollments(dry_run, verbose, NeoUser, NeoCourse, Enrollment)
+                # Étape 7: Migrer les Enrollments
+                self.migrate_enrollments(dry_run, verbose, NeoUser, NeoCourse, Enrollment)
 
-            # Étape 8: Migrer les Submissions
-            self.migrate_submissions(dry_run, verbose, NeoUser, NeoEvaluation, Submission)
+                # Étape 8: Migrer les Submissions
+                self.migrate_submissions(dry_run, verbose, NeoUser, NeoEvaluation, Submission)
 
-            # Étape 9: Migrer les Resource Views
-            self.migrate_resource_views(dry_run, verbose, NeoUser, NeoResource, ResourceView)
+                # Étape 9: Migrer les Resource Views
+                self.migrate_resource_views(dry_run, verbose, NeoUser, NeoResource, ResourceView)
 
             # Étape 10: Vérification
             if not dry_run:
                 self.verify_migration()
 
+                # Modules, ressources, évaluations, questions: hors outbox, l'arbre en
+                # cache des cours n'est à jour qu'après une migration
+                from base.course_tree import invalidate_course_trees
+                invalidate_course_trees()
+
             self.stdout.write(self.style.SUCCESS(
                 f'\n{"="*60}\n'
                 f'✅ MIGRATION TERMINÉE\n'
@@ -126,6 +181,96 @@ class Command(BaseCommand):
             logger.error(f'Migration error: {str(e)}', exc_info=True)
             raise
 
+    def migrate_bulk(self, dry_run, verbose, batch_size, incremental=False, workers=1):
+        """Migrer toutes les tables par lots UNWIND/MERGE: les nœuds, puis les relations"""
+        from base.graph_sync import BULK_STEPS, bulk_load_incremental
+        from base.models import GraphMigrationCheckpoint
+        from base.neo_models import NeoCourse
+
+        watermarks = {}
+        if incremental:
+            watermarks = dict(GraphMigrationCheckpoint.objects.values_list('entity', 'last_pk'))
+
+        if workers > 1 and not dry_run:
+            return self.migrate_parallel(verbose, batch_size, incremental, workers)
+
+        self.stdout.write(f'\n📦 Migration par lots de {batch_size} lignes')
+        total_rows = 0
+        start = time.monotonic()
+
+        for step in BULK_STEPS:
+            if dry_run:
+                watermark = watermarks.get(step.name, 0)
+                pending = step.queryset().filter(pk__gt=watermark).count()
+                self.stdout.write(f'   - {step.name} ({step.phase}): {pending} lignes après le PK {watermark}')
+                continue
+
+            progress = None
+            if verbose:
+                def progress(rows, last_pk, name=step.name):
+                    self.stdout.write(f'     · {name}: lot de {rows} (jusqu\'au PK {last_pk})')
+
+            rows, elapsed = bulk_load_incremental(step, batch_size=batch_size, on_batch=progress)
+            total_rows += rows
+            rate = rows / elapsed if elapsed > 0 else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'   ✓ {step.name}: {rows} lignes en {elapsed:.2f}s ({rate:,.0f} lignes/s)'
+            ))
+
+        if dry_run:
+            return
+
+        if incremental:
+            self.reconcile_mutable(verbose)
+        NeoCourse.rebuild_enrollment_counts()
+        elapsed = time.monotonic() - start
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total_rows} lignes migrées en {elapsed:.1f}s ({rate:,.0f} lignes/s)'
+        ))
+
+    def migrate_parallel(self, verbose, batch_size, incremental, workers):
+        """Migration par lots sur un pool de processus, phase par phase"""
+        from base.graph_sync import parallel_load
+        from base.neo_models import NeoCourse
+
+        self.stdout.write(f'\n📦 Migration par lots de {batch_size} lignes sur {workers} processus')
+        start = time.monotonic()
+
+        def phase_done(stats):
+            if verbose:
+                for name, rows in stats['steps'].items():
+                    self.stdout.write(f'     · {name}: {rows} lignes')
+            rate = stats['rows'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'   ✓ phase {stats["phase"]}: {stats["rows"]} lignes en {stats["elapsed"]:.2f}s '
+                f'({rate:,.0f} lignes/s)'
+            ))
+
+        report = parallel_load(workers, batch_size=batch_size, incremental=incremental, on_phase=phase_done)
+
+        if incremental:
+            self.reconcile_mutable(verbose)
+        NeoCourse.rebuild_enrollment_counts()
+        total_rows = sum(stats['rows'] for stats in report)
+        elapsed = time.monotonic() - start
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total_rows} lignes migrées en {elapsed:.1f}s ({rate:,.0f} lignes/s)'
+        ))
+
+    def reconcile_mutable(self, verbose):
+        """Modifications et suppressions des tables hors outbox, invisibles au filigrane"""
+        from base.graph_sync import reconcile_mutable_steps
+
+        self.stdout.write('\n🔍 Réconciliation des tables hors outbox')
+        for report in reconcile_mutable_steps():
+            if report['repaired'] or verbose:
+                self.stdout.write(
+                    f'   ↻ {report["step"]}: {report["mismatched_chunks"]}/{report["chunks"]} tranches divergentes, '
+                    f'{report["repaired"]} lignes réparées'
+                )
+
     def migrate_users(self, dry_run, verbose, NeoUser):
         """Migrer les utilisateurs Django vers Neo4j"""
         User = get_user_model()
@@ -144,6 +289,7 @@ class Command(BaseCommand):
         for user in users:
             try:
                 neo_user = NeoUser(
+                    django_id=user.pk,
                     username=user.username,
                     email=user.email,
                     first_name=user.first_name,
@@ -177,6 +323,7 @@ class Command(BaseCommand):
         for course in courses:
             try:
                 neo_course = NeoCourse(
+                    django_id=course.pk,
                     title=course.title,
                     description=course.description or '',
                     level=course.level or 'Beginner',
@@ -188,7 +335,7 @@ class Command(BaseCommand):
                 
                 # Relation TEACHES avec l'instructeur
                 try:
-                    neo_instructor = NeoUser.nodes.get(username=course.instructor.username)
+                    neo_instructor = NeoUser.nodes.get(django_id=course.instructor_id)
                     neo_instructor.teaches.connect(neo_course)
                 except Exception as e:
                     self.stdout.write(self.style.WARNING(
@@ -218,6 +365,7 @@ class Command(BaseCommand):
         for module in modules:
             try:
                 neo_module = NeoModule(
+                    django_id=module.pk,
                     title=module.title,
                     description=module.description or '',
                     order=module.order or 0
@@ -225,7 +373,7 @@ class Command(BaseCommand):
                 
                 # Relation CONTAINS avec le cours
                 try:
-                    neo_course = NeoCourse.nodes.get(title=module.course.title)
+                    neo_course = NeoCourse.nodes.get(django_id=module.course_id)
                     neo_course.modules.connect(neo_module, {'order': module.order or 0})
                 except Exception as e:
                     self.stdout.write(self.style.WARNING(
@@ -253,6 +401,7 @@ class Command(BaseCommand):
         for resource in resources:
             try:
                 neo_resource = NeoResource(
+                    django_id=resource.pk,
                     title=resource.title,
                     resource_type=resource.resource_type or 'fichier',
                     url=resource.url or '',
@@ -261,7 +410,7 @@ class Command(BaseCommand):
                 
                 # Relation HAS_RESOURCE avec le module
                 try:
-                    neo_module = NeoModule.nodes.get(title=resource.module.title)
+                    neo_module = NeoModule.nodes.get(django_id=resource.module_id)
                     neo_module.resources.connect(neo_resource, {'order': 0})
                 except Exception:
                     pass
@@ -285,6 +434,7 @@ class Command(BaseCommand):
         for evaluation in evaluations:
             try:
                 neo_eval = NeoEvaluation(
+                    django_id=evaluation.pk,
                     title=evaluation.title,
                     description=evaluation.description or '',
                     evaluation_type=evaluation.evaluation_type or 'Quiz',
@@ -299,7 +449,7 @@ class Command(BaseCommand):
                 
                 # Relation avec le module
                 try:
-                    neo_module = NeoModule.nodes.get(title=evaluation.module.title)
+                    neo_module = NeoModule.nodes.get(django_id=evaluation.module_id)
                     neo_module.evaluations.connect(neo_eval)
                 except Exception:
                     pass
@@ -323,6 +473,7 @@ class Command(BaseCommand):
         for question in questions:
             try:
                 neo_question = NeoQuestion(
+                    django_id=question.pk,
                     text=question.text,
                     option1=question.option1,
                     option2=question.option2,
@@ -335,7 +486,7 @@ class Command(BaseCommand):
                 
                 # Relation avec l'évaluation
                 try:
-                    neo_eval = NeoEvaluation.nodes.get(title=question.evaluation.title)
+                    neo_eval = NeoEvaluation.nodes.get(django_id=question.evaluation_id)
                     neo_eval.questions.connect(neo_question)
                 except Exception:
                     pass
@@ -358,8 +509,8 @@ class Command(BaseCommand):
         count = 0
         for enrollment in enrollments:
             try:
-                neo_student = NeoUser.nodes.get(username=enrollment.student.username)
-                neo_course = NeoCourse.nodes.get(title=enrollment.course.title)
+                neo_student = NeoUser.nodes.get(django_id=enrollment.student_id)
+                neo_course = NeoCourse.nodes.get(django_id=enrollment.course_id)
                 
                 neo_student.enrolled_in.connect(neo_course, {
                     'enrolled_on': enrollment.enrolled_on,
@@ -373,6 +524,11 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f'✅ {count}/{enrollments.count()} enrollments migrés'))
 
+        # Compteurs dénormalisés NeoCourse.enrollment_count
+        fixed = NeoCourse.rebuild_enrollment_counts()
+        if verbose:
+            self.stdout.write(f'   ✓ enrollment_count recalculé sur {fixed} cours')
+
     def migrate_submissions(self, dry_run, verbose, NeoUser, NeoEvaluation, Submission):
         """Migrer les soumissions"""
         submissions = Submission.objects.all()
@@ -385,8 +541,8 @@ class Command(BaseCommand):
         count = 0
         for submission in submissions:
             try:
-                neo_student = NeoUser.nodes.get(username=submission.student.username)
-                neo_eval = NeoEvaluation.nodes.get(title=submission.evaluation.title)
+                neo_student = NeoUser.nodes.get(django_id=submission.student_id)
+                neo_eval = NeoEvaluation.nodes.get(django_id=submission.evaluation_id)
                 
                 neo_student.submitted.connect(neo_eval, {
                     'submitted_on': submission.submitted_on,
@@ -418,8 +574,8 @@ class Command(BaseCommand):
         count = 0
         for view in views:
             try:
-                neo_student = NeoUser.nodes.get(username=view.student.username)
-                neo_resource = NeoResource.nodes.get(title=view.resource.title)
+                neo_student = NeoUser.nodes.get(django_id=view.student_id)
+                neo_resource = NeoResource.nodes.get(django_id=view.resource_id)
                 
                 neo_student.viewed.connect(neo_resource, {
                     'viewed_on': view.viewed_on
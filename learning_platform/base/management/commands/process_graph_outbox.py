@@ -0,0 +1,104 @@
+"""
+Command pour appliquer l'outbox de synchronisation Django → Neo4j
+Usage: python manage.py process_graph_outbox [--batch-size 500] [--loop] [--interval 2] [--verbose]
+
+Sans --loop, vide la file puis s'arrête (cron). Avec --loop, tourne en continu (worker).
+Les événements en échec sont repris avec un délai exponentiel, puis marqués 'failed'
+après GRAPH_SYNC_MAX_ATTEMPTS tentatives (--retry-failed pour les relancer).
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import logging
+import time
+
+from base.graph_sync import process_batch, purge_processed
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Applique les événements GraphSyncEvent en attente dans Neo4j (UNWIND/MERGE par lots)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'GRAPH_SYNC_BATCH_SIZE', 500),
+            help='Événements par lot (défaut: settings.GRAPH_SYNC_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourner en continu au lieu de s\'arrêter quand la file est vide'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Attente (secondes) quand la file est vide, avec --loop (défaut: 2)'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Remettre en attente les événements marqués \'failed\''
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=7,
+            help='Supprimer les événements appliqués depuis plus de N jours (défaut: 7, 0 = jamais)'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les détails'
+        )
+
+    def handle(self, *args, **options):
+        from base.models import GraphSyncEvent
+
+        verbose = options['verbose']
+        max_attempts = getattr(settings, 'GRAPH_SYNC_MAX_ATTEMPTS', 5)
+        retry_delay = getattr(settings, 'GRAPH_SYNC_RETRY_DELAY', 30)
+
+        if options['retry_failed']:
+            count = GraphSyncEvent.objects.filter(status='failed').update(status='pending', attempts=0)
+            self.stdout.write(f'   ↻ {count} événements en échec remis en attente')
+
+        if options['purge_days']:
+            purged = purge_processed(options['purge_days'])
+            if verbose and purged:
+                self.stdout.write(f'   🗑 {purged} événements appliqués supprimés')
+
+        totals = {'done': 0, 'superseded': 0, 'retried': 0, 'failed': 0}
+        start = time.monotonic()
+
+        try:
+            while True:
+                stats = process_batch(options['batch_size'], max_attempts, retry_delay)
+                for key, value in stats.items():
+                    totals[key] += value
+
+                processed = sum(stats.values())
+                if verbose and processed:
+                    self.stdout.write(
+                        f'   ✓ lot: {stats["done"]} appliqués, {stats["superseded"]} remplacés, '
+                        f'{stats["retried"]} reportés, {stats["failed"]} en échec'
+                    )
+
+                # Lot vide ou en erreur: attendre (worker) ou s'arrêter (cron)
+                if not stats['done'] and not stats['superseded']:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('\n   ⏹ Arrêt demandé')
+
+        pending = GraphSyncEvent.objects.filter(status='pending').count()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {totals["done"]} événements appliqués ({totals["superseded"]} remplacés, '
+            f'{totals["retried"]} reportés, {totals["failed"]} en échec) '
+            f'en {time.monotonic() - start:.1f}s - {pending} en attente'
+        ))
@@ -0,0 +1,55 @@
+"""
+Command pour recalculer le compteur dénormalisé NeoCourse.enrollment_count
+Usage: python manage.py rebuild_enrollment_counts [--verbose]
+
+Le compteur est maintenu à chaque inscription/désinscription (EnrollView, UnenrollView).
+À exécuter après un import en masse ou si des relations ENROLLED_IN ont été
+modifiées hors de l'application.
+"""
+
+from django.core.management.base import BaseCommand
+from neomodel import db
+import logging
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Recalcule NeoCourse.enrollment_count depuis les relations ENROLLED_IN'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les cours corrigés'
+        )
+
+    def handle(self, *args, **options):
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        from base.neo_models import NeoCourse
+
+        try:
+            if options['verbose']:
+                drifted, _ = db.cypher_query(
+                    """
+                    MATCH (c:NeoCourse)
+                    WITH c, size([(c)<-[:ENROLLED_IN]-(:NeoUser) | 1]) AS actual
+                    WHERE c.enrollment_count IS NULL OR c.enrollment_count <> actual
+                    RETURN c.title, c.enrollment_count, actual
+                    ORDER BY c.title
+                    """
+                )
+                for title, stored, actual in drifted:
+                    self.stdout.write(f'   • {title}: {stored} → {actual}')
+
+            fixed = NeoCourse.rebuild_enrollment_counts()
+            self.stdout.write(self.style.SUCCESS(f'✅ {fixed} compteurs enrollment_count corrigés'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'\n❌ ERREUR: {str(e)}'))
+            logger.error(f'Enrollment count rebuild error: {str(e)}', exc_info=True)
+            raise
@@ -0,0 +1,118 @@
+"""
+Command pour détecter (et réparer) les écarts entre la base Django et Neo4j
+Usage: python manage.py reconcile_graph [--entity courses] [--chunk-size 1000]
+                                        [--deep] [--repair] [--verbose]
+
+Compare des empreintes par tranches de PK calculées en SQL et en Cypher, puis ne relit
+que les tranches divergentes (voir base/graph_reconcile.py).
+À exécuter via cron job (ex: chaque nuit), en complément de process_graph_outbox.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+import logging
+import time
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Détecte les écarts SQL ↔ Neo4j par empreintes de tranches de PK (et les répare)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            help='Limiter à cette étape (users, courses, enrollments...; option répétable)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Nombre de PK par tranche (défaut: 1000)'
+        )
+        parser.add_argument(
+            '--deep',
+            action='store_true',
+            help='Comparer toutes les tranches ligne à ligne, même celles dont les empreintes concordent'
+        )
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Réécrire les lignes manquantes ou modifiées et supprimer les orphelins'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les détails'
+        )
+
+    def handle(self, *args, **options):
+        from base.course_tree import invalidate_course_trees
+        from base.graph_reconcile import reconcile_step
+        from base.graph_sync import BULK_STEPS
+        from base.neo_models import NeoCourse
+
+        verbose = options['verbose']
+        steps = BULK_STEPS
+        if options['entity']:
+            unknown = set(options['entity']) - {step.name for step in BULK_STEPS}
+            if unknown:
+                raise CommandError(f'Étapes inconnues: {", ".join(sorted(unknown))}')
+            steps = [step for step in BULK_STEPS if step.name in options['entity']]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{"="*60}\n'
+            f'RÉCONCILIATION SQL ↔ Neo4j\n'
+            f'Mode: {"RÉPARATION" if options["repair"] else "DÉTECTION"}\n'
+            f'{"="*60}\n'
+        ))
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        start = time.monotonic()
+        drift = 0
+        repaired = 0
+        enrollments_repaired = False
+        for step in steps:
+            report = reconcile_step(
+                step,
+                chunk_size=options['chunk_size'],
+                deep=options['deep'],
+                repair=options['repair']
+            )
+            differences = len(report['missing']) + len(report['orphans']) + len(report['changed'])
+            drift += differences
+            repaired += report['repaired']
+            if step.name in ('courses', 'enrollments') and report['repaired']:
+                enrollments_repaired = True
+
+            if not differences:
+                self.stdout.write(f'   ✓ {step.name}: {report["chunks"]} tranches identiques')
+                continue
+
+            self.stdout.write(self.style.WARNING(
+                f'   ⚠ {step.name}: {report["mismatched_chunks"]}/{report["chunks"]} tranches divergentes - '
+                f'{len(report["missing"])} manquants, {len(report["orphans"])} orphelins, '
+                f'{len(report["changed"])} modifiés'
+                + (f' → {report["repaired"]} réparés' if options['repair'] else '')
+            ))
+            if verbose:
+                for label in ('missing', 'orphans', 'changed'):
+                    if report[label]:
+                        sample = ', '.join(str(key) for key in report[label][:10])
+                        more = f' (+{len(report[label]) - 10})' if len(report[label]) > 10 else ''
+                        self.stdout.write(f'     · {label}: {sample}{more}')
+
+        if enrollments_repaired:
+            NeoCourse.rebuild_enrollment_counts()
+        if repaired:
+            invalidate_course_trees()
+
+        elapsed = time.monotonic() - start
+        if drift:
+            self.stdout.write(self.style.WARNING(f'\n⚠ {drift} écarts détectés ({elapsed:.1f}s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\n✅ SQL et Neo4j concordent ({elapsed:.1f}s)'))
@@ -0,0 +1,115 @@
+"""
+Command pour (re)calculer les recommandations matérialisées des étudiants
+Usage: python manage.py refresh_recommendations [--username USER] [--batch-size 200]
+                                               [--output recommendations.jsonl] [--verbose]
+
+À exécuter via cron job (ex: chaque nuit) pour garder la table StudentRecommendation à jour.
+Avec --output, les résultats sont écrits en JSON Lines (une ligne par étudiant)
+au lieu d'être enregistrés en base, pour les emails ou les analyses.
+"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+import json
+import logging
+import time
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Calcule et enregistre le top-N des recommandations de chaque étudiant'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            action='append',
+            help='Limiter le calcul à cet étudiant (option répétable)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Nombre d\'étudiants par requête Cypher (défaut: 200)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Écrire les résultats dans ce fichier JSONL au lieu de la table StudentRecommendation'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche les détails'
+        )
+
+    def handle(self, *args, **options):
+        verbose = options['verbose']
+        usernames = options['username']
+        batch_size = options['batch_size']
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        User = get_user_model()
+        students = User.objects.filter(role='Student').order_by('pk')
+        if usernames:
+            students = students.filter(username__in=usernames)
+
+        total = students.count()
+        self.stdout.write(f'\n🧠 Recommandations: {total} étudiants à traiter')
+
+        start = time.monotonic()
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else None
+        try:
+            refreshed = 0
+            batch = []
+            for student in students.iterator(chunk_size=batch_size):
+                batch.append(student)
+                if len(batch) >= batch_size:
+                    refreshed += self.process_batch(batch, output, verbose)
+                    batch = []
+            if batch:
+                refreshed += self.process_batch(batch, output, verbose)
+        finally:
+            if output:
+                output.close()
+
+        destination = options['output'] or 'StudentRecommendation'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {refreshed}/{total} étudiants mis à jour → {destination} '
+            f'({time.monotonic() - start:.1f}s)'
+        ))
+
+    def process_batch(self, students, output, verbose):
+        """Calculer un lot d'étudiants et l'écrire (table ou fichier JSONL)"""
+        from base.recommendations import CourseRecommendationEngine, RecommendationStore
+
+        if output is None:
+            refreshed = RecommendationStore.refresh_students(students)
+            if verbose:
+                self.stdout.write(f'   ✓ lot de {len(students)} étudiants: {refreshed} mis à jour')
+            return refreshed
+
+        results = CourseRecommendationEngine.get_recommendations_for_students(
+            [student.username for student in students],
+            limit=RecommendationStore.store_size(),
+            chunk_size=len(students)
+        )
+        written = 0
+        for student in students:
+            recommendations = results.get(student.username)
+            if recommendations is None:
+                self.stdout.write(f'   ⚠ calcul en échec, ignoré: {student.username}')
+                continue
+            output.write(json.dumps({
+                'student_id': student.pk,
+                'username': student.username,
+                'recommendations': recommendations
+            }, ensure_ascii=False, default=str) + '\n')
+            if recommendations:
+                written += 1
+            elif verbose:
+                self.stdout.write(f'   ⚠ aucune recommandation: {student.username}')
+        return written
@@ -2,14 +2,15 @@
 Command pour configurer Neo4j Graph Data Science (GDS)
 Usage: python manage.py setup_gds
 
-Ce script crée les indexes et prépare le graphe pour les algorithmes de recommandation.
+Ce script crée les indexes (voir base/graph_schema.py) et prépare le graphe pour les algorithmes de recommandation.
 """
 
 from django.core.management.base import BaseCommand
-from neomodel import db, config
-from django.conf import settings
+from neomodel import db
 import logging
 
+from base.neo_connection import ensure_neo4j_connection
+
 logger = logging.getLogger('base')
 
 
@@ -32,20 +33,17 @@ class Command(BaseCommand):
             f'{"="*60}\n'
         ))
 
-        # Configurer neomodel
-        config.DATABASE_URL = settings.NEOMODEL_NEO4J_BOLT_URL
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
 
         try:
-            # Étape 1: Créer les indexes
+            # Étape 1: Créer et vérifier les indexes et contraintes
             self.create_indexes(verbose)
 
             # Étape 2: Compter les entités
             self.count_entities()
 
-            # Étape 3: Créer les constraints
-            self.create_constraints(verbose)
-
-            # Étape 4: Créer la projection GDS
+            # Étape 3: Créer la projection GDS
             self.create_gds_projection(verbose)
 
             self.stdout.write(self.style.SUCCESS(
@@ -60,93 +58,38 @@ class Command(BaseCommand):
             raise
 
     def create_indexes(self, verbose):
-        """Créer les indexes pour optimiser les requêtes"""
-        self.stdout.write('\n🔍 Création des indexes...')
+        """Créer et vérifier les index et contraintes requis (base/graph_schema.py)"""
+        from base.graph_schema import GRAPH_SCHEMA, ensure_schema
         
-        indexes = [
-            # Users
-            ("NeoUser", "username"),
-            ("NeoUser", "email"),
-            ("NeoUser", "role"),
-            # Courses
-            ("NeoCourse", "title"),
-            ("NeoCourse", "level"),
-            # Modules
-            ("NeoModule", "title"),
-            # Evaluations
-            ("NeoEvaluation", "title"),
-            # Skills
-            ("NeoSkill", "name"),
-        ]
+        self.stdout.write('\n🔍 Création des indexes et contraintes...')
         
-        created = 0
-        for label, prop in indexes:
-            try:
-                query = f"CREATE INDEX {label.lower()}_{prop}_idx IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
-                db.cypher_query(query)
-                created += 1
-                if verbose:
-                    self.stdout.write(f'   ✓ Index {label}.{prop}')
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f'   ⚠ Index {label}.{prop}: {e}'))
+        ensure_schema()
+        if verbose:
+            for spec in GRAPH_SCHEMA:
+                kind = 'Unique' if spec.unique else 'Index'
+                self.stdout.write(f'   ✓ {kind} {spec}')
 
-        self.stdout.write(self.style.SUCCESS(f'✅ {created} indexes créés'))
-
-    def create_constraints(self, verbose):
-        """Créer les contraintes d'unicité"""
-        self.stdout.write('\n🔒 Création des contraintes...')
-        
-        constraints = [
-            ("NeoUser", "uid"),
-            ("NeoUser", "username"),
-            ("NeoCourse", "uid"),
-            ("NeoModule", "uid"),
-            ("NeoResource", "uid"),
-            ("NeoEvaluation", "uid"),
-            ("NeoQuestion", "uid"),
-            ("NeoSkill", "uid"),
-        ]
-        
-        created = 0
-        for label, prop in constraints:
-            try:
-                query = f"CREATE CONSTRAINT {label.lower()}_{prop}_unique IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
-                db.cypher_query(query)
-                created += 1
-                if verbose:
-                    self.stdout.write(f'   ✓ Unique {label}.{prop}')
-            except Exception as e:
-                # Les contraintes peuvent déjà exister
-                if verbose:
-                    self.stdout.write(self.style.WARNING(f'   ⚠ Constraint {label}.{prop}: {e}'))
-
-        self.stdout.write(self.style.SUCCESS(f'✅ {created} contraintes créées'))
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(GRAPH_SCHEMA)} indexes vérifiés'))
 
     def count_entities(self):
-        """Afficher un résumé des entités"""
+        """Afficher un résumé des entités (count store, voir base/graph_stats.py)"""
+        from base.graph_stats import graph_counts
+        
         self.stdout.write('\n📊 État actuel du graphe:')
         
         try:
-            # Compter les nœuds
-            result, _ = db.cypher_query(
-                "MATCH (n) RETURN labels(n)[0] AS label, count(n) AS count ORDER BY label"
-            )
+            counts = graph_counts(use_cache=False)
             
-            if result:
-                for row in result:
-                    self.stdout.write(f'   • {row[0]}: {row[1]}')
+            if counts['node_stats']:
+                for stat in counts['node_stats']:
+                    self.stdout.write(f'   • {stat["label"]}: {stat["count"]}')
             else:
                 self.stdout.write('   Aucun nœud (graphe vide)')
                 
-            # Compter les relations
-            result, _ = db.cypher_query(
-                "MATCH ()-[r]->() RETURN type(r) AS type, count(r) AS count ORDER BY type"
-            )
-            
-            if result:
+            if counts['rel_stats']:
                 self.stdout.write('\n   Relations:')
-                for row in result:
-                    self.stdout.write(f'   • {row[0]}: {row[1]}')
+                for stat in counts['rel_stats']:
+                    self.stdout.write(f'   • {stat["type"]}: {stat["count"]}')
                     
         except Exception as e:
             self.stdout.write(self.style.WARNING(f'   Impossible de compter: {e}'))
@@ -0,0 +1,55 @@
+"""
+Command pour resynchroniser tous les Users Django vers les NeoUser
+Usage: python manage.py sync_neo_users [--batch-size 5000] [--verbose]
+
+Même opération que le bouton "Synchroniser Users" de l'admin Neo4j, exécutée au
+premier plan: les users sont lus en flux (.iterator()) et écrits par lots UNWIND/MERGE.
+"""
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+import logging
+
+from base.neo_connection import ensure_neo4j_connection
+
+logger = logging.getLogger('base')
+
+
+class Command(BaseCommand):
+    help = 'Resynchronise tous les Users Django vers Neo4j (UNWIND/MERGE par lots)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'GRAPH_SYNC_USERS_BATCH_SIZE', 5000),
+            help='Users par requête UNWIND (défaut: settings.GRAPH_SYNC_USERS_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Affiche la progression de chaque lot'
+        )
+
+    def handle(self, *args, **options):
+        from base.graph_sync import sync_users
+
+        # Connexion Neo4j (driver partagé du processus)
+        ensure_neo4j_connection()
+
+        progress = None
+        if options['verbose']:
+            def progress(done, total):
+                self.stdout.write(f'   ✓ {done}/{total} users')
+
+        try:
+            rows, elapsed = sync_users(options['batch_size'], on_progress=progress)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'\n❌ ERREUR: {str(e)}'))
+            logger.error(f'User sync error: {str(e)}', exc_info=True)
+            raise
+
+        rate = rows / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {rows} users synchronisés vers Neo4j en {elapsed:.1f}s ({rate:,.0f} users/s)'
+        ))
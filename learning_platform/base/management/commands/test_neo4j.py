@@ -26,13 +26,17 @@ class Command(BaseCommand):
         # =====================================================
         self.stdout.write('\n[TEST 1] Connexion Neo4j...')
         try:
-            # Reinitialiser la connexion neomodel
+            # Rattacher neomodel au driver partagé du processus
+            from base.neo_connection import connection_manager
             url = settings.NEOMODEL_NEO4J_BOLT_URL
-            db.set_connection(url)
+            connection_manager.ensure_connection()
             
             result, _ = db.cypher_query("RETURN 'Connexion OK!' AS message")
             self.stdout.write(self.style.SUCCESS(f'   OK: {result[0][0]}'))
             self.stdout.write(f'   URL: {url}')
+            
+            health = connection_manager.health_check()
+            self.stdout.write(f'   Sonde: {health["latency_ms"]} ms')
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'   ERREUR: {e}'))
             self.stdout.write('\n   Solutions possibles:')
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_graphmigrationcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='graphsyncevent',
+            index=models.Index(fields=['entity', 'object_id', 'status'], name='base_graphs_entity_b59a9b_idx'),
+        ),
+    ]
@@ -2,6 +2,9 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+import hashlib
+import json
 from .validators import validate_resource_file, validate_submission_file, validate_course_image
 
 
@@ -500,3 +503,117 @@ class CourseModification(models.Model):
 
     def __str__(self):
         return f"{self.user.username} modified {self.course.title} at {self.modified_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+# =====================
+# Recommandations matérialisées (StudentRecommendation)
+# =====================
+
+class StudentRecommendation(models.Model):
+    """
+    Top-N des recommandations pré-calculées pour un étudiant.
+    Rempli par la commande refresh_recommendations et rafraîchi à l'inscription/désinscription,
+    le dashboard lit cette ligne au lieu de parcourir le graphe Neo4j.
+    """
+    student = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recommendation_snapshot')
+    recommendations = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommendations for {self.student.username} ({len(self.recommendations)})"
+
+
+# =====================
+# Outbox de synchronisation Django → Neo4j
+# =====================
+
+class GraphSyncEvent(models.Model):
+    """
+    Changement à répercuter dans Neo4j, écrit dans la même transaction que la donnée Django.
+    Les signaux remplissent cette table; `manage.py process_graph_outbox` la vide par lots
+    (UNWIND/MERGE), avec reprises et backoff en cas d'erreur.
+    """
+    ENTITY_CHOICES = [
+        ('user', 'User'),
+        ('course', 'Course'),
+        ('enrollment', 'Enrollment'),
+    ]
+    OPERATION_CHOICES = [
+        ('upsert', 'Upsert'),
+        ('delete', 'Delete'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    object_id = models.PositiveIntegerField()
+    payload = models.JSONField(default=dict)
+    # Même entité, même opération, mêmes données que le dernier événement en attente: ignoré
+    idempotency_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id']),
+            models.Index(fields=['entity', 'object_id', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.entity}:{self.operation} #{self.object_id} ({self.status})"
+
+    @staticmethod
+    def make_key(entity, operation, object_id, payload):
+        digest = hashlib.sha1(
+            json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:24]
+        return f"{entity}:{operation}:{object_id}:{digest}"
+
+    @classmethod
+    def enqueue(cls, entity, operation, object_id, payload):
+        """
+        Ajoute un événement, sauf s'il est identique au dernier événement en attente de
+        la même entité. Un événement identique plus ancien ne suffit pas: coalesce_events
+        n'applique que le dernier (A → B → A doit appliquer A).
+        """
+        key = cls.make_key(entity, operation, object_id, payload)
+        latest = (
+            cls.objects.filter(entity=entity, object_id=object_id, status='pending')
+            .order_by('-id').values_list('idempotency_key', flat=True).first()
+        )
+        if latest == key:
+            return None
+        return cls.objects.create(
+            entity=entity,
+            operation=operation,
+            object_id=object_id,
+            payload=payload,
+            idempotency_key=key
+        )
+
+
+class GraphMigrationCheckpoint(models.Model):
+    """
+    Filigrane (watermark) de `migrate_to_neo4j --incremental` pour une étape de migration:
+    dernier PK écrit dans Neo4j. Mis à jour après chaque lot validé, pour reprendre
+    au lot suivant après une interruption.
+    """
+    entity = models.CharField(max_length=50, unique=True)
+    last_pk = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['entity']
+
+    def __str__(self):
+        return f"{self.entity} > {self.last_pk}"
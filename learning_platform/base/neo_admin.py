@@ -10,20 +10,14 @@ from django.views.generic import TemplateView
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.conf import settings
 from neomodel import db
 import logging
 
-logger = logging.getLogger('base')
-
+from base.neo_connection import ensure_neo4j_connection
 
-def ensure_neo4j_connection():
-    """S'assurer que la connexion Neo4j est initialisée"""
-    try:
-        db.set_connection(settings.NEOMODEL_NEO4J_BOLT_URL)
-    except Exception as e:
-        logger.warning(f"Neo4j connection init failed: {e}")
+logger = logging.getLogger('base')
 
 
 class AdminRequiredMixin(UserPassesTestMixin):
@@ -44,63 +38,64 @@ class NeoAdminDashboardView(AdminRequiredMixin, TemplateView):
         ensure_neo4j_connection()
         
         try:
-            # Statistiques des nœuds
-            query = """
-            MATCH (n)
-            RETURN labels(n)[0] AS label, count(n) AS count
-            ORDER BY label
-            """
-            result, _ = db.cypher_query(query)
-            context['node_stats'] = [{'label': r[0], 'count': r[1]} for r in result]
-            
-            # Statistiques des relations
-            query = """
-            MATCH ()-[r]->()
-            RETURN type(r) AS rel_type, count(r) AS count
-            ORDER BY rel_type
-            """
-            result, _ = db.cypher_query(query)
-            context['rel_stats'] = [{'type': r[0], 'count': r[1]} for r in result]
-            
-            # Totaux
-            context['total_nodes'] = sum(s['count'] for s in context['node_stats'])
-            context['total_relationships'] = sum(s['count'] for s in context['rel_stats'])
+            # Statistiques des nœuds et relations (count store, cache court)
+            from base.graph_stats import graph_counts
+            context.update(graph_counts())
             
         except Exception as e:
             context['error'] = f"Erreur de connexion Neo4j: {e}"
             context['node_stats'] = []
             context['rel_stats'] = []
-            
+        
+        from base.graph_sync import user_sync_status
+        context['user_sync'] = user_sync_status()
         return context
 
 
-class NeoUserListView(AdminRequiredMixin, TemplateView):
-    """Liste des utilisateurs Neo4j"""
+class KeysetListMixin:
+    """
+    Pagination par curseur des listes (base/neo_pagination.py).
+    Ajoute au contexte: has_next/has_prev, next_cursor/prev_cursor, total (approximatif).
+    """
+    paginate_by = 20
+    
+    def get_page(self, label, sort_property, body):
+        from base.neo_pagination import KeysetPaginator
+        
+        paginator = KeysetPaginator(label, sort_property, per_page=self.paginate_by)
+        page = paginator.page(
+            body,
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before')
+        )
+        context = {
+            'has_next': page['has_next'],
+            'has_prev': page['has_prev'],
+            'next_cursor': page['next_cursor'],
+            'prev_cursor': page['prev_cursor'],
+            'total': page['approximate_total'],
+        }
+        return page['rows'], context
+
+
+class NeoUserListView(AdminRequiredMixin, KeysetListMixin, TemplateView):
+    """Liste des utilisateurs Neo4j (pagination par curseur sur username)"""
     template_name = 'neo_admin/user_list.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         try:
-            from base.neo_models import NeoUser
-            
-            # Pagination simple
-            page = int(self.request.GET.get('page', 1))
-            per_page = 20
-            skip = (page - 1) * per_page
+            # Initialiser la connexion Neo4j
+            ensure_neo4j_connection()
             
-            # Récupérer les users
-            query = """
-            MATCH (u:NeoUser)
-            RETURN u
-            ORDER BY u.username
-            SKIP $skip LIMIT $limit
-            """
-            result, _ = db.cypher_query(query, {'skip': skip, 'limit': per_page})
+            rows, page_context = self.get_page('NeoUser', 'username', """
+            RETURN n AS node, n.username AS sort_key, n.uid AS uid
+            """)
             
             users = []
-            for row in result:
-                node = row[0]
+            for row in rows:
+                node = row['node']
                 users.append({
                     'uid': node.get('uid'),
                     'username': node.get('username'),
@@ -110,13 +105,7 @@ class NeoUserListView(AdminRequiredMixin, TemplateView):
                 })
             
             context['users'] = users
-            context['page'] = page
-            
-            # Compter le total
-            count_result, _ = db.cypher_query("MATCH (u:NeoUser) RETURN count(u)")
-            context['total'] = count_result[0][0] if count_result else 0
-            context['has_next'] = context['total'] > page * per_page
-            context['has_prev'] = page > 1
+            context.update(page_context)
             
         except Exception as e:
             context['error'] = f"Erreur: {e}"
@@ -125,38 +114,39 @@ class NeoUserListView(AdminRequiredMixin, TemplateView):
         return context
 
 
-class NeoCourseListView(AdminRequiredMixin, TemplateView):
-    """Liste des cours Neo4j"""
+class NeoCourseListView(AdminRequiredMixin, KeysetListMixin, TemplateView):
+    """Liste des cours Neo4j (pagination par curseur sur le titre)"""
     template_name = 'neo_admin/course_list.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         try:
-            query = """
-            MATCH (c:NeoCourse)
-            OPTIONAL MATCH (i:NeoUser)-[:TEACHES]->(c)
-            OPTIONAL MATCH (s:NeoUser)-[:ENROLLED_IN]->(c)
-            RETURN c.uid AS uid, 
-                   c.title AS title, 
-                   c.level AS level,
-                   i.username AS instructor,
-                   count(DISTINCT s) AS students
-            ORDER BY c.title
-            """
-            result, _ = db.cypher_query(query)
+            # Initialiser la connexion Neo4j
+            ensure_neo4j_connection()
+            
+            # Étudiants: compteur dénormalisé (pas de parcours des ENROLLED_IN)
+            rows, page_context = self.get_page('NeoCourse', 'title', """
+            OPTIONAL MATCH (i:NeoUser)-[:TEACHES]->(n)
+            RETURN n.uid AS uid, 
+                   n.title AS sort_key, 
+                   n.level AS level,
+                   head(collect(i.username)) AS instructor,
+                   coalesce(n.enrollment_count, 0) AS students
+            """)
             
             courses = []
-            for row in result:
+            for row in rows:
                 courses.append({
-                    'uid': row[0],
-                    'title': row[1],
-                    'level': row[2],
-                    'instructor': row[3],
-                    'students': row[4]
+                    'uid': row['uid'],
+                    'title': row['sort_key'],
+                    'level': row['level'],
+                    'instructor': row['instructor'],
+                    'students': row['students']
                 })
             
             context['courses'] = courses
+            context.update(page_context)
             
         except Exception as e:
             context['error'] = f"Erreur: {e}"
@@ -165,8 +155,13 @@ class NeoCourseListView(AdminRequiredMixin, TemplateView):
         return context
 
 
-class NeoModuleListView(AdminRequiredMixin, TemplateView):
-    """Liste des modules Neo4j"""
+class NeoModuleListView(AdminRequiredMixin, KeysetListMixin, TemplateView):
+    """
+    Liste des modules Neo4j (pagination par curseur sur le titre).
+    L'ancien tri (titre du cours, ordre du module) passe par la relation CONTAINS et
+    ne peut pas servir de clé indexée: la liste est triée par titre de module (le plan
+    ordonné d'un cours reste sur la page du cours, voir base/course_tree.py).
+    """
     template_name = 'neo_admin/module_list.html'
     
     def get_context_data(self, **kwargs):
@@ -176,32 +171,27 @@ class NeoModuleListView(AdminRequiredMixin, TemplateView):
             # Initialiser la connexion Neo4j
             ensure_neo4j_connection()
             
-            query = """
-            MATCH (m:NeoModule)
-            OPTIONAL MATCH (c:NeoCourse)-[:CONTAINS]->(m)
-            OPTIONAL MATCH (m)-[:HAS_RESOURCE]->(r:NeoResource)
-            OPTIONAL MATCH (m)-[:HAS_EVALUATION]->(e:NeoEvaluation)
-            RETURN m.uid AS uid, 
-                   m.title AS title, 
-                   m.order AS module_order,
-                   c.title AS course,
-                   count(DISTINCT r) AS resources,
-                   count(DISTINCT e) AS evaluations
-            ORDER BY course, module_order
-            """
-            result, _ = db.cypher_query(query)
+            rows, page_context = self.get_page('NeoModule', 'title', """
+            OPTIONAL MATCH (c:NeoCourse)-[:CONTAINS]->(n)
+            RETURN n.uid AS uid, 
+                   n.title AS sort_key, 
+                   head(collect(c.title)) AS course,
+                   size([(n)-[:HAS_RESOURCE]->(:NeoResource) | 1]) AS resources,
+                   size([(n)-[:HAS_EVALUATION]->(:NeoEvaluation) | 1]) AS evaluations
+            """)
             
             modules = []
-            for row in result:
+            for row in rows:
                 modules.append({
-                    'uid': row[0],
-                    'title': row[1],
-                    'course': row[2],
-                    'resources': row[3],
-                    'evaluations': row[4]
+                    'uid': row['uid'],
+                    'title': row['sort_key'],
+                    'course': row['course'],
+                    'resources': row['resources'],
+                    'evaluations': row['evaluations']
                 })
             
             context['modules'] = modules
+            context.update(page_context)
             
         except Exception as e:
             context['error'] = f"Erreur: {e}"
@@ -297,26 +287,27 @@ class NeoCourseDeleteView(AdminRequiredMixin, View):
 
 
 class NeoSyncView(AdminRequiredMixin, View):
-    """Synchroniser manuellement les Users Django vers Neo4j"""
+    """
+    Synchroniser manuellement les Users Django vers Neo4j.
+    La synchronisation (UNWIND/MERGE par lots) tourne en arrière-plan;
+    sa progression est affichée sur le dashboard.
+    """
     
     def post(self, request):
-        try:
-            from django.contrib.auth import get_user_model
-            from base.neo_models import NeoUser
-            
-            User = get_user_model()
-            synced = 0
-            
-            for user in User.objects.all():
-                try:
-                    NeoUser.get_or_create_from_django_user(user)
-                    synced += 1
-                except Exception as e:
-                    logger.warning(f"Sync failed for {user.username}: {e}")
-            
-            messages.success(request, f"{synced} utilisateurs synchronisés vers Neo4j.")
-            
-        except Exception as e:
-            messages.error(request, f"Erreur: {e}")
+        from base.graph_sync import start_user_sync_job
+        
+        if start_user_sync_job():
+            messages.success(request, "Synchronisation des utilisateurs lancée en arrière-plan.")
+        else:
+            messages.warning(request, "Une synchronisation est déjà en cours.")
             
         return redirect('neo-admin-dashboard')
+
+
+class NeoSyncStatusView(AdminRequiredMixin, View):
+    """Progression de la synchronisation des users (JSON, interrogé par le dashboard)"""
+    
+    def get(self, request):
+        from base.graph_sync import user_sync_status
+        
+        return JsonResponse(user_sync_status() or {'status': None})
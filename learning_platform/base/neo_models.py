@@ -10,7 +10,7 @@ from neomodel import (
     StructuredNode, StructuredRel, StringProperty, IntegerProperty,
     DateTimeProperty, DateProperty, FloatProperty, BooleanProperty,
     RelationshipTo, RelationshipFrom, Relationship,
-    UniqueIdProperty, JSONProperty
+    UniqueIdProperty, JSONProperty, db
 )
 from django.contrib.auth.hashers import make_password, check_password
 from datetime import datetime
@@ -90,6 +90,7 @@ class NeoUser(StructuredNode):
     Synchronisé avec Django auth_user via username
     """
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     username = StringProperty(unique_index=True, required=True)
     email = StringProperty(unique_index=True, required=True)
     first_name = StringProperty(default='')
@@ -125,6 +126,7 @@ class NeoUser(StructuredNode):
         try:
             neo_user = cls.nodes.get(username=django_user.username)
             # Mise à jour
+            neo_user.django_id = django_user.pk
             neo_user.email = django_user.email
             neo_user.first_name = django_user.first_name
             neo_user.last_name = django_user.last_name
@@ -137,6 +139,7 @@ class NeoUser(StructuredNode):
         except cls.DoesNotExist:
             # Création
             neo_user = cls(
+                django_id=django_user.pk,
                 username=django_user.username,
                 email=django_user.email,
                 first_name=django_user.first_name,
@@ -152,6 +155,7 @@ class NeoUser(StructuredNode):
 class NeoCourse(StructuredNode):
     """Nœud Course - Représente un cours"""
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     title = StringProperty(required=True)
     description = StringProperty()
     level = StringProperty(default='Beginner')  # Beginner, Intermediate, Advanced
@@ -159,6 +163,7 @@ class NeoCourse(StructuredNode):
     start_date = DateProperty()
     end_date = DateProperty()
     image_path = StringProperty()  # Chemin vers l'image
+    enrollment_count = IntegerProperty(default=0, index=True)  # Nombre de relations ENROLLED_IN (dénormalisé)
     
     created_at = DateTimeProperty(default_now=True)
     updated_at = DateTimeProperty(default_now=True)
@@ -170,19 +175,60 @@ class NeoCourse(StructuredNode):
     teaches_skills = RelationshipTo('NeoSkill', 'TEACHES')
     similar_to = RelationshipTo('NeoCourse', 'SIMILAR_TO', model=SimilarityRel)
     
+    @classmethod
+    def get_for_django_course(cls, course):
+        """
+        Retrouve le NeoCourse d'un Course Django via son PK (django_id).
+        Les nœuds créés avant l'ajout de django_id sont retrouvés par titre
+        puis complétés avec le PK.
+        """
+        neo_course = cls.nodes.get_or_none(django_id=course.pk)
+        if neo_course is None:
+            neo_course = cls.nodes.first_or_none(title=course.title, django_id__isnull=True)
+            if neo_course is not None:
+                neo_course.django_id = course.pk
+                neo_course.save()
+        return neo_course
+    
+    @classmethod
+    def rebuild_enrollment_counts(cls):
+        """
+        Recalcule enrollment_count depuis les relations ENROLLED_IN
+        (après un import en masse ou pour corriger une dérive).
+        
+        Returns:
+            Nombre de cours dont le compteur a été corrigé
+        """
+        result, _ = db.cypher_query(
+            """
+            MATCH (c:NeoCourse)
+            WITH c, size([(c)<-[:ENROLLED_IN]-(:NeoUser) | 1]) AS actual
+            WHERE c.enrollment_count IS NULL OR c.enrollment_count <> actual
+            SET c.enrollment_count = actual
+            RETURN count(c)
+            """
+        )
+        return result[0][0] if result else 0
+    
     def get_instructor(self):
         """Retourne l'instructeur du cours"""
         instructors = self.instructor.all()
         return instructors[0] if instructors else None
     
     def get_modules_ordered(self):
-        """Retourne les modules triés par ordre"""
-        modules_with_order = []
-        for module in self.modules.all():
-            rel = self.modules.relationship(module)
-            modules_with_order.append((rel.order if rel else 0, module))
-        modules_with_order.sort(key=lambda x: x[0])
-        return [m for _, m in modules_with_order]
+        """
+        Retourne les modules triés par ordre (une seule requête).
+        Pour l'arbre complet du cours, voir base/course_tree.load_course_tree.
+        """
+        result, _ = db.cypher_query(
+            """
+            MATCH (c:NeoCourse {uid: $uid})-[r:CONTAINS]->(m:NeoModule)
+            RETURN m
+            ORDER BY coalesce(r.order, 0), m.django_id
+            """,
+            {'uid': self.uid}
+        )
+        return [NeoModule.inflate(row[0]) for row in result]
     
     def __str__(self):
         return self.title
@@ -191,6 +237,7 @@ class NeoCourse(StructuredNode):
 class NeoModule(StructuredNode):
     """Nœud Module - Représente un module de cours"""
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     title = StringProperty(required=True)
     description = StringProperty()
     order = IntegerProperty(default=0)
@@ -208,13 +255,16 @@ class NeoModule(StructuredNode):
         return courses[0] if courses else None
     
     def get_resources_ordered(self):
-        """Retourne les ressources triées"""
-        resources_with_order = []
-        for resource in self.resources.all():
-            rel = self.resources.relationship(resource)
-            resources_with_order.append((rel.order if rel else 0, resource))
-        resources_with_order.sort(key=lambda x: x[0])
-        return [r for _, r in resources_with_order]
+        """Retourne les ressources triées (une seule requête)"""
+        result, _ = db.cypher_query(
+            """
+            MATCH (m:NeoModule {uid: $uid})-[r:HAS_RESOURCE]->(res:NeoResource)
+            RETURN res
+            ORDER BY coalesce(r.order, 0), res.django_id
+            """,
+            {'uid': self.uid}
+        )
+        return [NeoResource.inflate(row[0]) for row in result]
     
     def __str__(self):
         return self.title
@@ -223,6 +273,7 @@ class NeoModule(StructuredNode):
 class NeoResource(StructuredNode):
     """Nœud Resource - Représente une ressource pédagogique"""
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     title = StringProperty(required=True)
     resource_type = StringProperty(default='fichier')  # video, pdf, image, fichier
     url = StringProperty()  # URL externe
@@ -246,6 +297,7 @@ class NeoResource(StructuredNode):
 class NeoEvaluation(StructuredNode):
     """Nœud Evaluation - Quiz ou Assignment"""
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     title = StringProperty(required=True)
     description = StringProperty()
     evaluation_type = StringProperty(default='Quiz')  # Quiz, Assignment
@@ -284,6 +336,7 @@ class NeoEvaluation(StructuredNode):
 class NeoQuestion(StructuredNode):
     """Nœud Question - Question de quiz"""
     uid = UniqueIdProperty()
+    django_id = IntegerProperty(unique_index=True)  # PK Django
     text = StringProperty(required=True)
     option1 = StringProperty(required=True)
     option2 = StringProperty(required=True)
@@ -0,0 +1,135 @@
+"""
+Pagination par curseur (keyset) des listes de l'admin Neo4j
+`ORDER BY ... SKIP $skip LIMIT $limit` relit et jette toutes les lignes des pages
+précédentes: la page 500 coûte 500 pages. Ici chaque page repart de la dernière clé vue:
+
+    MATCH (n:NeoUser)
+    WHERE n.username >= $key AND (n.username > $key OR n.uid > $uid)
+    WITH n ORDER BY n.username, n.uid LIMIT $limit
+
+La borne `>= $key` est servie par l'index de la propriété de tri (voir
+base/graph_schema.py), y compris pour la première page (clé vide). L'uid départage
+les valeurs égales (titres en double).
+
+Le curseur (clé, uid) circule dans l'URL (?after=... / ?before=...), encodé en base64.
+Le total affiché est approximatif: compte du count store mis en cache (base/graph_stats.py),
+sans requête count() à chaque page.
+"""
+
+import base64
+import json
+import logging
+
+from django.conf import settings
+from neomodel import db
+
+logger = logging.getLogger('base')
+
+
+def encode_cursor(key, uid):
+    raw = json.dumps([key, uid]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(token):
+    """(clé, uid) du curseur, ou None s'il est absent ou invalide"""
+    if not token:
+        return None
+    try:
+        key, uid = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(key, str) or not isinstance(uid, str):
+        return None
+    return key, uid
+
+
+class KeysetPaginator:
+    """
+    Pagination d'une liste de nœuds `label` triée par `sort_property` (chaîne indexée).
+
+    Le corps de la requête reçoit les nœuds de la page dans `n` (déjà triés et limités)
+    et doit renvoyer `n.<sort_property> AS sort_key, n.uid AS uid` parmi ses colonnes;
+    le paginateur ajoute le tri final.
+    """
+
+    def __init__(self, label, sort_property, per_page=20):
+        self.label = label
+        self.sort_property = sort_property
+        self.per_page = per_page
+
+    def build_query(self, body, backward=False):
+        prop = f'n.{self.sort_property}'
+        if backward:
+            where = f'{prop} <= $key AND ({prop} < $key OR n.uid < $uid)'
+            order = f'{prop} DESC, n.uid DESC'
+        else:
+            where = f'{prop} >= $key AND ({prop} > $key OR n.uid > $uid)'
+            order = f'{prop}, n.uid'
+        direction = ' DESC' if backward else ''
+        return (
+            f"MATCH (n:{self.label})\n"
+            f"WHERE {where}\n"
+            f"WITH n ORDER BY {order} LIMIT $limit\n"
+            f"{body.strip()}\n"
+            f"ORDER BY sort_key{direction}, uid{direction}"
+        )
+
+    def page(self, body, after=None, before=None, params=None):
+        """
+        Exécuter une page.
+
+        Args:
+            body: suite de la requête (OPTIONAL MATCH ... RETURN ...)
+            after: curseur de la page suivante (?after=)
+            before: curseur de la page précédente (?before=), prioritaire sur `after`
+
+        Returns:
+            dict {'rows': [dict par colonne], 'next_cursor', 'prev_cursor', 'has_next',
+                  'has_prev', 'approximate_total'}
+        """
+        before = decode_cursor(before)
+        after = decode_cursor(after)
+        backward = before is not None
+        key, uid = before or after or ('', '')
+        if backward and key == '' and uid == '':
+            backward = False
+
+        result, columns = db.cypher_query(
+            self.build_query(body, backward),
+            {**(params or {}), 'key': key, 'uid': uid, 'limit': self.per_page + 1}
+        )
+        rows = [dict(zip(columns, row)) for row in result]
+
+        # Une ligne de plus que la page: il reste des éléments dans le sens de lecture
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backward:
+            rows.reverse()
+            has_prev, has_next = more, True
+        else:
+            has_prev, has_next = after is not None, more
+
+        next_cursor = encode_cursor(rows[-1]['sort_key'] or '', rows[-1]['uid']) if rows and has_next else None
+        prev_cursor = encode_cursor(rows[0]['sort_key'] or '', rows[0]['uid']) if rows and has_prev else None
+        # Page vide (éléments supprimés depuis le curseur): pas de lien sans curseur, reste « Début »
+        return {
+            'rows': rows,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'has_next': next_cursor is not None,
+            'has_prev': prev_cursor is not None,
+            'approximate_total': self.approximate_total(),
+        }
+
+    def approximate_total(self):
+        """Nombre de nœuds de l'étiquette (count store, cache court), ou None si désactivé"""
+        if not getattr(settings, 'NEO_ADMIN_LIST_TOTALS', True):
+            return None
+        try:
+            from base.graph_stats import graph_counts
+            counts = graph_counts()
+        except Exception as e:
+            logger.warning(f"Neo admin total unavailable for {self.label}: {e}")
+            return None
+        return next((s['count'] for s in counts['node_stats'] if s['label'] == self.label), 0)
@@ -0,0 +1,302 @@
+"""
+Banc d'essai du moteur de recommandation (latence et qualité)
+
+1. Génère un graphe synthétique (étudiants, cours, compétences, inscriptions)
+   dont une partie des inscriptions est mise de côté (held-out).
+2. Charge ce graphe dans Neo4j (nœuds marqués `benchmark: true`, django_id négatifs
+   pour ne pas entrer en collision avec les PK Django).
+3. Exécute chaque stratégie et le pipeline complet: latences p50/p95/p99,
+   db hits mesurés par PROFILE, precision@k/recall@k sur les inscriptions mises de côté.
+
+Avec `memory_backend()`, le même graphe est servi par le MemoryBackend (base/graph_backend.py):
+aucun service externe, pas de db hits.
+
+Utilisé par `manage.py benchmark_recommendations`, qui écrit le rapport en JSON.
+"""
+
+import contextlib
+import logging
+import time
+
+import numpy as np
+from neomodel import db
+
+logger = logging.getLogger('base')
+
+USERNAME_PREFIX = 'bench_student_'
+
+
+def generate_dataset(students=1000, courses=100, skills=30, enrollments_per_student=5.0,
+                     holdout=0.2, popularity_skew=1.0, seed=42):
+    """
+    Graphe synthétique reproductible.
+
+    Les cours sont regroupés par compétence principale et les étudiants choisissent
+    surtout des cours d'une même compétence (signal pour le filtrage collaboratif
+    et par compétences), la popularité suit une loi de Zipf (`popularity_skew`).
+
+    Returns:
+        dict avec 'course_skills' (liste de compétences par cours), 'train' et
+        'held_out' (username -> liste d'index de cours)
+    """
+    rng = np.random.default_rng(seed)
+
+    primary_skill = rng.integers(0, skills, size=courses)
+    course_skills = []
+    for c in range(courses):
+        extra = rng.choice(skills, size=rng.integers(0, 3), replace=False)
+        course_skills.append(sorted({int(primary_skill[c]), *map(int, extra)}))
+
+    popularity = 1.0 / np.power(np.arange(1, courses + 1), popularity_skew)
+    popularity = popularity[rng.permutation(courses)]
+    by_skill = {s: np.flatnonzero(primary_skill == s) for s in range(skills)}
+
+    train, held_out = {}, {}
+    for i in range(students):
+        username = f'{USERNAME_PREFIX}{i}'
+        count = max(2, min(courses, int(rng.poisson(enrollments_per_student))))
+
+        # 70% des inscriptions dans les compétences favorites de l'étudiant
+        favourite = [s for s in rng.choice(skills, size=2, replace=False) if len(by_skill[s])]
+        pool = np.concatenate([by_skill[s] for s in favourite]) if favourite else np.arange(courses)
+        focused = min(len(pool), int(round(count * 0.7)))
+        weights = popularity[pool] / popularity[pool].sum()
+        chosen = set(rng.choice(pool, size=focused, replace=False, p=weights).tolist())
+        while len(chosen) < count:
+            chosen.add(int(rng.choice(courses, p=popularity / popularity.sum())))
+
+        chosen = list(rng.permutation(sorted(chosen)))
+        n_held = int(len(chosen) * holdout)
+        held_out[username] = [int(c) for c in chosen[:n_held]]
+        train[username] = [int(c) for c in chosen[n_held:]]
+
+    return {
+        'students': students,
+        'courses': courses,
+        'skills': skills,
+        'course_skills': course_skills,
+        'train': train,
+        'held_out': held_out,
+    }
+
+
+def course_django_id(index):
+    """django_id (négatif) du cours synthétique n°index"""
+    return -(index + 1)
+
+
+def course_index(django_id):
+    """Index du cours synthétique à partir de son django_id"""
+    return -django_id - 1
+
+
+def load_dataset(dataset, batch_size=5000):
+    """Écrire le graphe synthétique dans Neo4j par lots (UNWIND)"""
+    clear_dataset()
+
+    db.cypher_query(
+        """
+        UNWIND range(0, $skills - 1) AS i
+        CREATE (:NeoSkill {uid: 'bench-skill-' + toString(i), name: 'Bench skill ' + toString(i),
+                           benchmark: true})
+        """,
+        {'skills': dataset['skills']}
+    )
+
+    course_rows = [
+        {
+            'django_id': course_django_id(c),
+            'uid': f'bench-course-{c}',
+            'title': f'Bench course {c}',
+            'skills': [f'bench-skill-{s}' for s in skills],
+        }
+        for c, skills in enumerate(dataset['course_skills'])
+    ]
+    db.cypher_query(
+        """
+        UNWIND $rows AS row
+        CREATE (c:NeoCourse {uid: row.uid, django_id: row.django_id, title: row.title,
+                             level: 'Beginner', enrollment_count: 0, benchmark: true})
+        WITH c, row
+        UNWIND row.skills AS skill_uid
+        MATCH (s:NeoSkill {uid: skill_uid})
+        CREATE (c)-[:TEACHES_SKILL]->(s)
+        """,
+        {'rows': course_rows}
+    )
+
+    usernames = list(dataset['train'])
+    for start in range(0, len(usernames), batch_size):
+        chunk = usernames[start:start + batch_size]
+        db.cypher_query(
+            """
+            UNWIND $rows AS row
+            CREATE (u:NeoUser {uid: 'bench-' + row.username, username: row.username,
+                               email: row.username + '@bench.local', role: 'Student',
+                               benchmark: true})
+            WITH u, row
+            UNWIND row.courses AS django_id
+            MATCH (c:NeoCourse {django_id: django_id})
+            CREATE (u)-[:ENROLLED_IN {completion_percent: 0.0, certified: false}]->(c)
+            """,
+            {'rows': [
+                {'username': u, 'courses': [course_django_id(c) for c in dataset['train'][u]]}
+                for u in chunk
+            ]}
+        )
+
+    db.cypher_query(
+        """
+        MATCH (c:NeoCourse {benchmark: true})
+        SET c.enrollment_count = size([(c)<-[:ENROLLED_IN]-(:NeoUser) | 1])
+        """
+    )
+
+
+def memory_backend(dataset):
+    """Le graphe synthétique dans un MemoryBackend (benchmark sans Neo4j)"""
+    from base.graph_backend import MemoryBackend
+
+    graph = MemoryBackend()
+    for c, skills in enumerate(dataset['course_skills']):
+        graph.add_course(course_django_id(c), f'Bench course {c}', uid=f'bench-course-{c}')
+        for s in skills:
+            graph.add_skill(course_django_id(c), f'Bench skill {s}')
+    for username, courses in dataset['train'].items():
+        graph.add_user(username)
+        for c in courses:
+            graph.enroll(username, course_django_id(c))
+    return graph
+
+
+def clear_dataset():
+    """Supprimer les nœuds synthétiques (et leurs relations)"""
+    while True:
+        result, _ = db.cypher_query(
+            """
+            MATCH (n {benchmark: true})
+            WITH n LIMIT 10000
+            DETACH DELETE n
+            RETURN count(*)
+            """
+        )
+        if not result or not result[0][0]:
+            break
+
+
+@contextlib.contextmanager
+def capture_queries():
+    """Enregistrer les requêtes (texte, paramètres) envoyées via db.cypher_query"""
+    captured = []
+    original = db.cypher_query
+
+    def recording(query, params=None, *args, **kwargs):
+        captured.append((query, params or {}))
+        return original(query, params, *args, **kwargs)
+
+    db.cypher_query = recording
+    try:
+        yield captured
+    finally:
+        del db.cypher_query
+
+
+def profile_db_hits(query, params):
+    """Nombre total de db hits d'une requête (PROFILE)"""
+    from neomodel import config
+    from base.neo_connection import connection_manager
+
+    with connection_manager.get_driver().session(database=config.DATABASE_NAME) as session:
+        summary = session.run(f'PROFILE {query}', params).consume()
+    return _sum_db_hits(summary.profile or {})
+
+
+def _sum_db_hits(plan):
+    return plan.get('dbHits', 0) + sum(_sum_db_hits(child) for child in plan.get('children', []))
+
+
+def percentiles(samples):
+    """p50/p95/p99 et moyenne en millisecondes"""
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None, 'mean': None}
+    values = np.asarray(samples) * 1000
+    return {
+        'p50': round(float(np.percentile(values, 50)), 3),
+        'p95': round(float(np.percentile(values, 95)), 3),
+        'p99': round(float(np.percentile(values, 99)), 3),
+        'mean': round(float(values.mean()), 3),
+    }
+
+
+def precision_recall_at_k(recommended, relevant, k):
+    """precision@k et recall@k d'une liste recommandée"""
+    if not relevant:
+        return None, None
+    hits = len(set(recommended[:k]) & set(relevant))
+    return hits / k, hits / len(relevant)
+
+
+def strategies():
+    """Fonctions évaluées: (nom, callable(username, limit))"""
+    from base.recommendations import CourseRecommendationEngine as engine
+
+    return [
+        ('collaborative', engine._collaborative_filtering),
+        ('skill', engine._skill_based_filtering),
+        ('popular', engine._popular_courses),
+        ('hybrid', engine._hybrid_recommendations),
+        ('pipeline', engine.get_recommendations_for_student.uncached),
+    ]
+
+
+def run_benchmark(dataset, k=5, sample_size=200, warmup=5, seed=42, progress=None):
+    """
+    Mesurer chaque stratégie sur un échantillon d'étudiants ayant des inscriptions mises de côté.
+
+    Returns:
+        dict nom -> {'latency_ms', 'db_hits', 'precision_at_k', 'recall_at_k', ...}
+    """
+    rng = np.random.default_rng(seed)
+    candidates = [u for u, held in dataset['held_out'].items() if held]
+    sample = [str(u) for u in rng.choice(candidates, size=min(sample_size, len(candidates)), replace=False)]
+
+    report = {}
+    for name, strategy in strategies():
+        for username in sample[:warmup]:
+            strategy(username, k)
+
+        timings, precisions, recalls = [], [], []
+        for username in sample:
+            start = time.perf_counter()
+            recommendations = strategy(username, k)
+            timings.append(time.perf_counter() - start)
+
+            recommended = [
+                course_index(rec['course_id']) for rec in recommendations
+                if rec.get('course_id') is not None and rec['course_id'] < 0
+            ]
+            precision, recall = precision_recall_at_k(recommended, dataset['held_out'][username], k)
+            precisions.append(precision)
+            recalls.append(recall)
+
+        # db hits (PROFILE) des requêtes émises pour un étudiant représentatif
+        db_hits = None
+        try:
+            with capture_queries() as captured:
+                strategy(sample[0], k)
+            if captured:
+                db_hits = sum(profile_db_hits(query, params) for query, params in captured)
+        except Exception as e:
+            logger.warning(f'PROFILE failed for {name}: {e}')
+
+        report[name] = {
+            'samples': len(sample),
+            'latency_ms': percentiles(timings),
+            'db_hits': db_hits,
+            f'precision_at_{k}': round(float(np.mean(precisions)), 4),
+            f'recall_at_{k}': round(float(np.mean(recalls)), 4),
+        }
+        if progress:
+            progress(name, report[name])
+
+    return report
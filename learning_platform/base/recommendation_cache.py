@@ -0,0 +1,205 @@
+"""
+Cache des recommandations et statistiques Neo4j
+Utilise le framework de cache Django, avec un LRU en mémoire (borné) si le backend est indisponible.
+
+Les clés sont versionnées par utilisateur et par cours: une inscription, une désinscription
+ou une soumission incrémente la version concernée (voir signals.py), ce qui rend
+immédiatement obsolètes les entrées correspondantes sans avoir à les supprimer.
+
+Le backend doit être partagé entre processus (CACHES dans settings.py: Redis ou table SQL):
+les versions sont incrémentées par `process_graph_outbox` et lues par les workers web.
+Le LRU local n'est qu'un secours; tant qu'il est utilisé, les invalidations restent
+propres au processus qui les fait.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('base')
+
+# Sentinelle pour distinguer "absent du cache" d'une valeur None
+_MISSING = object()
+
+
+class LRUCache:
+    """Cache LRU en mémoire, borné et avec expiration (thread-safe)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RecommendationCache:
+    """
+    Accès au cache: Django d'abord, LRU local si le backend lève une exception
+    (ex: Redis/Memcached injoignable).
+    """
+
+    VERSION_TIMEOUT = 60 * 60 * 24 * 30  # Les versions vivent plus longtemps que les entrées
+
+    def __init__(self):
+        self.fallback = LRUCache(getattr(settings, 'RECOMMENDATION_CACHE_LRU_SIZE', 1024))
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'RECOMMENDATION_CACHE_TTL', 300)
+
+    @property
+    def empty_ttl(self):
+        return getattr(settings, 'RECOMMENDATION_CACHE_EMPTY_TTL', 30)
+
+    @property
+    def stale_ttl(self):
+        return getattr(settings, 'RECOMMENDATION_CACHE_STALE_TTL', 60 * 60 * 24)
+
+    def get(self, key, default=None):
+        try:
+            return cache.get(key, default)
+        except Exception as e:
+            logger.debug(f"Cache backend unavailable, using LRU fallback: {e}")
+            return self.fallback.get(key, default)
+
+    def set(self, key, value, timeout):
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.debug(f"Cache backend unavailable, using LRU fallback: {e}")
+            self.fallback.set(key, value, timeout)
+
+    # -------------------------------------------------
+    # Versions par utilisateur / par cours
+    # -------------------------------------------------
+
+    @staticmethod
+    def _version_key(scope, ident):
+        digest = hashlib.md5(str(ident).encode('utf-8')).hexdigest()
+        return f"reco:ver:{scope}:{digest}"
+
+    def get_version(self, scope, ident):
+        """
+        Version courante d'un utilisateur ou d'un cours.
+        Initialisée à l'horodatage courant: si la clé de version est évincée,
+        la nouvelle version ne peut pas retomber sur d'anciennes entrées.
+        """
+        key = self._version_key(scope, ident)
+        version = self.get(key)
+        if version is None:
+            version = time.time_ns()
+            self.set(key, version, self.VERSION_TIMEOUT)
+        return version
+
+    def bump(self, scope, ident):
+        """Invalide toutes les entrées d'un utilisateur ou d'un cours"""
+        self.set(self._version_key(scope, ident), time.time_ns(), self.VERSION_TIMEOUT)
+
+    def bump_user(self, username):
+        self.bump('user', username)
+
+    def bump_course(self, course_id):
+        self.bump('course', course_id)
+
+    def bump_course_tree(self, course_id):
+        """Invalide l'arborescence mise en cache d'un cours (voir base/course_tree.py)"""
+        self.bump('course_tree', course_id)
+
+    def make_key(self, name, scope, ident, args, kwargs):
+        version = self.get_version(scope, ident)
+        signature = hashlib.md5(
+            repr((ident, args, sorted(kwargs.items()))).encode('utf-8')
+        ).hexdigest()
+        return f"reco:{name}:{scope}:v{version}:{signature}"
+
+    @staticmethod
+    def make_stale_key(name, scope, ident, args, kwargs):
+        """Clé non versionnée du dernier résultat non vide (servi quand Neo4j est indisponible)"""
+        signature = hashlib.md5(
+            repr((ident, args, sorted(kwargs.items()))).encode('utf-8')
+        ).hexdigest()
+        return f"reco:stale:{name}:{scope}:{signature}"
+
+
+recommendation_cache = RecommendationCache()
+
+
+def cached_graph_call(scope):
+    """
+    Décorateur: met en cache le résultat d'un appel au graphe.
+    Le premier argument de la fonction identifie l'entité du scope
+    ('user' → username, 'course' → PK du cours).
+
+    Les résultats vides (graphe vide ou Neo4j indisponible) sont conservés
+    moins longtemps pour ne pas masquer un retour à la normale.
+
+    Le dernier résultat non vide est aussi gardé sous une clé non versionnée:
+    tant que le disjoncteur Neo4j est ouvert, il est servi (même périmé) au lieu
+    d'une liste vide.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(ident, *args, **kwargs):
+            from base.circuit_breaker import neo4j_available
+
+            key = recommendation_cache.make_key(func.__name__, scope, ident, args, kwargs)
+            value = recommendation_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            stale_key = recommendation_cache.make_stale_key(func.__name__, scope, ident, args, kwargs)
+            if not neo4j_available():
+                stale = recommendation_cache.get(stale_key)
+                if stale:
+                    return stale
+
+            value = func(ident, *args, **kwargs)
+            if not value and not neo4j_available():
+                # L'appel vient d'ouvrir le disjoncteur: résultat dégradé, non mis en cache
+                return recommendation_cache.get(stale_key) or value
+
+            timeout = recommendation_cache.ttl if value else recommendation_cache.empty_ttl
+            recommendation_cache.set(key, value, timeout)
+            if value:
+                recommendation_cache.set(stale_key, value, recommendation_cache.stale_ttl)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
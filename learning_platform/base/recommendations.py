@@ -3,20 +3,34 @@ Moteur de recommandation intelligent basé sur Neo4j
 Utilise les algorithmes de graphe pour suggérer des cours pertinents aux étudiants.
 """
 
-from neomodel import db
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import logging
+import threading
+import time
+
+from base.graph_backend import get_graph_backend
+from base.neo_connection import ensure_neo4j_connection
+from base.recommendation_cache import cached_graph_call
 
 logger = logging.getLogger('base')
 
+# Pool partagé du mode 'concurrent' (créé au premier usage)
+_strategy_executor = None
+_strategy_executor_lock = threading.Lock()
 
-def ensure_neo4j_connection():
-    """Initialise la connexion Neo4j si nécessaire"""
-    try:
-        from django.conf import settings
-        if hasattr(settings, 'NEOMODEL_NEO4J_BOLT_URL'):
-            db.set_connection(settings.NEOMODEL_NEO4J_BOLT_URL)
-    except Exception as e:
-        logger.warning(f"Neo4j connection init failed: {e}")
+
+def get_strategy_executor():
+    """Pool de threads du processus pour exécuter les stratégies en parallèle"""
+    global _strategy_executor
+    if _strategy_executor is None:
+        with _strategy_executor_lock:
+            if _strategy_executor is None:
+                from django.conf import settings
+                _strategy_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'RECOMMENDATION_STRATEGY_WORKERS', 8),
+                    thread_name_prefix='reco-strategy'
+                )
+    return _strategy_executor
 
 
 class CourseRecommendationEngine:
@@ -30,73 +44,163 @@ class CourseRecommendationEngine:
     """
     
     @staticmethod
-    def get_recommendations_for_student(username, limit=5):
+    @cached_graph_call('user')
+    def get_recommendations_for_student(username, limit=5, mode=None):
         """
         Obtenir des recommandations de cours pour un étudiant.
         
         Args:
             username: Le nom d'utilisateur de l'étudiant
             limit: Nombre de recommandations à retourner
+            mode: 'cascade' (3 requêtes successives), 'hybrid' (une seule requête)
+                  ou 'concurrent' (3 requêtes en parallèle, avec délai maximal),
+                  par défaut settings.RECOMMENDATION_MODE
             
         Returns:
             Liste de dictionnaires avec les cours recommandés
         """
         try:
+            from django.conf import settings
+            
+            engine = getattr(settings, 'RECOMMENDATION_ENGINE', 'neo4j')
+            
+            # Moteur item-item en mémoire (table Enrollment), sans Neo4j
+            if engine == 'sparse':
+                from base.item_recommender import get_item_recommender
+                return get_item_recommender().recommend(username, limit)
+            
+            # Plus proches voisins sur les embeddings FastRP pré-calculés
+            if engine == 'embedding':
+                from base.graph_embeddings import recommend_from_embeddings
+                return recommend_from_embeddings(username, limit)
+            
             # Initialiser la connexion Neo4j
             ensure_neo4j_connection()
             
+            mode = mode or getattr(settings, 'RECOMMENDATION_MODE', 'cascade')
             all_recs = []
             
-            # Algorithme 1: Filtrage Collaboratif
-            collab_recs = CourseRecommendationEngine._collaborative_filtering(
-                username, limit
-            )
-            all_recs.extend(collab_recs)
-            
-            # Algorithme 2: Filtrage par Compétences (Skills)
-            if len(all_recs) < limit:
-                skill_recs = CourseRecommendationEngine._skill_based_filtering(
+            if mode == 'hybrid':
+                # Les trois algorithmes en un seul aller-retour Bolt
+                all_recs = CourseRecommendationEngine._hybrid_recommendations(
                     username, limit
                 )
-                all_recs.extend(skill_recs)
-            
-            # Algorithme 3: Cours Populaires (fallback si peu de données)
-            if len(all_recs) < limit:
-                popular_recs = CourseRecommendationEngine._popular_courses(
+            elif mode == 'concurrent':
+                # Les trois algorithmes en parallèle: latence = la plus lente, bornée
+                all_recs = CourseRecommendationEngine._concurrent_recommendations(
+                    username, limit
+                )
+            else:
+                all_recs = CourseRecommendationEngine._cascade_recommendations(
                     username, limit
                 )
-                all_recs.extend(popular_recs)
             
-            # Dédupliquer par titre
+            # Dédupliquer par cours (uid du nœud)
             seen = set()
             unique_recs = []
             
             for rec in all_recs:
-                if rec['title'] not in seen:
-                    seen.add(rec['title'])
+                if rec['course_uid'] not in seen:
+                    seen.add(rec['course_uid'])
                     unique_recs.append(rec)
                     if len(unique_recs) >= limit:
                         break
             
-            # Ajouter l'ID Django pour chaque recommandation
-            final_recs = []
-            try:
-                from base.models import Course
-                for rec in unique_recs[:limit]:
-                    course = Course.objects.filter(title=rec['title']).first()
-                    if course:
-                        rec['course_id'] = course.pk
-                        final_recs.append(rec)
-            except Exception as e:
-                logger.warning(f'Could not add course IDs: {e}')
-                final_recs = unique_recs[:limit]
-            
-            return final_recs
+            CourseRecommendationEngine._attach_course_ids(unique_recs)
+            return [rec for rec in unique_recs if rec.get('course_id') is not None]
             
         except Exception as e:
             logger.error(f'Recommendation error for {username}: {str(e)}')
             return []
     
+    @staticmethod
+    def get_recommendations_for_students(usernames, limit=5, chunk_size=None):
+        """
+        Obtenir les recommandations de plusieurs étudiants (emails, préchauffage, analyses).
+        
+        Les étudiants sont traités par lots: une requête Cypher (UNWIND) par lot
+        au lieu d'un aller-retour par stratégie et par étudiant. Le score est celui
+        du mode hybride, quel que soit settings.RECOMMENDATION_MODE.
+        
+        Args:
+            usernames: Noms d'utilisateur des étudiants
+            limit: Nombre de recommandations par étudiant
+            chunk_size: Taille des lots, par défaut settings.RECOMMENDATION_BATCH_SIZE
+            
+        Returns:
+            dict username -> liste de recommandations, ou None si le calcul a échoué
+            (lot en erreur, Neo4j injoignable): [] signifie « aucune recommandation »
+        """
+        from django.conf import settings
+        
+        usernames = list(dict.fromkeys(usernames))
+        recommendations = {username: None for username in usernames}
+        chunk_size = chunk_size or getattr(settings, 'RECOMMENDATION_BATCH_SIZE', 200)
+        
+        engine = getattr(settings, 'RECOMMENDATION_ENGINE', 'neo4j')
+        if engine == 'sparse':
+            from base.item_recommender import get_item_recommender
+            # Par lots: les scores d'un lot forment une matrice dense lot × cours
+            for start in range(0, len(usernames), chunk_size):
+                chunk = usernames[start:start + chunk_size]
+                try:
+                    recommendations.update(get_item_recommender().recommend_many(chunk, limit))
+                except Exception as e:
+                    logger.warning(f'Sparse recommendation batch failed ({len(chunk)} students): {e}')
+            return recommendations
+        if engine == 'embedding':
+            from base.graph_embeddings import recommend_from_embeddings
+            for username in usernames:
+                try:
+                    recommendations[username] = recommend_from_embeddings(username, limit)
+                except Exception as e:
+                    logger.warning(f'Embedding recommendation failed for {username}: {e}')
+            return recommendations
+        
+        try:
+            ensure_neo4j_connection()
+        except Exception as e:
+            logger.warning(f'Batch recommendations skipped, Neo4j unavailable: {e}')
+            return recommendations
+        
+        for start in range(0, len(usernames), chunk_size):
+            chunk = usernames[start:start + chunk_size]
+            try:
+                batch = CourseRecommendationEngine._hybrid_recommendations_batch(chunk, limit)
+            except Exception as e:
+                # Lot en erreur: None (les instantanés existants sont conservés)
+                logger.warning(f'Batch recommendation query failed ({len(chunk)} students): {e}')
+                continue
+            
+            CourseRecommendationEngine._attach_course_ids(
+                [rec for recs in batch.values() for rec in recs]
+            )
+            for username in chunk:
+                recs = batch.get(username, [])
+                recommendations[username] = [rec for rec in recs if rec.get('course_id') is not None]
+        
+        return recommendations
+    
+    @staticmethod
+    def _attach_course_ids(recommendations):
+        """
+        Les nœuds portent le PK Django (django_id). Seuls les nœuds créés avant
+        son ajout sont résolus par titre, en une seule requête SQL.
+        """
+        legacy_titles = {rec['title'] for rec in recommendations if rec.get('course_id') is None}
+        if not legacy_titles:
+            return
+        try:
+            from base.models import Course
+            ids_by_title = dict(
+                Course.objects.filter(title__in=legacy_titles).values_list('title', 'pk')
+            )
+            for rec in recommendations:
+                if rec.get('course_id') is None:
+                    rec['course_id'] = ids_by_title.get(rec['title'])
+        except Exception as e:
+            logger.warning(f'Could not add course IDs: {e}')
+    
     @staticmethod
     def _collaborative_filtering(username, limit):
         """
@@ -108,55 +212,8 @@ class CourseRecommendationEngine:
         2. Trouver d'autres étudiants qui suivent ces cours
         3. Recommander les cours que ces étudiants suivent mais pas l'étudiant cible
         """
-        query = """
-        // Trouver l'étudiant
-        MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(my_course:NeoCourse)
-        
-        // Trouver des étudiants similaires (qui suivent les mêmes cours)
-        MATCH (other:NeoUser)-[:ENROLLED_IN]->(my_course)
-        WHERE other.username <> $username
-        
-        // Trouver les cours que ces étudiants suivent mais pas moi
-        MATCH (other)-[:ENROLLED_IN]->(rec:NeoCourse)
-        WHERE NOT (me)-[:ENROLLED_IN]->(rec)
-        
-        // Compter combien d'étudiants similaires ont suivi chaque cours
-        WITH rec, count(DISTINCT other) AS popularity
-        
-        // Récupérer l'instructeur
-        OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(rec)
-        
-        RETURN rec.uid AS course_uid,
-               rec.title AS title,
-               rec.level AS level,
-               rec.description AS description,
-               rec.image_path AS image_path,
-               popularity AS score,
-               instructor.username AS instructor,
-               'collaborative' AS method
-        ORDER BY popularity DESC
-        LIMIT $limit
-        """
-        
         try:
-            result, _ = db.cypher_query(query, {
-                'username': username,
-                'limit': limit
-            })
-            
-            return [
-                {
-                    'course_uid': row[0],
-                    'title': row[1],
-                    'level': row[2],
-                    'description': row[3][:100] + '...' if row[3] and len(row[3]) > 100 else row[3],
-                    'image_path': row[4],
-                    'score': row[5],
-                    'instructor': row[6],
-                    'method': row[7]
-                }
-                for row in result
-            ]
+            return get_graph_backend().collaborative(username, limit)
         except Exception as e:
             logger.warning(f'Collaborative filtering failed: {e}')
             return []
@@ -172,58 +229,8 @@ class CourseRecommendationEngine:
         2. Trouver d'autres cours qui enseignent ces mêmes skills
         3. Recommander ces cours (non suivis par l'étudiant)
         """
-        # Initialiser la connexion Neo4j
-        ensure_neo4j_connection()
-        
-        query = """
-        // Trouver les compétences des cours que l'étudiant suit
-        MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(my_course:NeoCourse)
-        MATCH (my_course)-[:TEACHES_SKILL]->(skill:NeoSkill)
-        
-        // Trouver d'autres cours qui enseignent ces mêmes compétences
-        MATCH (skill)<-[:TEACHES_SKILL]-(rec:NeoCourse)
-        WHERE rec <> my_course
-        AND NOT (me)-[:ENROLLED_IN]->(rec)
-        
-        // Compter combien de compétences en commun
-        WITH rec, count(DISTINCT skill) AS shared_skills, collect(DISTINCT skill.name) AS skill_names
-        
-        // Récupérer l'instructeur
-        OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(rec)
-        
-        RETURN rec.uid AS course_uid,
-               rec.title AS title,
-               rec.level AS level,
-               rec.description AS description,
-               rec.image_path AS image_path,
-               shared_skills AS score,
-               instructor.username AS instructor,
-               'skill' AS method,
-               skill_names AS skills
-        ORDER BY shared_skills DESC
-        LIMIT $limit
-        """
-        
         try:
-            result, _ = db.cypher_query(query, {
-                'username': username,
-                'limit': limit
-            })
-            
-            return [
-                {
-                    'course_uid': row[0],
-                    'title': row[1],
-                    'level': row[2],
-                    'description': row[3][:100] + '...' if row[3] and len(row[3]) > 100 else row[3],
-                    'image_path': row[4],
-                    'score': row[5],
-                    'instructor': row[6],
-                    'method': row[7],
-                    'skills': row[8][:3] if row[8] else []  # Limiter à 3 skills affichés
-                }
-                for row in result
-            ]
+            return get_graph_backend().shared_skills(username, limit)
         except Exception as e:
             logger.warning(f'Skill-based filtering failed: {e}')
             return []
@@ -234,169 +241,260 @@ class CourseRecommendationEngine:
         Cours populaires: cours avec le plus d'inscriptions,
         excluant ceux déjà suivis par l'étudiant.
         """
-        query = """
-        // Trouver les cours que l'étudiant ne suit pas encore
-        MATCH (c:NeoCourse)
-        WHERE NOT EXISTS {
-            MATCH (me:NeoUser {username: $username})-[:ENROLLED_IN]->(c)
+        try:
+            return get_graph_backend().popular(username, limit)
+        except Exception as e:
+            logger.warning(f'Popular courses query failed: {e}')
+            return []
+    
+    @staticmethod
+    def _concurrent_recommendations(username, limit):
+        """
+        Mode concurrent: collaboratif, compétences et populaires sont lancés en même temps
+        sur le pool de threads (une session Neo4j par thread, même driver).
+        
+        Chaque stratégie a son délai (settings.RECOMMENDATION_STRATEGY_TIMEOUTS, en secondes,
+        compté depuis le lancement); les résultats arrivés à temps sont concaténés
+        dans l'ordre de priorité de la cascade, les autres sont ignorés.
+        """
+        from django.conf import settings
+        
+        timeouts = {
+            'collaborative': 1.0,
+            'skill': 1.0,
+            'popular': 0.5,
         }
+        timeouts.update(getattr(settings, 'RECOMMENDATION_STRATEGY_TIMEOUTS', {}))
         
-        // Compter les inscriptions
-        OPTIONAL MATCH (student:NeoUser)-[:ENROLLED_IN]->(c)
-        WITH c, count(student) AS enrollments
+        strategies = [
+            ('collaborative', CourseRecommendationEngine._collaborative_filtering),
+            ('skill', CourseRecommendationEngine._skill_based_filtering),
+            ('popular', CourseRecommendationEngine._popular_courses),
+        ]
         
-        // Récupérer l'instructeur
-        OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(c)
+        def run(strategy):
+            # `db` de neomodel est propre à chaque thread
+            ensure_neo4j_connection()
+            return strategy(username, limit)
         
-        RETURN c.uid AS course_uid,
-               c.title AS title,
-               c.level AS level,
-               c.description AS description,
-               c.image_path AS image_path,
-               enrollments AS score,
-               instructor.username AS instructor,
-               'popular' AS method
-        ORDER BY enrollments DESC
-        LIMIT $limit
+        executor = get_strategy_executor()
+        started = time.monotonic()
+        futures = [(name, executor.submit(run, strategy)) for name, strategy in strategies]
+        
+        all_recs = []
+        for name, future in futures:
+            remaining = started + timeouts[name] - time.monotonic()
+            try:
+                all_recs.extend(future.result(timeout=max(remaining, 0)))
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning(f'Recommendation strategy {name} exceeded {timeouts[name]}s for {username}')
+            except Exception as e:
+                logger.warning(f'Recommendation strategy {name} failed: {e}')
+        return all_recs
+    
+    @staticmethod
+    def _cascade_recommendations(username, limit):
+        """
+        Mode cascade: collaboratif, puis compétences, puis populaires,
+        chaque stratégie n'étant interrogée que s'il manque des recommandations.
+        """
+        # Algorithme 1: Filtrage Collaboratif
+        all_recs = list(CourseRecommendationEngine._collaborative_filtering(username, limit))
+        
+        # Algorithme 2: Filtrage par Compétences (Skills)
+        if len(all_recs) < limit:
+            all_recs.extend(CourseRecommendationEngine._skill_based_filtering(username, limit))
+        
+        # Algorithme 3: Cours Populaires (fallback si peu de données)
+        if len(all_recs) < limit:
+            all_recs.extend(CourseRecommendationEngine._popular_courses(username, limit))
+        return all_recs
+    
+    @staticmethod
+    def _hybrid_recommendations(username, limit):
         """
+        Mode hybride: les trois algorithmes (collaboratif, compétences, populaires)
+        sont calculés dans une seule requête Cypher (CALL + UNION ALL).
+        
+        Chaque stratégie normalise son score sur [0, 1] (score / meilleur score),
+        puis le score combiné est la somme pondérée des stratégies qui proposent le cours.
+        La colonne `method` indique la stratégie qui contribue le plus.
         
+        Si la requête hybride échoue, les stratégies sont interrogées en cascade.
+        """
         try:
-            result, _ = db.cypher_query(query, {
-                'username': username,
-                'limit': limit
-            })
-            
-            return [
-                {
-                    'course_uid': row[0],
-                    'title': row[1],
-                    'level': row[2],
-                    'description': row[3][:100] + '...' if row[3] and len(row[3]) > 100 else row[3],
-                    'image_path': row[4],
-                    'score': row[5],
-                    'instructor': row[6],
-                    'method': row[7]
-                }
-                for row in result
-            ]
+            return CourseRecommendationEngine._hybrid_recommendations_batch(
+                [username], limit
+            ).get(username, [])
         except Exception as e:
-            logger.warning(f'Popular courses query failed: {e}')
-            return []
+            logger.warning(f'Hybrid recommendation query failed, falling back to cascade: {e}')
+            return CourseRecommendationEngine._cascade_recommendations(username, limit)
     
     @staticmethod
-    def get_similar_courses(course_title, limit=3):
+    def _hybrid_recommendations_batch(usernames, limit):
         """
-        Trouver des cours similaires à un cours donné.
-        Basé sur les étudiants communs et les skills enseignés.
-        """
-        query = """
-        MATCH (c:NeoCourse {title: $title})
+        Requête hybride pour une liste d'étudiants (UNWIND $usernames).
+        
+        Le classement des cours populaires ne dépend pas de l'étudiant: il est calculé
+        une seule fois par requête, puis filtré pour chaque étudiant.
         
-        // Trouver des cours suivis par les mêmes étudiants
-        MATCH (c)<-[:ENROLLED_IN]-(student:NeoUser)-[:ENROLLED_IN]->(similar:NeoCourse)
-        WHERE similar <> c
+        Returns:
+            dict username -> liste de recommandations (les étudiants inconnus
+            de Neo4j reçoivent les cours populaires)
+        """
+        from django.conf import settings
         
-        WITH similar, count(DISTINCT student) AS common_students
+        weights = {
+            'collaborative': 1.0,
+            'skill': 0.6,
+            'popular': 0.2,
+        }
+        weights.update(getattr(settings, 'RECOMMENDATION_HYBRID_WEIGHTS', {}))
         
-        OPTIONAL MATCH (instructor:NeoUser)-[:TEACHES]->(similar)
+        return get_graph_backend().hybrid_batch(usernames, limit, weights)
+    
+    @staticmethod
+    @cached_graph_call('course')
+    def get_similar_courses(course_id, limit=3):
+        """
+        Trouver des cours similaires à un cours donné (PK Django).
         
-        RETURN similar.uid AS course_uid,
-               similar.title AS title,
-               similar.level AS level,
-               common_students AS similarity_score,
-               instructor.username AS instructor
-        ORDER BY common_students DESC
-        LIMIT $limit
+        Lit les relations SIMILAR_TO pré-calculées par `manage.py compute_course_similarity`
+        (un seul saut). Tant que le job n'a pas tourné, les cours similaires sont
+        calculés par parcours des étudiants communs.
+        Avec RECOMMENDATION_ENGINE = 'embedding', les voisins FastRP sont utilisés en priorité.
         """
+        from django.conf import settings
+        
+        if getattr(settings, 'RECOMMENDATION_ENGINE', 'neo4j') == 'embedding':
+            try:
+                from base.graph_embeddings import similar_courses_from_embeddings
+                similar = similar_courses_from_embeddings(course_id, limit)
+                if similar:
+                    return similar
+            except Exception as e:
+                logger.warning(f'Embedding similar courses failed: {e}')
         
         try:
-            result, _ = db.cypher_query(query, {
-                'title': course_title,
-                'limit': limit
-            })
-            
-            return [
-                {
-                    'course_uid': row[0],
-                    'title': row[1],
-                    'level': row[2],
-                    'similarity_score': row[3],
-                    'instructor': row[4]
-                }
-                for row in result
-            ]
+            return get_graph_backend().similar_courses(course_id, limit)
         except Exception as e:
             logger.error(f'Similar courses query failed: {e}')
             return []
     
     @staticmethod
+    @cached_graph_call('user')
     def get_student_stats(username):
         """
         Obtenir les statistiques d'apprentissage d'un étudiant.
         Retourne le nombre de cours, les compétences, la progression, etc.
         """
-        query = """
-        MATCH (u:NeoUser {username: $username})
-        
-        // Cours suivis
-        OPTIONAL MATCH (u)-[e:ENROLLED_IN]->(c:NeoCourse)
-        WITH u, count(c) AS courses_enrolled, 
-             avg(e.completion_percent) AS avg_completion
-        
-        // Évaluations passées
-        OPTIONAL MATCH (u)-[s:SUBMITTED]->(eval:NeoEvaluation)
-        WHERE s.passed = true
-        WITH u, courses_enrolled, avg_completion, count(eval) AS evals_passed
-        
-        // Ressources vues
-        OPTIONAL MATCH (u)-[:VIEWED]->(r:NeoResource)
-        
-        RETURN courses_enrolled,
-               coalesce(avg_completion, 0) AS avg_completion,
-               evals_passed,
-               count(r) AS resources_viewed
-        """
-        
         try:
-            result, _ = db.cypher_query(query, {'username': username})
-            if result:
-                row = result[0]
-                return {
-                    'courses_enrolled': row[0] or 0,
-                    'avg_completion': round(row[1] or 0, 1),
-                    'evaluations_passed': row[2] or 0,
-                    'resources_viewed': row[3] or 0
-                }
-            return {}
+            return get_graph_backend().student_stats(username)
         except Exception as e:
             logger.error(f'Student stats query failed: {e}')
             return {}
     
     @staticmethod
+    @cached_graph_call('user')
     def get_instructor_stats(username):
         """
         Obtenir les statistiques d'un instructeur.
         """
-        query = """
-        MATCH (u:NeoUser {username: $username})-[:TEACHES]->(c:NeoCourse)
-        
-        // Total étudiants inscrits
-        OPTIONAL MATCH (student:NeoUser)-[:ENROLLED_IN]->(c)
-        WITH u, count(DISTINCT c) AS courses_created, 
-             count(DISTINCT student) AS total_students
-        
-        RETURN courses_created, total_students
-        """
-        
         try:
-            result, _ = db.cypher_query(query, {'username': username})
-            if result:
-                row = result[0]
-                return {
-                    'courses_created': row[0] or 0,
-                    'total_students': row[1] or 0
-                }
-            return {}
+            return get_graph_backend().instructor_stats(username)
         except Exception as e:
             logger.error(f'Instructor stats query failed: {e}')
             return {}
+
+
+class RecommendationStore:
+    """
+    Recommandations matérialisées par étudiant (table StudentRecommendation).
+    
+    Le dashboard lit une seule ligne SQL au lieu d'exécuter les parcours de graphe.
+    La table est remplie par `manage.py refresh_recommendations` et rafraîchie
+    uniquement pour l'étudiant concerné lors d'une inscription/désinscription.
+    """
+    
+    @staticmethod
+    def store_size():
+        """Nombre de recommandations conservées par étudiant"""
+        from django.conf import settings
+        return getattr(settings, 'RECOMMENDATION_STORE_SIZE', 10)
+    
+    @staticmethod
+    def get_for_student(user, limit=5):
+        """
+        Lire les recommandations pré-calculées d'un étudiant.
+        Elles ne sont calculées pendant la requête que si aucun instantané n'existe encore;
+        un instantané vide (aucune recommandation, Neo4j indisponible) est servi tel quel
+        jusqu'au prochain rafraîchissement (refresh_recommendations, outbox).
+        """
+        from base.models import StudentRecommendation, Course
+        
+        snapshot = StudentRecommendation.objects.filter(student=user).first()
+        if snapshot is None:
+            recommendations = RecommendationStore.refresh_student(user) or []
+        else:
+            recommendations = snapshot.recommendations
+        
+        # Ignorer les cours supprimés ou déjà suivis depuis le dernier calcul
+        course_ids = [rec.get('course_id') for rec in recommendations]
+        existing = set(
+            Course.objects.filter(pk__in=[cid for cid in course_ids if cid])
+            .exclude(enrollments__student=user)
+            .values_list('pk', flat=True)
+        )
+        return [rec for rec in recommendations if rec.get('course_id') in existing][:limit]
+    
+    @staticmethod
+    def save_snapshot(user, recommendations):
+        """
+        Enregistrer le top-N d'un étudiant, même vide (computed_at horodate le calcul).
+        None (calcul en échec) n'écrit rien: l'instantané existant est conservé.
+        
+        Returns:
+            True si l'instantané a été écrit
+        """
+        from base.models import StudentRecommendation
+        
+        if recommendations is None:
+            return False
+        StudentRecommendation.objects.update_or_create(
+            student=user,
+            defaults={'recommendations': recommendations}
+        )
+        return True
+    
+    @staticmethod
+    def refresh_student(user):
+        """
+        Recalculer et enregistrer le top-N d'un étudiant (même calcul que le lot).
+        Returns: les recommandations, ou None si le calcul a échoué
+        """
+        recommendations = CourseRecommendationEngine.get_recommendations_for_students(
+            [user.username], limit=RecommendationStore.store_size()
+        )[user.username]
+        RecommendationStore.save_snapshot(user, recommendations)
+        return recommendations
+    
+    @staticmethod
+    def refresh_students(users):
+        """
+        Recalculer le top-N de plusieurs étudiants (une requête par lot),
+        retourne le nombre mis à jour (les étudiants d'un lot en échec sont ignorés)
+        """
+        users = list(users)
+        results = CourseRecommendationEngine.get_recommendations_for_students(
+            [user.username for user in users], limit=RecommendationStore.store_size()
+        )
+        
+        refreshed = 0
+        for user in users:
+            try:
+                if RecommendationStore.save_snapshot(user, results.get(user.username)):
+                    refreshed += 1
+            except Exception as e:
+                logger.warning(f'Recommendation refresh failed for {user.username}: {e}')
+        return refreshed
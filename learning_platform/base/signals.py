@@ -1,7 +1,7 @@
 # signals.py - Signaux Django pour EduSphere LMS
 # Ce fichier contient les signaux qui automatisent certaines actions
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 import logging
 
@@ -104,58 +104,44 @@ def update_progress_on_submission(sender, instance, created, **kwargs):
 # NEO4J SYNCHRONIZATION SIGNALS
 # =====================================================
 
+# Pas de try/except autour des enqueue_*: l'événement fait partie de la même
+# transaction que l'écriture Django (ATOMIC_REQUESTS dans settings.py). S'il ne
+# peut pas être enregistré, l'exception annule aussi l'écriture, au lieu de
+# laisser Neo4j diverger en silence.
+
 from django.contrib.auth import get_user_model
 
 
+@receiver(post_init, sender=get_user_model())
+def snapshot_user_for_neo4j(sender, instance, **kwargs):
+    """Mémorise les champs synchronisés chargés, pour détecter ce qu'un save() modifie"""
+    from base.graph_sync import snapshot_user
+    snapshot_user(instance)
+
+
 @receiver(post_save, sender=get_user_model())
-def sync_user_to_neo4j(sender, instance, created, **kwargs):
+def sync_user_to_neo4j(sender, instance, created, update_fields=None, **kwargs):
     """
     Signal déclenché après chaque save() d'un User Django.
-    Crée ou met à jour le NeoUser correspondant dans Neo4j.
+    Enregistre la création/mise à jour du NeoUser dans l'outbox (GraphSyncEvent),
+    appliquée ensuite par `manage.py process_graph_outbox`.
     
     Ceci garantit que les nouveaux utilisateurs inscrits via le site
-    sont automatiquement synchronisés dans le graphe Neo4j.
+    sont synchronisés dans le graphe Neo4j sans appel Bolt pendant la requête.
+    Les save() qui ne touchent aucun champ du NeoUser (ex: last_login à chaque
+    connexion) n'ajoutent pas d'événement.
     """
-    try:
-        from base.neo_models import NeoUser
-        
-        try:
-            # Essayer de récupérer le NeoUser existant
-            neo_user = NeoUser.nodes.get(username=instance.username)
-            
-            # Mise à jour des champs
-            neo_user.email = instance.email
-            neo_user.first_name = instance.first_name
-            neo_user.last_name = instance.last_name
-            neo_user.is_active = instance.is_active
-            neo_user.is_staff = instance.is_staff
-            
-            if hasattr(instance, 'role'):
-                neo_user.role = instance.role
-            
-            neo_user.save()
-            logger.debug(f"NeoUser mis à jour: {instance.username}")
-            
-        except NeoUser.DoesNotExist:
-            # Création d'un nouveau NeoUser
-            neo_user = NeoUser(
-                username=instance.username,
-                email=instance.email,
-                first_name=instance.first_name,
-                last_name=instance.last_name,
-                is_active=instance.is_active,
-                is_staff=instance.is_staff,
-                role=getattr(instance, 'role', 'Student'),
-                date_joined=instance.date_joined
-            ).save()
-            logger.info(f"NeoUser créé: {instance.username}")
-            
-    except ImportError:
-        # Neomodel pas encore importé (au démarrage)
-        pass
-    except Exception as e:
-        # Ne pas faire échouer l'opération Django si Neo4j est down
-        logger.warning(f"Sync Neo4j échouée pour {instance.username}: {e}")
+    from base.graph_sync import enqueue_user, snapshot_user, user_sync_changed
+    if created or user_sync_changed(instance, update_fields):
+        enqueue_user(instance)
+        snapshot_user(instance)
+
+
+@receiver(post_delete, sender=get_user_model())
+def delete_user_from_neo4j(sender, instance, **kwargs):
+    """Supprime le NeoUser (via l'outbox) quand le User Django est supprimé"""
+    from base.graph_sync import enqueue_user
+    enqueue_user(instance, operation='delete')
 
 
 # =====================================================
@@ -169,59 +155,50 @@ from .models import Course
 def sync_course_to_neo4j(sender, instance, created, **kwargs):
     """
     Signal déclenché après chaque save() d'un Course Django.
-    Crée ou met à jour le NeoCourse correspondant dans Neo4j.
+    Enregistre la création/mise à jour du NeoCourse (et de la relation TEACHES) dans l'outbox.
     """
+    from base.graph_sync import enqueue_course
+    enqueue_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def delete_course_from_neo4j(sender, instance, **kwargs):
+    """Supprime le NeoCourse (via l'outbox) quand le Course Django est supprimé"""
+    from base.graph_sync import enqueue_course
+    enqueue_course(instance, operation='delete')
+
+
+# =====================================================
+# SYNC ENROLLMENT TO NEO4J
+# =====================================================
+
+@receiver(post_save, sender=Enrollment)
+def sync_enrollment_to_neo4j(sender, instance, **kwargs):
+    """Relation ENROLLED_IN (et NeoCourse.enrollment_count) via l'outbox"""
+    from base.graph_sync import enqueue_enrollment
+    enqueue_enrollment(instance)
+
+
+@receiver(post_delete, sender=Enrollment)
+def delete_enrollment_from_neo4j(sender, instance, **kwargs):
+    from base.graph_sync import enqueue_enrollment
+    enqueue_enrollment(instance, operation='delete')
+
+
+# =====================================================
+# INVALIDATION DU CACHE DES RECOMMANDATIONS
+# =====================================================
+
+# Inscriptions: invalidées par process_batch une fois ENROLLED_IN écrit dans Neo4j
+# (base/graph_sync.py, invalidate_caches_for)
+
+
+@receiver(post_save, sender=Submission)
+def invalidate_recommendations_on_submission(sender, instance, **kwargs):
+    """Une soumission (ou sa notation) change les statistiques de l'étudiant"""
     try:
-        from base.neo_models import NeoCourse, NeoUser
+        from base.recommendation_cache import recommendation_cache
         
-        if created:
-            # Création d'un nouveau NeoCourse
-            neo_course = NeoCourse(
-                title=instance.title,
-                description=instance.description or '',
-                level=instance.level or 'Beginner',
-                estimated_duration=instance.estimated_duration or 1,
-                start_date=instance.start_date,
-                end_date=instance.end_date,
-                image_path=instance.image.name if instance.image else ''
-            ).save()
-            
-            # Créer relation TEACHES avec l'instructeur
-            if instance.instructor:
-                try:
-                    neo_instructor = NeoUser.nodes.get(username=instance.instructor.username)
-                    neo_instructor.teaches.connect(neo_course)
-                except NeoUser.DoesNotExist:
-                    pass
-            
-            logger.info(f"NeoCourse créé: {instance.title}")
-        else:
-            # Mise à jour
-            try:
-                neo_course = NeoCourse.nodes.get(title=instance.title)
-                neo_course.description = instance.description or ''
-                neo_course.level = instance.level or 'Beginner'
-                neo_course.estimated_duration = instance.estimated_duration or 1
-                neo_course.start_date = instance.start_date
-                neo_course.end_date = instance.end_date
-                neo_course.save()
-                logger.debug(f"NeoCourse mis à jour: {instance.title}")
-            except NeoCourse.DoesNotExist:
-                # Créer si n'existe pas
-                neo_course = NeoCourse(
-                    title=instance.title,
-                    description=instance.description or '',
-                    level=instance.level or 'Beginner',
-                    estimated_duration=instance.estimated_duration or 1,
-                    start_date=instance.start_date,
-                    end_date=instance.end_date,
-                    image_path=instance.image.name if instance.image else ''
-                ).save()
-                logger.info(f"NeoCourse créé (sync): {instance.title}")
-                
-    except ImportError:
-        pass
+        recommendation_cache.bump_user(instance.student.username)
     except Exception as e:
-        logger.warning(f"Sync Neo4j échouée pour course {instance.title}: {e}")
-
-
+        logger.warning(f"Recommendation cache invalidation failed: {e}")
@@ -62,6 +62,23 @@ def create_test_module(course, order=1):
     )
 
 
+def create_test_memory_graph():
+    """Helper: petit graphe en mémoire (4 cours, 4 étudiants, une compétence partagée)"""
+    from .graph_backend import MemoryBackend
+    
+    graph = MemoryBackend()
+    graph.add_course(1, 'Python', instructor='prof')
+    graph.add_course(2, 'Django', instructor='prof')
+    graph.add_course(3, 'Neo4j', instructor='prof')
+    graph.add_course(4, 'Pandas')
+    graph.add_skill(1, 'Python')
+    graph.add_skill(4, 'Python')
+    for username, courses in {'alice': [1], 'bob': [1, 2], 'carol': [1, 2, 3], 'dave': [3]}.items():
+        for course_id in courses:
+            graph.enroll(username, course_id)
+    return graph
+
+
 class UserModelTests(TestCase):
     """Tests pour le modèle User"""
     
@@ -337,3 +354,1108 @@ class CertificateTests(TestCase):
         # Vérifie que c'est un PDF (commence par %PDF)
         content = pdf_buffer.read()
         self.assertTrue(content.startswith(b'%PDF'))
+
+
+class RecommendationStoreTests(TestCase):
+    """Tests pour les recommandations matérialisées"""
+    
+    def setUp(self):
+        self.instructor = create_test_instructor()
+        self.student = create_test_student()
+        self.course = create_test_course(self.instructor)
+        self.other_course = Course.objects.create(
+            title='Django Avancé',
+            description='Build web apps with Django',
+            instructor=self.instructor,
+            level='Advanced',
+            estimated_duration=20,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=90)
+        )
+    
+    def test_snapshot_filters_enrolled_and_deleted_courses(self):
+        """Vérifie que la lecture ignore les cours suivis ou supprimés"""
+        from .models import StudentRecommendation
+        from .recommendations import RecommendationStore
+        
+        StudentRecommendation.objects.create(
+            student=self.student,
+            recommendations=[
+                {'title': self.course.title, 'course_id': self.course.pk},
+                {'title': self.other_course.title, 'course_id': self.other_course.pk},
+                {'title': 'Cours supprimé', 'course_id': 9999},
+            ]
+        )
+        Enrollment.objects.create(student=self.student, course=self.course)
+        
+        recommendations = RecommendationStore.get_for_student(self.student, limit=5)
+        self.assertEqual(
+            [rec['course_id'] for rec in recommendations],
+            [self.other_course.pk]
+        )
+    
+    def test_empty_snapshot_is_stored_and_not_recomputed(self):
+        """Vérifie qu'un résultat vide est enregistré et que les lectures suivantes ne recalculent pas"""
+        from unittest import mock
+        from .models import StudentRecommendation
+        from .recommendations import CourseRecommendationEngine, RecommendationStore
+        
+        with mock.patch.object(
+            CourseRecommendationEngine, 'get_recommendations_for_students', return_value={'student': []}
+        ) as compute:
+            self.assertEqual(RecommendationStore.get_for_student(self.student), [])
+            self.assertEqual(RecommendationStore.get_for_student(self.student), [])
+        
+        self.assertEqual(compute.call_count, 1)
+        snapshot = StudentRecommendation.objects.get(student=self.student)
+        self.assertEqual(snapshot.recommendations, [])
+        self.assertIsNotNone(snapshot.computed_at)
+    
+    def test_failed_batch_keeps_existing_snapshot(self):
+        """Vérifie qu'un lot en erreur n'écrase pas l'instantané, contrairement à un résultat vide"""
+        from unittest import mock
+        from django.test import override_settings
+        from .models import StudentRecommendation
+        from .recommendations import CourseRecommendationEngine, RecommendationStore
+        
+        stored = [{'title': self.other_course.title, 'course_id': self.other_course.pk}]
+        StudentRecommendation.objects.create(student=self.student, recommendations=stored)
+        
+        with override_settings(RECOMMENDATION_ENGINE='neo4j'), \
+                mock.patch('base.recommendations.ensure_neo4j_connection'), \
+                mock.patch.object(CourseRecommendationEngine, '_hybrid_recommendations_batch') as batch:
+            batch.side_effect = RuntimeError('transient Cypher error')
+            self.assertEqual(RecommendationStore.refresh_students([self.student]), 0)
+            self.assertEqual(StudentRecommendation.objects.get(student=self.student).recommendations, stored)
+            
+            batch.side_effect = None
+            batch.return_value = {}
+            self.assertEqual(RecommendationStore.refresh_students([self.student]), 1)
+        self.assertEqual(StudentRecommendation.objects.get(student=self.student).recommendations, [])
+
+
+class RecommendationCacheTests(TestCase):
+    """Tests pour le cache versionné des recommandations"""
+    
+    def test_lru_evicts_least_recently_used(self):
+        """Vérifie que le LRU de secours reste borné"""
+        from .recommendation_cache import LRUCache
+        
+        lru = LRUCache(max_entries=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
+    
+    def test_bump_invalidates_cached_call(self):
+        """Vérifie qu'une nouvelle version utilisateur force le recalcul"""
+        from .recommendation_cache import cached_graph_call, recommendation_cache
+        
+        calls = []
+        
+        @cached_graph_call('user')
+        def fake_stats(username):
+            calls.append(username)
+            return {'courses_enrolled': len(calls)}
+        
+        self.assertEqual(fake_stats('alice'), {'courses_enrolled': 1})
+        self.assertEqual(fake_stats('alice'), {'courses_enrolled': 1})
+        recommendation_cache.bump_user('alice')
+        self.assertEqual(fake_stats('alice'), {'courses_enrolled': 2})
+
+    
+    def test_stale_result_served_while_circuit_open(self):
+        """Vérifie que le dernier résultat est servi quand Neo4j est indisponible"""
+        from unittest import mock
+        from .recommendation_cache import cached_graph_call, recommendation_cache
+        
+        results = [[{'title': 'Python'}], []]
+        
+        @cached_graph_call('user')
+        def fake_recommendations(username):
+            return results.pop(0)
+        
+        self.assertEqual(fake_recommendations('bob'), [{'title': 'Python'}])
+        recommendation_cache.bump_user('bob')
+        with mock.patch('base.circuit_breaker.neo4j_available', return_value=False):
+            self.assertEqual(fake_recommendations('bob'), [{'title': 'Python'}])
+        self.assertEqual(results, [[]])
+
+
+class CircuitBreakerTests(TestCase):
+    """Tests pour le disjoncteur Neo4j"""
+    
+    def test_opens_after_threshold_and_closes_after_probe(self):
+        """Vérifie fermé → ouvert → semi-ouvert → fermé"""
+        import time
+        from neo4j.exceptions import ServiceUnavailable
+        from .circuit_breaker import CircuitBreaker, CircuitOpenError
+        
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0.05)
+        
+        def down():
+            raise ServiceUnavailable('unreachable')
+        
+        for _ in range(2):
+            with self.assertRaises(ServiceUnavailable):
+                breaker.call(down)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(lambda: 'ok')
+        
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_query_errors_do_not_open_circuit(self):
+        """Vérifie qu'une erreur Cypher (Neo4j a répondu) ne compte pas comme panne"""
+        from .circuit_breaker import CircuitBreaker
+        
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        with self.assertRaises(ValueError):
+            breaker.call(lambda: (_ for _ in ()).throw(ValueError('syntax')))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+class SparseItemRecommenderTests(TestCase):
+    """Tests pour le recommandeur item-item en mémoire"""
+    
+    def setUp(self):
+        self.instructor = create_test_instructor()
+        self.courses = [
+            Course.objects.create(
+                title=f'Cours {i}',
+                description='Description',
+                instructor=self.instructor,
+                level='Beginner',
+                estimated_duration=10,
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30)
+            )
+            for i in range(3)
+        ]
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', password='testpass123', role='Student'
+            )
+            for i in range(4)
+        ]
+        a, b, c = self.courses
+        for student, courses in zip(self.students, [(a, b), (a, b, c), (a,), ()]):
+            for course in courses:
+                Enrollment.objects.create(student=student, course=course)
+    
+    def test_recommends_co_enrolled_courses_first(self):
+        """Vérifie l'ordre par similarité et l'exclusion des cours suivis"""
+        from .item_recommender import SparseItemRecommender
+        
+        model = SparseItemRecommender.build()
+        recommendations = model.recommend('student2', limit=5)
+        self.assertEqual(
+            [rec['course_id'] for rec in recommendations],
+            [self.courses[1].pk, self.courses[2].pk]
+        )
+        self.assertEqual(recommendations[0]['method'], 'collaborative')
+        self.assertEqual(recommendations[0]['instructor'], self.instructor.username)
+    
+    def test_student_without_enrollment_gets_popular_courses(self):
+        """Vérifie le repli sur les cours populaires"""
+        from .item_recommender import SparseItemRecommender
+        
+        results = SparseItemRecommender.build(metric='jaccard').recommend_many(
+            ['student0', 'student3'], limit=2
+        )
+        self.assertEqual([rec['course_id'] for rec in results['student0']], [self.courses[2].pk])
+        self.assertEqual(
+            [(rec['course_id'], rec['method']) for rec in results['student3']],
+            [(self.courses[0].pk, 'popular'), (self.courses[1].pk, 'popular')]
+        )
+
+    def test_student_with_zero_scores_gets_popular_courses(self):
+        """Vérifie le complément par les cours populaires quand aucun score n'est positif"""
+        from .item_recommender import SparseItemRecommender
+
+        isolated = Course.objects.create(
+            title='Cours isolé',
+            description='Description',
+            instructor=self.instructor,
+            level='Beginner',
+            estimated_duration=10,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30)
+        )
+        Enrollment.objects.create(student=self.students[3], course=isolated)
+
+        recommendations = SparseItemRecommender.build().recommend('student3', limit=2)
+        self.assertEqual(
+            [(rec['course_id'], rec['method']) for rec in recommendations],
+            [(self.courses[0].pk, 'popular'), (self.courses[1].pk, 'popular')]
+        )
+
+    def test_batch_api_returns_dict_keyed_by_username(self):
+        """Vérifie l'API en lot avec le moteur en mémoire"""
+        from unittest import mock
+        from django.test import override_settings
+        from . import item_recommender
+        from .recommendations import CourseRecommendationEngine
+        
+        item_recommender._model = None
+        with override_settings(RECOMMENDATION_ENGINE='sparse'), \
+                mock.patch.object(
+                    item_recommender.SparseItemRecommender, 'recommend_many',
+                    autospec=True, side_effect=item_recommender.SparseItemRecommender.recommend_many
+                ) as recommend_many:
+            results = CourseRecommendationEngine.get_recommendations_for_students(
+                ['student2', 'student1', 'student2', 'student3'], limit=5, chunk_size=2
+            )
+        item_recommender._model = None
+        self.assertEqual(list(results), ['student2', 'student1', 'student3'])
+        self.assertEqual(len(results['student2']), 2)
+        self.assertEqual(results['student1'], [])
+        # Un produit matriciel par lot de chunk_size étudiants
+        self.assertEqual([len(c.args[1]) for c in recommend_many.call_args_list], [2, 1])
+
+    def test_stale_model_is_served_while_rebuilding(self):
+        """Vérifie que la reconstruction périodique ne bloque pas l'appelant"""
+        from unittest import mock
+        from . import item_recommender
+
+        item_recommender._model = item_recommender.SparseItemRecommender.build()
+        item_recommender._model.built_at = 0
+        stale = item_recommender._model
+        try:
+            with mock.patch.object(item_recommender.threading, 'Thread') as thread:
+                self.assertIs(item_recommender.get_item_recommender(), stale)
+                self.assertIs(item_recommender.get_item_recommender(), stale)
+            # Un seul thread lancé tant que la reconstruction est en cours
+            thread.assert_called_once()
+            self.assertEqual(thread.call_args.kwargs['target'], item_recommender._rebuild_in_background)
+        finally:
+            item_recommender._rebuild_lock.release()
+            item_recommender._model = None
+
+
+class GraphEmbeddingTests(TestCase):
+    """Tests pour les embeddings FastRP et le k-NN en mémoire"""
+    
+    def test_fastrp_groups_co_enrolled_courses(self):
+        """Vérifie que les cours partageant des étudiants sont voisins"""
+        import numpy as np
+        from scipy import sparse
+        from .graph_embeddings import fastrp, EmbeddingIndex
+        
+        # Cours 0-1 suivis par les étudiants 4-6, cours 2-3 par les étudiants 7-9
+        edges = [(s, c) for s in (4, 5, 6) for c in (0, 1)] + [(s, c) for s in (7, 8, 9) for c in (2, 3)]
+        rows = [a for a, b in edges] + [b for a, b in edges]
+        cols = [b for a, b in edges] + [a for a, b in edges]
+        adjacency = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(10, 10))
+        
+        vectors = fastrp(adjacency, dimension=32, seed=1)
+        self.assertEqual(vectors.dtype, np.float32)
+        
+        brute = EmbeddingIndex(vectors[:4])
+        self.assertEqual(brute.search(vectors[0], k=1, exclude={0})[0][0], 1)
+        self.assertIn(brute.search(vectors[4], k=1)[0][0], (0, 1))
+        
+        ivf = EmbeddingIndex(vectors[:4], n_lists=2, n_probe=2)
+        self.assertEqual(ivf.search(vectors[2], k=1, exclude={2})[0][0], 3)
+    
+    def test_store_roundtrip(self):
+        """Vérifie l'écriture/lecture de la matrice et de la table des identifiants"""
+        import tempfile
+        import numpy as np
+        from .graph_embeddings import EmbeddingStore, normalize_rows
+        
+        vectors = normalize_rows(np.array([[1, 0], [0.9, 0.1], [0, 1], [1, 0.05]], dtype=np.float32))
+        with tempfile.TemporaryDirectory() as directory:
+            EmbeddingStore.save(vectors, courses=[10, 11, 12], users=['alice'], directory=directory)
+            store = EmbeddingStore.load(directory)
+        
+        self.assertEqual(store.recommend('alice', enrolled_course_ids=[10], limit=2)[0][0], 11)
+        self.assertEqual([pk for pk, _ in store.similar_courses(12, limit=1)], [11])
+        self.assertEqual(store.recommend('bob', enrolled_course_ids=[]), [])
+    
+    def test_engine_functions_read_saved_store(self):
+        """Vérifie recommandations et cours similaires de bout en bout depuis un store enregistré"""
+        import tempfile
+        import numpy as np
+        from django.test import override_settings
+        from . import graph_embeddings
+        from .graph_embeddings import (
+            EmbeddingStore, normalize_rows, recommend_from_embeddings, similar_courses_from_embeddings
+        )
+        
+        instructor = create_test_instructor()
+        student = create_test_student()
+        python, django_course, neo = [create_test_course(instructor) for _ in range(3)]
+        Course.objects.filter(pk=django_course.pk).update(description='x' * 150)
+        Enrollment.objects.create(student=student, course=python)
+        vectors = normalize_rows(np.array([[1, 0], [0.9, 0.1], [0, 1], [1, 0.05]], dtype=np.float32))
+        
+        with tempfile.TemporaryDirectory() as directory, override_settings(RECOMMENDATION_EMBEDDINGS_DIR=directory):
+            EmbeddingStore.save(
+                vectors, courses=[python.pk, django_course.pk, neo.pk], users=[student.username], directory=directory
+            )
+            graph_embeddings._store = None
+            try:
+                recs = recommend_from_embeddings(student.username, limit=1)
+                similar = similar_courses_from_embeddings(neo.pk, limit=1)
+            finally:
+                graph_embeddings._store = None
+        
+        self.assertEqual([(r['course_id'], r['method']) for r in recs], [(django_course.pk, 'embedding')])
+        self.assertEqual(len(recs[0]['description']), 103)
+        self.assertEqual(recs[0]['instructor'], instructor.username)
+        self.assertEqual([r['course_id'] for r in similar], [django_course.pk])
+        self.assertIn('similarity_score', similar[0])
+
+
+class RecommendationBenchmarkTests(TestCase):
+    """Tests pour le générateur et les métriques du benchmark"""
+    
+    def test_generate_dataset_is_reproducible_and_disjoint(self):
+        """Vérifie la graine et la séparation train/held-out"""
+        from .recommendation_benchmark import generate_dataset
+        
+        first = generate_dataset(students=50, courses=20, skills=5, seed=7)
+        second = generate_dataset(students=50, courses=20, skills=5, seed=7)
+        self.assertEqual(first['train'], second['train'])
+        for username, held in first['held_out'].items():
+            self.assertFalse(set(held) & set(first['train'][username]))
+            self.assertGreaterEqual(len(first['train'][username]), 1)
+    
+    def test_metrics(self):
+        """Vérifie precision@k/recall@k et les percentiles"""
+        from .recommendation_benchmark import precision_recall_at_k, percentiles
+        
+        self.assertEqual(precision_recall_at_k([1, 2, 3, 4], [2, 9], k=4), (0.25, 0.5))
+        self.assertEqual(precision_recall_at_k([1], [], k=1), (None, None))
+        self.assertEqual(percentiles([0.001, 0.002, 0.003])['p50'], 2.0)
+
+
+class ConcurrentStrategiesTests(TestCase):
+    """Tests pour l'exécution parallèle des stratégies"""
+    
+    def test_slow_strategy_is_dropped_at_deadline(self):
+        """Vérifie que seuls les résultats arrivés avant le délai sont retournés"""
+        import time
+        from unittest import mock
+        from django.test import override_settings
+        from .recommendations import CourseRecommendationEngine
+        
+        def fast(name):
+            return lambda username, limit: [{'course_uid': name}]
+        
+        def slow(username, limit):
+            time.sleep(1)
+            return [{'course_uid': 'skill'}]
+        
+        with mock.patch('base.recommendations.ensure_neo4j_connection'), \
+                mock.patch.object(CourseRecommendationEngine, '_collaborative_filtering', fast('collab')), \
+                mock.patch.object(CourseRecommendationEngine, '_skill_based_filtering', slow), \
+                mock.patch.object(CourseRecommendationEngine, '_popular_courses', fast('popular')), \
+                override_settings(RECOMMENDATION_STRATEGY_TIMEOUTS={'skill': 0.1}):
+            start = time.monotonic()
+            recs = CourseRecommendationEngine._concurrent_recommendations('alice', 5)
+            elapsed = time.monotonic() - start
+        
+        self.assertEqual([rec['course_uid'] for rec in recs], ['collab', 'popular'])
+        self.assertLess(elapsed, 0.8)
+
+
+class GraphSyncOutboxTests(TestCase):
+    """Tests pour l'outbox de synchronisation Neo4j"""
+    
+    def setUp(self):
+        self.instructor = create_test_instructor()
+        self.student = create_test_student()
+        self.course = create_test_course(self.instructor)
+    
+    def test_event_shares_the_enrollment_transaction(self):
+        """Vérifie que l'événement est annulé avec l'inscription"""
+        from django.db import transaction
+        from .models import GraphSyncEvent
+        
+        try:
+            with transaction.atomic():
+                Enrollment.objects.create(student=self.student, course=self.course)
+                self.assertTrue(GraphSyncEvent.objects.filter(entity='enrollment').exists())
+                raise RuntimeError('rollback')
+        except RuntimeError:
+            pass
+        self.assertFalse(GraphSyncEvent.objects.filter(entity='enrollment').exists())
+        
+        Enrollment.objects.create(student=self.student, course=self.course)
+        event = GraphSyncEvent.objects.get(entity='enrollment')
+        self.assertEqual(event.payload['course_id'], self.course.pk)
+    
+    def test_enqueue_failure_rolls_back_the_write(self):
+        """Vérifie qu'une inscription n'est pas validée sans son événement"""
+        from unittest.mock import patch
+        from django.db import transaction
+    
+        with patch('base.graph_sync.enqueue_enrollment', side_effect=RuntimeError('outbox')):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Enrollment.objects.create(student=self.student, course=self.course)
+        self.assertFalse(Enrollment.objects.filter(student=self.student, course=self.course).exists())
+    
+    def test_identical_pending_events_are_deduplicated(self):
+        """Vérifie qu'un save sans changement n'ajoute pas d'événement, mais que A→B→A garde A"""
+        from .graph_sync import coalesce_events
+        from .models import GraphSyncEvent
+        
+        before = GraphSyncEvent.objects.filter(entity='course').count()
+        self.course.save()
+        self.assertEqual(GraphSyncEvent.objects.filter(entity='course').count(), before)
+        
+        original = self.course.title
+        self.course.title = 'Python Avancé'
+        self.course.save()
+        self.course.title = original
+        self.course.save()
+        events = list(GraphSyncEvent.objects.filter(entity='course', object_id=self.course.pk))
+        self.assertEqual(len(events), before + 2)
+        
+        latest, _ = coalesce_events(events)
+        self.assertEqual([e.payload['title'] for e in latest], [original])
+    
+    def test_coalesce_keeps_latest_event_per_entity(self):
+        """Vérifie qu'une inscription puis une désinscription n'applique que la suppression"""
+        from .graph_sync import coalesce_events
+        from .models import GraphSyncEvent
+        
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        enrollment.delete()
+        events = list(GraphSyncEvent.objects.filter(entity='enrollment'))
+        
+        latest, superseded = coalesce_events(events)
+        self.assertEqual([e.operation for e in latest], ['delete'])
+        self.assertEqual([e.operation for e in superseded], ['upsert'])
+    
+    def test_login_and_unchanged_saves_do_not_enqueue_user(self):
+        """Vérifie que seuls les champs synchronisés déclenchent un événement NeoUser"""
+        from .models import GraphSyncEvent
+        
+        GraphSyncEvent.objects.update(status='done')
+        user = User.objects.get(pk=self.student.pk)
+        
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        user.save()
+        self.assertFalse(GraphSyncEvent.objects.filter(entity='user', status='pending').exists())
+        
+        user.first_name = 'Alice'
+        user.save()
+        user.save()
+        self.assertEqual(GraphSyncEvent.objects.filter(entity='user', status='pending').count(), 1)
+
+    def test_failing_event_is_isolated_from_its_batch(self):
+        """Vérifie qu'un événement refusé ou sans nœud requis est seul reprogrammé"""
+        from unittest import mock
+        from .graph_sync import UPSERT_ENROLLMENTS, process_batch
+        from .models import GraphSyncEvent
+        from .recommendation_cache import recommendation_cache
+
+        GraphSyncEvent.objects.update(status='done')
+        broken = create_test_course(self.instructor)
+        broken.title = 'Cassé'
+        broken.save()
+        missing = create_test_course(self.instructor)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Enrollment.objects.create(student=self.student, course=missing)
+        version = recommendation_cache.get_version('user', self.student.username)
+
+        def cypher_query(query, params):
+            rows = params['rows']
+            if any(row.get('props', {}).get('title') == 'Cassé' for row in rows):
+                raise RuntimeError('constraint violation')
+            if query is UPSERT_ENROLLMENTS:
+                return [[row['event_id']] for row in rows if row['course_id'] != missing.pk], ['event_id']
+            return [], []
+
+        with mock.patch('base.circuit_breaker.neo4j_available', return_value=True), \
+                mock.patch('base.neo_connection.ensure_neo4j_connection'), \
+                mock.patch('base.graph_sync.refresh_recommendations_for'), \
+                mock.patch('base.graph_sync.db.cypher_query', side_effect=cypher_query):
+            self.assertEqual(recommendation_cache.get_version('user', self.student.username), version)
+            stats = process_batch(retry_delay=0)
+
+        self.assertEqual((stats['done'], stats['retried']), (2, 2))
+        retried = GraphSyncEvent.objects.filter(status='pending', attempts=1)
+        self.assertEqual(
+            sorted((e.entity, e.object_id if e.entity == 'course' else e.payload['course_id']) for e in retried),
+            [('course', broken.pk), ('enrollment', missing.pk)]
+        )
+        # Cache invalidé après l'écriture dans Neo4j, pas au save()
+        self.assertNotEqual(recommendation_cache.get_version('user', self.student.username), version)
+
+    def test_unavailable_neo4j_defers_without_attempt(self):
+        """Vérifie qu'une coupure Neo4j reporte le lot sans tentative et solde les événements remplacés"""
+        from unittest import mock
+        from neo4j.exceptions import ServiceUnavailable
+        from .graph_sync import process_batch
+        from .models import GraphSyncEvent
+
+        GraphSyncEvent.objects.update(status='done')
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        enrollment.delete()
+
+        with mock.patch('base.circuit_breaker.neo4j_available', return_value=True), \
+                mock.patch('base.neo_connection.ensure_neo4j_connection'), \
+                mock.patch('base.graph_sync.db.cypher_query', side_effect=ServiceUnavailable('down')):
+            stats = process_batch(retry_delay=60)
+
+        self.assertEqual((stats['done'], stats['superseded'], stats['retried']), (0, 1, 1))
+        upsert = GraphSyncEvent.objects.get(entity='enrollment', operation='upsert')
+        delete = GraphSyncEvent.objects.get(entity='enrollment', operation='delete')
+        self.assertEqual(upsert.status, 'done')
+        self.assertEqual((delete.status, delete.attempts), ('pending', 0))
+        self.assertGreater(delete.available_at, timezone.now())
+
+    def test_applied_delete_supersedes_retried_upsert(self):
+        """Vérifie qu'une inscription reprogrammée n'est pas rejouée après la désinscription"""
+        from unittest import mock
+        from .graph_sync import process_batch
+        from .models import GraphSyncEvent
+
+        GraphSyncEvent.objects.update(status='done')
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        upsert = GraphSyncEvent.objects.get(entity='enrollment')
+
+        with mock.patch('base.circuit_breaker.neo4j_available', return_value=True), \
+                mock.patch('base.neo_connection.ensure_neo4j_connection'), \
+                mock.patch('base.graph_sync.refresh_recommendations_for'), \
+                mock.patch('base.graph_sync.db.cypher_query', return_value=([], [])):
+            # Étudiant absent du graphe: l'inscription est reprogrammée
+            process_batch(retry_delay=60)
+            upsert.refresh_from_db()
+            self.assertEqual((upsert.status, upsert.attempts), ('pending', 1))
+
+            enrollment.delete()
+            stats = process_batch(retry_delay=60)
+
+        self.assertEqual((stats['done'], stats['superseded']), (1, 1))
+        upsert.refresh_from_db()
+        self.assertEqual(upsert.status, 'done')
+
+
+class BulkMigrationTests(TestCase):
+    """Tests pour la migration en masse (UNWIND par lots)"""
+    
+    def setUp(self):
+        self.instructor = create_test_instructor()
+        for i in range(5):
+            create_test_course(self.instructor)
+    
+    def test_rows_are_written_in_batches(self):
+        """Vérifie qu'un lot UNWIND est envoyé toutes les batch_size lignes"""
+        from unittest import mock
+        from .graph_sync import BULK_STEPS, bulk_load
+        
+        step = next(s for s in BULK_STEPS if s.name == 'teaches')
+        with mock.patch('base.graph_sync.db.cypher_query') as cypher_query:
+            rows, _ = bulk_load(step, batch_size=2)
+        
+        self.assertEqual(rows, 5)
+        self.assertEqual([len(c.args[1]['rows']) for c in cypher_query.call_args_list], [2, 2, 1])
+        first = cypher_query.call_args_list[0].args[1]['rows'][0]
+        self.assertEqual(first['start_id'], self.instructor.pk)
+
+    def test_node_load_does_not_overwrite_newer_outbox_writes(self):
+        """Vérifie que les nœuds écrits en masse portent le filigrane de l'outbox"""
+        from unittest import mock
+        from .graph_sync import BULK_STEPS, bulk_load
+        from .models import GraphSyncEvent
+
+        step = next(s for s in BULK_STEPS if s.name == 'courses')
+        self.assertIn('WHERE coalesce(n.sync_event_id, 0) <= $event_id', step.query)
+        with mock.patch('base.graph_sync.db.cypher_query') as cypher_query:
+            bulk_load(step)
+
+        params = cypher_query.call_args.args[1]
+        self.assertEqual(params['event_id'], GraphSyncEvent.objects.order_by('-id').first().id)
+    
+    def test_incremental_load_resumes_after_watermark(self):
+        """Vérifie que seules les lignes au-delà du filigrane sont relues"""
+        from unittest import mock
+        from .graph_sync import BULK_STEPS, bulk_load_incremental
+        from .models import GraphMigrationCheckpoint
+        
+        step = next(s for s in BULK_STEPS if s.name == 'teaches')
+        with mock.patch('base.graph_sync.db.cypher_query') as cypher_query:
+            # Échec au deuxième lot: le filigrane reste sur le premier lot validé
+            cypher_query.side_effect = [None, RuntimeError('Neo4j down')]
+            with self.assertRaises(RuntimeError):
+                bulk_load_incremental(step, batch_size=2)
+            checkpoint = GraphMigrationCheckpoint.objects.get(entity='teaches')
+            self.assertEqual(checkpoint.rows, 2)
+            
+            cypher_query.side_effect = None
+            cypher_query.reset_mock()
+            rows, _ = bulk_load_incremental(step, batch_size=2)
+        
+        self.assertEqual(rows, 3)
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.last_pk, Course.objects.order_by('-pk').first().pk)
+        self.assertEqual(checkpoint.rows, 5)
+    
+    def test_steps_outside_the_outbox_are_reconciled(self):
+        """Vérifie que seules les étapes modifiables hors outbox sont réconciliées après le filigrane"""
+        from unittest import mock
+        from .graph_sync import reconcile_mutable_steps
+
+        with mock.patch('base.graph_reconcile.reconcile_step', side_effect=lambda step, **kwargs: step.name) as reconcile:
+            reconciled = reconcile_mutable_steps()
+
+        self.assertEqual(reconciled, [
+            'modules', 'resources', 'evaluations', 'questions',
+            'contains', 'has_resource', 'has_evaluation', 'has_question', 'submissions',
+        ])
+        self.assertTrue(all(call.kwargs['repair'] and call.kwargs['deep'] for call in reconcile.call_args_list))
+
+    def test_pk_ranges_cover_interval_without_overlap(self):
+        """Vérifie le découpage en tranches de PK pour --workers"""
+        from .graph_sync import partition_ranges
+        
+        ranges = partition_ranges(10, 110, 4)
+        self.assertEqual(ranges, [(10, 35), (35, 60), (60, 85), (85, 110)])
+        self.assertEqual(partition_ranges(0, 2, 8), [(0, 1), (1, 2)])
+        self.assertEqual(partition_ranges(50, 50, 4), [])
+
+    
+    def test_user_sync_reports_progress_per_batch(self):
+        """Vérifie la resynchronisation des users par lots et le verrou du job d'arrière-plan"""
+        from unittest import mock
+        from django.core.cache import cache
+        from .graph_sync import USER_SYNC_LOCK_KEY, start_user_sync_job, sync_users
+        
+        create_test_student()
+        progress = []
+        with mock.patch('base.graph_sync.db.cypher_query') as cypher_query:
+            rows, _ = sync_users(batch_size=1, on_progress=lambda done, total: progress.append((done, total)))
+        
+        self.assertEqual(rows, 2)
+        self.assertEqual(cypher_query.call_count, 2)
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+        
+        cache.add(USER_SYNC_LOCK_KEY, True, 60)
+        try:
+            self.assertFalse(start_user_sync_job())
+        finally:
+            cache.delete(USER_SYNC_LOCK_KEY)
+
+class GraphReconcileTests(TestCase):
+    """Tests pour la réconciliation SQL ↔ Neo4j par tranches"""
+    
+    def setUp(self):
+        self.instructor = create_test_instructor()
+        self.student = create_test_student()
+        self.course = create_test_course(self.instructor)
+    
+    def test_sql_digest_matches_expected_aggregates(self):
+        """Vérifie l'empreinte SQL d'une tranche de nœuds et de relations"""
+        from .graph_reconcile import get_step, sql_digests
+        
+        Enrollment.objects.create(student=self.student, course=self.course)
+        
+        chunk = self.course.pk // 1000
+        digests = sql_digests(get_step('courses'), 1000)
+        self.assertEqual(digests[chunk][:2], (1, self.course.pk))
+        
+        digests = sql_digests(get_step('enrollments'), 1000)
+        self.assertEqual(digests[self.student.pk // 1000], (1, self.course.pk))
+
+    def test_same_length_rename_changes_node_digest(self):
+        """Vérifie que le texte est comparé par tranche, sur son contenu et pas seulement sa longueur"""
+        from unittest import mock
+        from .graph_reconcile import get_step, mismatched_chunks, same_text
+
+        step = get_step('courses')
+        chunk = self.course.pk // 1000
+        aggregates = {chunk: (1, self.course.pk)}
+        with mock.patch(
+            'base.graph_reconcile.db.cypher_query', return_value=([[self.course.pk, 'Python Basics']], [])
+        ) as cypher_query:
+            self.assertTrue(same_text(step, chunk, 1000))
+            self.assertEqual(cypher_query.call_args.args[1], {'low': chunk * 1000, 'high': (chunk + 1) * 1000})
+
+            self.course.title = 'Python Basicz'
+            self.course.save()
+            self.assertFalse(same_text(step, chunk, 1000))
+            self.assertEqual(mismatched_chunks(aggregates, aggregates, step, 1000), [chunk])
+    
+    def test_compare_rows_detects_missing_orphans_and_changes(self):
+        """Vérifie la comparaison ligne à ligne d'une tranche divergente"""
+        from .graph_reconcile import compare_rows, mismatched_chunks
+        
+        sql_rows = {
+            1: {'title': 'Python', 'email': None, 'date_joined': 1700000000.0},
+            2: {'title': 'Django'},
+            3: {'title': 'Neo4j'},
+        }
+        graph_rows = {
+            1: {'title': 'Python', 'date_joined': 1700000000.0001, 'uid': 'x'},
+            2: {'title': 'Django 4'},
+            4: {'title': 'Supprimé'},
+        }
+        self.assertEqual(compare_rows(sql_rows, graph_rows), ([3], [4], [2]))
+        self.assertEqual(mismatched_chunks({0: (3, 6), 1: (1, 1)}, {0: (3, 6), 2: (1, 2)}), [1, 2])
+
+    def test_mutable_steps_repair_changes_outside_the_digest(self):
+        """Vérifie qu'une note modifiée (même couple étudiant/évaluation) est réparée"""
+        from unittest import mock
+        from .graph_reconcile import get_step
+        from .graph_sync import reconcile_mutable_steps
+
+        module = create_test_module(self.course)
+        evaluation = Evaluation.objects.create(
+            title='Quiz 1', module=module, evaluation_type='quiz', deadline=date.today() + timedelta(days=7)
+        )
+        submission = Submission.objects.create(student=self.student, evaluation=evaluation, score=80)
+        step = get_step('submissions')
+        stale = {**step.to_row(submission)['props'], 'score': 50}
+
+        def cypher_query(query, params=None):
+            if 'SUBMITTED' not in query:
+                return [], []
+            if 'count(*)' in query:
+                return [[self.student.pk // 1000, 1, evaluation.pk]], []
+            if 'properties(r)' in query:
+                return [[self.student.pk, evaluation.pk, stale]], []
+            return [], []
+
+        with mock.patch('base.graph_reconcile.db.cypher_query', side_effect=cypher_query):
+            reports = {report['step']: report for report in reconcile_mutable_steps()}
+
+        self.assertEqual(reports['submissions']['changed'], [(self.student.pk, evaluation.pk)])
+        self.assertEqual(reports['submissions']['repaired'], 1)
+
+
+class MemoryGraphBackendTests(TestCase):
+    """Tests pour le backend de graphe en mémoire (sans Neo4j)"""
+    
+    def setUp(self):
+        self.graph = create_test_memory_graph()
+    
+    def test_traversals_match_cypher_semantics(self):
+        """Vérifie co-inscriptions, compétences partagées, popularité et statistiques"""
+        graph = self.graph
+        
+        self.assertEqual([(r['course_id'], r['score']) for r in graph.collaborative('alice', 5)], [(2, 2), (3, 1)])
+        self.assertEqual([(r['course_id'], r['skills']) for r in graph.shared_skills('alice', 5)], [(4, ['Python'])])
+        self.assertEqual([r['course_id'] for r in graph.popular('alice', 2)], [2, 3])
+        self.assertEqual([r['course_id'] for r in graph.similar_courses(3, 5)], [1, 2])
+        self.assertEqual(graph.student_stats('carol')['courses_enrolled'], 3)
+        self.assertEqual(graph.instructor_stats('prof'), {'courses_created': 3, 'total_students': 4})
+        self.assertEqual(graph.student_stats('nobody'), {})
+
+    def test_backend_must_implement_every_traversal(self):
+        """Vérifie qu'un backend incomplet ne peut pas être instancié"""
+        from .graph_backend import GraphBackend, MemoryBackend
+
+        class PartialBackend(GraphBackend):
+            collaborative = MemoryBackend.collaborative
+
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+    def test_engine_runs_on_memory_backend(self):
+        """Vérifie que le moteur (mode hybride) fonctionne sans Neo4j"""
+        from .graph_backend import set_graph_backend
+        from .recommendations import CourseRecommendationEngine
+        
+        set_graph_backend(self.graph)
+        try:
+            recs = CourseRecommendationEngine.get_recommendations_for_student.uncached('alice', 3, mode='hybrid')
+            unknown = CourseRecommendationEngine._hybrid_recommendations('zoe', 2)
+        finally:
+            set_graph_backend(None)
+        
+        self.assertEqual(recs[0]['course_id'], 2)
+        self.assertEqual(recs[0]['strategies'], ['collaborative', 'popular'])
+        self.assertEqual([r['method'] for r in unknown], ['popular', 'popular'])
+
+
+class HybridRecommendationTests(TestCase):
+    """Tests pour le score combiné du mode hybride et son repli en cascade"""
+    
+    def setUp(self):
+        self.graph = create_test_memory_graph()
+    
+    def test_blended_score_is_weighted_sum_of_normalised_scores(self):
+        """Vérifie la normalisation par stratégie et l'effet des poids"""
+        from django.test import override_settings
+        from .graph_backend import set_graph_backend
+        from .recommendations import CourseRecommendationEngine
+        
+        set_graph_backend(self.graph)
+        try:
+            recs = CourseRecommendationEngine._hybrid_recommendations('alice', 3)
+            with override_settings(RECOMMENDATION_HYBRID_WEIGHTS={'skill': 5.0}):
+                skill_first = CourseRecommendationEngine._hybrid_recommendations('alice', 3)
+        finally:
+            set_graph_backend(None)
+        
+        # 2: collaboratif 2/2 × 1.0 + populaire 1 × 0.2; 3: 1/2 × 1.0 + 0.2; 4: compétence 1 × 0.6
+        self.assertEqual([(r['course_id'], r['blended_score']) for r in recs], [(2, 1.2), (3, 0.7), (4, 0.6)])
+        self.assertEqual(recs[2]['method'], 'skill')
+        self.assertEqual(skill_first[0]['course_id'], 4)
+    
+    def test_failed_hybrid_query_falls_back_to_cascade(self):
+        """Vérifie que les stratégies sont interrogées en cascade si la requête hybride échoue"""
+        from unittest import mock
+        from .graph_backend import set_graph_backend
+        from .recommendations import CourseRecommendationEngine
+        
+        set_graph_backend(self.graph)
+        try:
+            with mock.patch.object(type(self.graph), 'hybrid_batch', side_effect=RuntimeError('syntax error')):
+                recs = CourseRecommendationEngine.get_recommendations_for_student.uncached('alice', 3, mode='hybrid')
+        finally:
+            set_graph_backend(None)
+        
+        self.assertEqual([(r['course_id'], r['method']) for r in recs], [(2, 'collaborative'), (3, 'collaborative'), (4, 'skill')])
+
+    def test_hybrid_cypher_path(self):
+        """Vérifie la requête hybride envoyée à Neo4j et la lecture de ses lignes"""
+        import re
+        from unittest import mock
+        from . import graph_backend
+        from .graph_backend import HYBRID_BATCH_QUERY, Neo4jBackend
+
+        # Les motifs de relation n'acceptent que des variables (pas de row.rec)
+        for name in dir(graph_backend):
+            if name.endswith('_QUERY'):
+                query = getattr(graph_backend, name)
+                self.assertIsNone(re.search(r'-\[[^\]]*\]-[>]?\(\w+\.', query), name)
+                self.assertEqual(query.count('('), query.count(')'), name)
+                self.assertEqual(query.count('{'), query.count('}'), name)
+        self.assertIn('WITH me, entry.rec AS rec, entry.score AS score', HYBRID_BATCH_QUERY)
+        # Un cours sans enrollment_count reste proposé parmi les populaires
+        for query in (graph_backend.POPULAR_QUERY, HYBRID_BATCH_QUERY):
+            self.assertNotIn('enrollment_count IS NOT NULL', query)
+            self.assertIn('coalesce(', query)
+
+        row = ['alice', 'c2', 'Django', 'Beginner', 'x' * 120, '', 2, 'prof',
+               'collaborative', ['Python'], 1.2, ['collaborative', 'popular'], 2]
+        with mock.patch('base.graph_backend.ensure_neo4j_connection'), \
+                mock.patch('base.graph_backend.db.cypher_query', return_value=([row], [])) as cypher_query:
+            recs = Neo4jBackend().hybrid_batch(['alice', 'bob'], 3, {'collaborative': 1.0})
+
+        query, params = cypher_query.call_args[0]
+        self.assertIs(query, HYBRID_BATCH_QUERY)
+        self.assertEqual((params['usernames'], params['limit'], params['popular_pool']), (['alice', 'bob'], 3, 15))
+        self.assertEqual(recs['bob'], [])
+        self.assertEqual(recs['alice'][0]['course_id'], 2)
+        self.assertEqual(recs['alice'][0]['blended_score'], 1.2)
+        self.assertEqual(len(recs['alice'][0]['description']), 103)
+
+
+class CourseTreeTests(TestCase):
+    """Tests pour le chargement de l'arborescence d'un cours en une requête"""
+    
+    def test_build_course_tree_orders_children(self):
+        """Vérifie le tri des modules, ressources et questions, et la sérialisation pour le cache"""
+        import pickle
+        from .course_tree import build_course_tree
+        
+        modules = [
+            {
+                'order': 2, 'module': {'django_id': 20, 'title': 'Avancé'},
+                'resources': [], 'evaluations': [],
+            },
+            {
+                'order': 1, 'module': {'django_id': 10, 'title': 'Intro'},
+                'resources': [
+                    {'order': 1, 'resource': {'django_id': 2, 'title': 'Vidéo'}},
+                    {'order': 0, 'resource': {'django_id': 3, 'title': 'PDF'}},
+                ],
+                'evaluations': [{
+                    'evaluation': {'django_id': 5, 'title': 'Quiz'},
+                    'questions': [{'django_id': 8, 'text': 'Q2', 'order': 2}, {'django_id': 7, 'text': 'Q1', 'order': 1}],
+                }],
+            },
+        ]
+        tree = build_course_tree({'django_id': 1, 'uid': 'c1', 'title': 'Python'}, 'prof', modules)
+        tree = pickle.loads(pickle.dumps(tree))
+        
+        self.assertEqual((tree.title, tree.instructor), ('Python', 'prof'))
+        self.assertEqual([m.title for m in tree.modules], ['Intro', 'Avancé'])
+        intro = tree.modules[0]
+        self.assertEqual([r.title for r in intro.resources], ['PDF', 'Vidéo'])
+        self.assertEqual([q.text for q in intro.evaluations[0].questions], ['Q1', 'Q2'])
+        self.assertFalse(hasattr(intro, '__dict__'))
+    
+    def test_course_tree_is_invalidated_when_the_graph_changes(self):
+        """Vérifie que l'arbre en cache est invalidé à l'écriture dans Neo4j, pas au save()"""
+        from .course_tree import invalidate_course_trees
+        from .graph_sync import invalidate_caches_for
+        from .models import GraphSyncEvent
+        from .recommendation_cache import recommendation_cache
+        
+        course = create_test_course(create_test_instructor())
+        version = recommendation_cache.get_version('course_tree', course.pk)
+        create_test_module(course)
+        self.assertEqual(recommendation_cache.get_version('course_tree', course.pk), version)
+        
+        invalidate_caches_for(GraphSyncEvent.objects.filter(entity='course'))
+        self.assertNotEqual(recommendation_cache.get_version('course_tree', course.pk), version)
+        
+        version = recommendation_cache.get_version('course_tree', course.pk)
+        self.assertEqual(invalidate_course_trees(), 1)
+        self.assertNotEqual(recommendation_cache.get_version('course_tree', course.pk), version)
+
+
+class GraphSchemaTests(TestCase):
+    """Tests pour le schéma Neo4j déclaré (index et contraintes)"""
+    
+    def test_statements_cover_nodes_relationships_and_lookups(self):
+        """Vérifie les instructions CREATE ... IF NOT EXISTS générées"""
+        from .graph_schema import IndexSpec
+        
+        self.assertEqual(
+            IndexSpec('relationship', 'SUBMITTED', 'passed').statement(),
+            'CREATE INDEX submitted_passed_idx IF NOT EXISTS FOR ()-[n:SUBMITTED]-() ON (n.passed)'
+        )
+        self.assertEqual(
+            IndexSpec('node', 'NeoCourse', 'django_id', unique=True).statement(),
+            'CREATE CONSTRAINT neocourse_django_id_unique IF NOT EXISTS '
+            'FOR (n:NeoCourse) REQUIRE n.django_id IS UNIQUE'
+        )
+        self.assertEqual(
+            IndexSpec('relationship').statement(),
+            'CREATE LOOKUP INDEX relationship_lookup_idx IF NOT EXISTS FOR ()-[n]-() ON EACH type(n)'
+        )
+    
+    def test_missing_indexes_matches_show_indexes_by_schema(self):
+        """Vérifie qu'un index équivalent (autre nom) suffit et qu'un index en cours de peuplement manque"""
+        from .graph_schema import IndexSpec, missing_indexes
+        
+        specs = [
+            IndexSpec('relationship'),
+            IndexSpec('node', 'NeoUser', 'username', unique=True),
+            IndexSpec('relationship', 'SIMILAR_TO', 'similarity_score'),
+            IndexSpec('node', 'NeoCourse', 'level'),
+        ]
+        rows = [
+            {'type': 'LOOKUP', 'entityType': 'RELATIONSHIP', 'labelsOrTypes': None, 'properties': None, 'state': 'ONLINE'},
+            {'type': 'RANGE', 'entityType': 'NODE', 'labelsOrTypes': ['NeoUser'], 'properties': ['username'], 'state': 'ONLINE',
+             'owningConstraint': 'neouser_username_unique'},
+            {'type': 'RANGE', 'entityType': 'RELATIONSHIP', 'labelsOrTypes': ['SIMILAR_TO'], 'properties': ['similarity_score'], 'state': 'POPULATING'},
+            {'type': 'TEXT', 'entityType': 'NODE', 'labelsOrTypes': ['NeoCourse'], 'properties': ['level'], 'state': 'ONLINE'},
+        ]
+        self.assertEqual([str(spec) for spec in missing_indexes(specs, rows)], ['SIMILAR_TO.similarity_score', 'NeoCourse.level'])
+
+    def test_unique_spec_requires_a_constraint_index(self):
+        """Vérifie qu'un index RANGE simple ne satisfait pas une entrée unique"""
+        from .graph_schema import IndexSpec, missing_indexes
+
+        specs = [IndexSpec('node', 'NeoCourse', 'django_id', unique=True), IndexSpec('node', 'NeoCourse', 'title')]
+        rows = [
+            {'type': 'RANGE', 'entityType': 'NODE', 'labelsOrTypes': ['NeoCourse'], 'properties': ['django_id'],
+             'state': 'ONLINE', 'owningConstraint': None},
+            {'type': 'RANGE', 'entityType': 'NODE', 'labelsOrTypes': ['NeoCourse'], 'properties': ['title'],
+             'state': 'ONLINE', 'owningConstraint': None},
+        ]
+        self.assertEqual([str(spec) for spec in missing_indexes(specs, rows)], ['NeoCourse.django_id'])
+
+        rows[0]['owningConstraint'] = 'neocourse_django_id_unique'
+        self.assertEqual(missing_indexes(specs, rows), [])
+
+
+class GraphStatsTests(TestCase):
+    """Tests pour les statistiques du graphe lues dans le count store"""
+    
+    def test_counts_use_per_label_lookups_and_are_cached(self):
+        """Vérifie la requête par étiquette/type, l'omission des jetons vides et le cache"""
+        from unittest import mock
+        from .graph_stats import STATS_CACHE_KEY, graph_counts
+        from .recommendation_cache import recommendation_cache
+        
+        responses = [
+            ([['NeoUser'], ['NeoCourse'], ['NeoOld']], ['label']),
+            ([['ENROLLED_IN']], ['relationshipType']),
+            ([
+                ['node', 0, 12], ['node', 1, 3], ['node', 2, 0],
+                ['relationship', 0, 20], ['total_nodes', 0, 15], ['total_relationships', 0, 20],
+            ], ['kind', 'idx', 'count']),
+        ]
+        recommendation_cache.set(STATS_CACHE_KEY, None, 1)
+        with mock.patch('base.graph_stats.db') as db:
+            db.cypher_query.side_effect = responses
+            counts = graph_counts()
+            cached = graph_counts()
+        
+        count_query = db.cypher_query.call_args_list[2][0][0]
+        self.assertIn('MATCH (n:`NeoOld`) RETURN', count_query)
+        self.assertIn('MATCH ()-[r:`ENROLLED_IN`]->() RETURN', count_query)
+        self.assertEqual(db.cypher_query.call_count, 3)
+        self.assertEqual(counts['node_stats'], [{'label': 'NeoCourse', 'count': 3}, {'label': 'NeoUser', 'count': 12}])
+        self.assertEqual((counts['total_nodes'], counts['total_relationships']), (15, 20))
+        self.assertEqual(cached, counts)
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests pour la pagination par curseur des listes de l'admin Neo4j"""
+    
+    def test_cursor_round_trip_and_invalid_tokens(self):
+        """Vérifie l'encodage du curseur et le rejet des curseurs invalides"""
+        from .neo_pagination import decode_cursor, encode_cursor
+        
+        self.assertEqual(decode_cursor(encode_cursor('Élise', 'u1')), ('Élise', 'u1'))
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        self.assertIsNone(decode_cursor(None))
+    
+    def test_pages_forward_and_backward_from_last_key(self):
+        """Vérifie la borne indexée, la détection de la page suivante et la lecture arrière"""
+        from unittest import mock
+        from django.test import override_settings
+        from .neo_pagination import KeysetPaginator, decode_cursor, encode_cursor
+        
+        paginator = KeysetPaginator('NeoUser', 'username', per_page=2)
+        body = 'RETURN n.username AS sort_key, n.uid AS uid'
+        columns = ['sort_key', 'uid']
+        
+        with override_settings(NEO_ADMIN_LIST_TOTALS=False), mock.patch('base.neo_pagination.db') as db:
+            db.cypher_query.return_value = ([['alice', 'u1'], ['bob', 'u2'], ['carol', 'u3']], columns)
+            first = paginator.page(body)
+            query, params = db.cypher_query.call_args[0]
+            
+            db.cypher_query.return_value = ([['bob', 'u2'], ['alice', 'u1']], columns)
+            back = paginator.page(body, before=encode_cursor('carol', 'u3'))
+            back_query, back_params = db.cypher_query.call_args[0]
+        
+        self.assertIn('WHERE n.username >= $key AND (n.username > $key OR n.uid > $uid)', query)
+        self.assertNotIn('SKIP', query)
+        self.assertEqual((params['key'], params['limit']), ('', 3))
+        self.assertEqual([row['sort_key'] for row in first['rows']], ['alice', 'bob'])
+        self.assertEqual((first['has_prev'], first['has_next']), (False, True))
+        self.assertEqual(decode_cursor(first['next_cursor']), ('bob', 'u2'))
+        self.assertIsNone(first['approximate_total'])
+        
+        self.assertIn('ORDER BY n.username DESC, n.uid DESC', back_query)
+        self.assertEqual(back_params['key'], 'carol')
+        self.assertEqual([row['sort_key'] for row in back['rows']], ['alice', 'bob'])
+        self.assertEqual((back['has_prev'], back['has_next']), (False, True))
+    
+    def test_empty_page_has_no_link_without_cursor(self):
+        """Vérifie qu'une page vide (lignes supprimées) ne produit pas de lien ?after=None"""
+        from unittest import mock
+        from django.test import override_settings
+        from .neo_pagination import KeysetPaginator, encode_cursor
+        
+        paginator = KeysetPaginator('NeoUser', 'username', per_page=2)
+        body = 'RETURN n.username AS sort_key, n.uid AS uid'
+        with override_settings(NEO_ADMIN_LIST_TOTALS=False), mock.patch('base.neo_pagination.db') as db:
+            db.cypher_query.return_value = ([], ['sort_key', 'uid'])
+            back = paginator.page(body, before=encode_cursor('carol', 'u3'))
+            forward = paginator.page(body, after=encode_cursor('zoe', 'u9'))
+        
+        for page in (back, forward):
+            self.assertEqual((page['has_prev'], page['has_next']), (False, False))
+            self.assertIsNone(page['next_cursor'])
+            self.assertIsNone(page['prev_cursor'])
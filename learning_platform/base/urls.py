@@ -3,7 +3,7 @@ from .views import *
 from django.contrib.auth.views import LoginView, LogoutView
 from .neo_admin import (
     NeoAdminDashboardView, NeoUserListView, NeoUserDetailView, NeoUserDeleteView,
-    NeoCourseListView, NeoCourseDeleteView, NeoModuleListView, NeoSyncView
+    NeoCourseListView, NeoCourseDeleteView, NeoModuleListView, NeoSyncView, NeoSyncStatusView
 )
 
 
@@ -129,6 +129,7 @@ urlpatterns = [
     path('neo-admin/courses/<str:uid>/delete/', NeoCourseDeleteView.as_view(), name='neo-admin-course-delete'),
     path('neo-admin/modules/', NeoModuleListView.as_view(), name='neo-admin-modules'),
     path('neo-admin/sync/', NeoSyncView.as_view(), name='neo-admin-sync'),
+    path('neo-admin/sync/status/', NeoSyncStatusView.as_view(), name='neo-admin-sync-status'),
 
 ]
 
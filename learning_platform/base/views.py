@@ -8,6 +8,7 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django import forms
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
 
 
 
@@ -563,7 +564,8 @@ class SignUpView(View):
             messages.error(request, "Username already exists.")
             return render(request, 'registration/signup.html')
 
-        user = User.objects.create_user(username=username, email=email, password=password1, role=role)
+        with transaction.atomic():
+            user = User.objects.create_user(username=username, email=email, password=password1, role=role)
         messages.success(request, "Account created successfully. You can now log in.")
         return redirect('login')  
     
@@ -583,37 +585,12 @@ class EnrollView(LoginRequiredMixin, View):
         if already_enrolled:
             messages.info(request, "Vous êtes déjà inscrit à ce cours.")
         else:
-            Enrollment.objects.create(student=request.user, course=course)
+            # La relation ENROLLED_IN est synchronisée par l'outbox (signals.py),
+            # écrite dans la même transaction que l'inscription
+            with transaction.atomic():
+                Enrollment.objects.create(student=request.user, course=course)
             messages.success(request, "Inscription réussie!")
             
-            # =====================================================
-            # SYNC NEO4J: Créer relation ENROLLED_IN
-            # =====================================================
-            try:
-                from base.neo_models import NeoUser, NeoCourse, get_neo_user
-                from datetime import date
-                
-                neo_user = get_neo_user(request)
-                if neo_user:
-                    # Trouver le cours Neo4j par titre
-                    neo_course = NeoCourse.nodes.get_or_none(title=course.title)
-                    if neo_course:
-                        # Créer la relation si pas déjà existante
-                        if neo_course not in neo_user.enrolled_in.all():
-                            neo_user.enrolled_in.connect(neo_course, {
-                                'enrolled_on': date.today(),
-                                'completion_percent': 0.0,
-                                'certified': False
-                            })
-                            import logging
-                            logger = logging.getLogger('base')
-                            logger.info(f"Neo4j: {request.user.username} enrolled in {course.title}")
-            except Exception as e:
-                import logging
-                logger = logging.getLogger('base')
-                logger.warning(f"Neo4j enrollment sync failed: {e}")
-            # =====================================================
-            
             # Notifier l'instructeur de la nouvelle inscription
             create_notification(
                 recipient=course.instructor,
@@ -640,28 +617,10 @@ class UnenrollView(LoginRequiredMixin, View):
 
         enrollment = Enrollment.objects.filter(student=request.user, course=course).first()
         if enrollment:
-            enrollment.delete()
+            # Suppression de la relation ENROLLED_IN via l'outbox (signals.py)
+            with transaction.atomic():
+                enrollment.delete()
             messages.success(request, "You have successfully unenrolled from the course.")
-            
-            # =====================================================
-            # SYNC NEO4J: Supprimer relation ENROLLED_IN
-            # =====================================================
-            try:
-                from base.neo_models import NeoUser, NeoCourse, get_neo_user
-                
-                neo_user = get_neo_user(request)
-                if neo_user:
-                    neo_course = NeoCourse.nodes.get_or_none(title=course.title)
-                    if neo_course and neo_course in neo_user.enrolled_in.all():
-                        neo_user.enrolled_in.disconnect(neo_course)
-                        import logging
-                        logger = logging.getLogger('base')
-                        logger.info(f"Neo4j: {request.user.username} unenrolled from {course.title}")
-            except Exception as e:
-                import logging
-                logger = logging.getLogger('base')
-                logger.warning(f"Neo4j unenroll sync failed: {e}")
-            # =====================================================
         else:
             messages.info(request, "You are not enrolled in this course.")
 
@@ -679,13 +638,10 @@ class StudentDashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'students/dashboard.html'
 
     def get_neo_recommendations(self, user):
-        """Récupérer les recommandations depuis Neo4j"""
+        """Récupérer les recommandations pré-calculées (table StudentRecommendation)"""
         try:
-            from base.recommendations import CourseRecommendationEngine
-            recommendations = CourseRecommendationEngine.get_recommendations_for_student(
-                user.username, limit=6
-            )
-            return recommendations
+            from base.recommendations import RecommendationStore
+            return RecommendationStore.get_for_student(user, limit=6)
         except Exception as e:
             import logging
             logger = logging.getLogger('base')